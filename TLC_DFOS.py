@@ -4,21 +4,41 @@ import openpyxl
 import shutil
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.gridspec import GridSpec
-from matplotlib.patches import FancyArrowPatch
 from matplotlib.ticker import FuncFormatter
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg, NavigationToolbar2QT
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSizePolicy
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QStackedWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QFileDialog, QLineEdit, QInputDialog, QMessageBox,
-    QApplication, QTableWidget, QTableWidgetItem
+    QApplication, QTableWidget, QTableWidgetItem, QCheckBox, QComboBox, QProgressDialog,
+    QListWidget, QListWidgetItem
 )
 from PyQt5.QtWidgets import QTableWidget, QTableWidgetItem
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 from PyQt5.QtGui import QPixmap, QDesktopServices
-from PyQt5.QtCore import Qt, QUrl
+from PyQt5.QtCore import Qt, QUrl, QThread, QEventLoop, pyqtSignal
+from tlc_core import (
+    RESULT_KEYS, integral_series, nearest_row, parse_segments, evaluate_profile,
+    bootstrap_transfer_length, default_n_jobs, detect_events, detect_gauge_events, recommend_parameters
+)
+from tlc_pyramid import StrainPyramid
+from tlc_plots import plot_integral_with_max, TransferLengthPlot, plot_comparison
+from tlc_report import specimen, read_campaign, is_campaign_table, build_report, ReportCancelled
+from tlc_session import save_project, load_project, PROJECT_SUFFIX
+from tlc_library import DatasetLibrary, compare_specimens
+from tlc_export import (
+    EXPORT_FORMATS, STRAIN_KINDS, ExportCancelled, export_integral, export_time_history, export_strain
+)
+
+# Anzeigename -> Schätzer in tlc_core.MODE_METHODS
+MODE_CHOICES = [("Histogram", "histogram"), ("Sliding window", "window"), ("KDE", "kde")]
+
+# Anzeigename -> Inhalt des Exports im Dashboard (Dehnungsmatrizen: Art in tlc_export.STRAIN_KINDS)
+EXPORT_CHOICES = [("Results table", "results"), ("Integral series", "integral"),
+                  ("Live/dead end per time step", "history"), ("Strain, SRAs masked", "masked"),
+                  ("Strain, SRAs interpolated", "cleaned"), ("Strain, raw", "raw"), ("SRA mask", "mask")]
 
 class AspectRatioLabel(QLabel):
     def __init__(self, parent=None):
@@ -37,6 +57,123 @@ class AspectRatioLabel(QLabel):
             super().setPixmap(scaled)
         super().resizeEvent(event)
 
+class HeatmapCanvas(FigureCanvasQTAgg):
+    """
+    Zeit x Position-Heatmap (Wasserfall) der Dehnungen mit Zoom/Pan.
+
+    Angezeigt wird immer nur der sichtbare Ausschnitt aus der passenden Stufe
+    der StrainPyramid; ein Klick (ohne aktives Zoom/Pan-Werkzeug) ruft
+    on_pick_time(t) mit der angeklickten Zeit auf.
+    """
+
+    def __init__(self, dataset, pyramid, on_pick_time, parent=None):
+        self.fig = Figure(figsize=(10, 6))
+        super().__init__(self.fig)
+        self.setParent(parent)
+        self.dataset = dataset
+        self.pyramid = pyramid
+        self.on_pick_time = on_pick_time
+        self.stat = "mean"
+        self.toolbar = None
+        self._updating = False
+
+        n_cols = dataset.n_gauges
+        pos = dataset.positions
+        # Spalten ohne numerische Position erhalten ihren Spaltenindex
+        self.x_of_col = np.where(np.isnan(pos), np.arange(n_cols, dtype=float), pos)
+        # Pixelränder (wie imshow: Werte in der Mitte ihres Bildpunkts)
+        self.x_edges = self._edges(self.x_of_col)
+        self.t_edges = self._edges(np.asarray(dataset.times, dtype=float))
+
+        self.ax = self.fig.add_subplot(111)
+        strain = dataset.analysis_strain()
+        self.image = self.ax.imshow(np.zeros((1, 1)), aspect='auto', cmap='viridis', interpolation='nearest',
+                                    vmin=np.nanmin(strain), vmax=np.nanmax(strain))
+        self.fig.colorbar(self.image, ax=self.ax, label=r'$\varepsilon\ [‰]$')
+        self.ax.set_xlabel(r'$x\ [\mathrm{mm}]$', fontsize=12)
+        self.ax.set_ylabel(r'$t\ [\mathrm{s}]$', fontsize=12)
+        self.ax.set_xlim(self.x_of_col[0], self.x_of_col[-1])
+        self.ax.set_ylim(dataset.times[-1], dataset.times[0])
+        self.ax.set_autoscale_on(False)
+        self.ax.callbacks.connect('xlim_changed', self.refresh)
+        self.ax.callbacks.connect('ylim_changed', self.refresh)
+        self.mpl_connect('button_press_event', self.on_click)
+        self.refresh()
+
+    @staticmethod
+    def _edges(values):
+        if values.size < 2:
+            return np.concatenate([values - 0.5, values + 0.5])
+        mid = (values[1:] + values[:-1]) / 2
+        return np.concatenate([[2 * values[0] - mid[0]], mid, [2 * values[-1] - mid[-1]]])
+
+    def _index_range(self, axis_values, lo, hi):
+        lo, hi = min(lo, hi), max(lo, hi)
+        if np.all(np.diff(axis_values) >= 0):
+            return np.searchsorted(axis_values, lo, 'left'), np.searchsorted(axis_values, hi, 'right')
+        return 0, axis_values.size
+
+    def set_stat(self, stat):
+        self.stat = stat
+        self.refresh()
+
+    def refresh(self, _=None):
+        if self._updating:
+            return
+        self._updating = True
+        try:
+            r0, r1 = self._index_range(self.dataset.times, *self.ax.get_ylim())
+            c0, c1 = self._index_range(self.x_of_col, *self.ax.get_xlim())
+            bbox = self.ax.get_window_extent()
+            image, _, (r0, r1, c0, c1) = self.pyramid.view(
+                (r0, max(r1, r0 + 1)), (c0, max(c1, c0 + 1)), bbox.height, bbox.width, self.stat)
+            self.image.set_data(image)
+            self.image.set_extent((self.x_edges[c0], self.x_edges[c1], self.t_edges[r1], self.t_edges[r0]))
+            self.draw_idle()
+        finally:
+            self._updating = False
+
+    def on_click(self, event):
+        if event.inaxes is not self.ax or event.ydata is None:
+            return
+        if self.toolbar is not None and self.toolbar.mode:
+            return
+        self.on_pick_time(event.ydata)
+
+
+class ExportWorker(QThread):
+    """
+    Führt einen Export aus tlc_export (fn(*args, progress=...)) im Hintergrund
+    aus. progressed(done, total) meldet den Fortschritt; cancel() bricht beim
+    nächsten Block ab. Ergebnis: rows (Zeilenzahl), cancelled bzw. error.
+    """
+    progressed = pyqtSignal(int, int)
+
+    def __init__(self, fn, *args, parent=None):
+        super().__init__(parent)
+        self.fn = fn
+        self.args = args
+        self.rows = None
+        self.cancelled = False
+        self.error = None
+        self._cancel = False
+
+    def cancel(self):
+        self._cancel = True
+
+    def _progress(self, done, total):
+        self.progressed.emit(done, total or 0)
+        return not self._cancel
+
+    def run(self):
+        try:
+            self.rows = self.fn(*self.args, progress=self._progress)
+        except ExportCancelled:
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
+
+
 def read_excel(excel_path, parent=None):
     """
     Liest eine Excel-Datei ein, zeigt einen Info-Dialog und setzt den Mauszeiger auf 'busy'.
@@ -83,167 +220,6 @@ def read_excel(excel_path, parent=None):
     return df
 
 
-
-
-
-
-def plot_integral_with_max(df, output_folder, filename="integral_plot.pdf", progress_callback=None):
-    r"""
-    Erstellt einen Plot mit:
-      - Liniendiagramm (Zeit vs. Integral der Deformation)
-      - Roter Linie an der Stelle des maximalen Integrals
-      - y-Achsen-Label = r'$\int_{0}^{L} \varepsilon \,\mathrm{d}x$ [-‰]'
-      - Gitternetz (Major/Minor) und angepasste Tick-Labels
-
-    Die Funktion iteriert über alle Zeilen (df_clean) und ruft bei jeder Iteration
-    den progress_callback(current, total) auf, sofern vorhanden.
-
-    Speichert den Plot als PDF und PNG in output_folder und gibt (fig, max_time) zurück.
-    """
-    os.makedirs(output_folder, exist_ok=True)
-
-    time_column = df.columns[-1]
-    deformation_columns = df.columns[:-1]
-
-    # Zeilen entfernen, in denen ALLE Deformationswerte NaN sind
-    df_clean = df.dropna(subset=deformation_columns, how='all')
-    if df_clean.empty:
-        print("Plot wird nicht erstellt, da alle Zeilen NaN sind.")
-        return None, None
-
-    integrals = []
-    times = []
-    n = len(df_clean)
-
-    for i, (_, row) in enumerate(df_clean.iterrows()):
-        # --- WICHTIGE ÄNDERUNG: partielle NaNs durch 0 ersetzen ---
-        # (Alternativ könnte man hier auch interpolieren)
-        deformation_values = row[deformation_columns].fillna(0)
-
-        # Integral berechnen
-        val = np.trapz(deformation_values)
-        integrals.append(val)
-
-        # Zeitwert erfassen
-        times.append(row[time_column])
-
-        # Fortschrittsanzeige aktualisieren, falls gewünscht
-        if progress_callback is not None:
-            progress_callback(i + 1, n)
-
-    if not integrals:
-        print("Keine Integrale berechnet, Plot wird nicht erstellt.")
-        return None, None
-
-    max_idx = np.argmax(integrals)
-    max_time = times[max_idx]
-
-    # Erstelle den Plot
-    fig, ax_line = plt.subplots(figsize=(8, 6))
-    ax_line.plot(times, integrals, color='black', linestyle='-', linewidth=1.5, label='Integral Deformation')
-    ax_line.axvline(x=max_time, color='red', linestyle='--', linewidth=4.0, label='Zeit vor Riss')
-    ax_line.set_xlabel(r'$t \ [\mathrm{s}]$', fontsize=12)
-    ax_line.set_ylabel(r'$\int \varepsilon \,\mathrm{d}x$ [-‰]', fontsize=12)
-    ax_line.tick_params(axis='both', which='major', labelsize=12)
-    ax_line.grid(True, which='major', linestyle='--', linewidth=1, zorder=0)
-    ax_line.grid(True, which='minor', linestyle=':', linewidth=0.5, zorder=0)
-    ax_line.minorticks_on()
-    plt.tight_layout()
-
-    basename = os.path.splitext(filename)[0]
-    pdf_path = os.path.join(output_folder, f"{basename}.pdf")
-    png_path = os.path.join(output_folder, f"{basename}.png")
-    plt.savefig(pdf_path, format='pdf')
-    plt.savefig(png_path, format='png')
-    plt.close()
-
-    return fig, max_time
-
-
-
-def plot_results(result_list, live_end, dead_end, l_ol, eps, max_bin_edges,
-                 output_folder, file, min_time, y_limits=None, figsize=(10, 6)):
-    x_vals = [pt[1] for pt in result_list]
-    y_vals = [pt[0] for pt in result_list]
-
-    fig = plt.figure(figsize=figsize)
-    gs = GridSpec(1, 2, width_ratios=[1, 3], wspace=0.04)
-    ax_hist = fig.add_subplot(gs[0, 0])
-    ax = fig.add_subplot(gs[0, 1], sharey=ax_hist)
-
-    # Histogramm
-    if eps and eps > 0:
-        bins = np.arange(0, np.nanmax(y_vals) + eps, eps)
-    else:
-        bins = 10
-    counts, bin_edges = np.histogram(y_vals, bins=bins)
-    y_pos = (bin_edges[:-1] + bin_edges[1:]) / 2
-    max_bin = np.argmax(counts)
-    height = bin_edges[1] - bin_edges[0]
-    for i, cnt in enumerate(counts):
-        color = 'lightblue' if i == max_bin else 'gray'
-        ax_hist.barh(y_pos[i], -cnt, height=height, color=color, edgecolor='black')
-
-    ax_hist.set_xlabel(r'$n$', fontsize=14)
-    ax_hist.set_ylabel(r'$\epsilon_\mathrm{c}\ [-‰]$', fontsize=14, labelpad=14)
-    ax_hist.tick_params(axis="y", left=True, right=False, labelleft=True)
-    ax_hist.yaxis.set_label_position("left")
-    ax_hist.yaxis.set_ticks_position('left')
-    ax_hist.grid(axis='y', ls='--', lw=0.5)
-    ax_hist.set_xlim(-max(counts) * 1.1, 0)
-
-    # Rechte Achse: keine Y-Ticks, keine Y-Label
-    ax.plot(x_vals, y_vals, 'k-', lw=1.5, label='DFOS')
-    if y_limits:
-        ax.set_ylim(y_limits)
-    if live_end is not None:
-        ax.axvline(live_end, color='#13338E', ls='--', lw=1.5)
-    if dead_end is not None:
-        ax.axvline(x_vals[-1] - dead_end, color='#13338E', ls='--', lw=1.5)
-    if max_bin_edges:
-        ax.axhspan(max_bin_edges[0], max_bin_edges[1], color='lightblue', alpha=0.7, label='RMS')
-    ax.plot([], [], ' ', label=rf'$l_{{ol}}={l_ol:.1f}\,\mathrm{{mm}},\Delta \epsilon_{{c}}={eps:.3f}\,\mathrm{{‰}}$')
-    ax.set_xlabel(r'$x\ [\mathrm{mm}]$', fontsize=14)
-
-    # Hier alles y-bezogene ausschalten:
-    ax.set_ylabel("")
-    ax.tick_params(axis="y", left=False, right=False, labelleft=False, labelright=False)
-    ax.grid(True, which='both', ls='--', lw=0.5)
-
-    # Y-Limits synchronisieren (falls nötig)
-    ymin, ymax = ax_hist.get_ylim()
-    ax.set_ylim(ymin, ymax)
-
-    # Pfeile für Live End und Dead End
-    y0, y1 = ax.get_ylim()
-    y_arrow = y0 + (y1 - y0) / 3
-    x0, x1 = ax.get_xlim()
-    if live_end is not None:
-        le = np.clip(live_end, x0, x1)
-        arrow = FancyArrowPatch((0, y_arrow), (le, y_arrow),
-                                arrowstyle='<|-|>', mutation_scale=20,
-                                color='#13338E', lw=1.5, clip_on=False)
-        ax.add_patch(arrow)
-    if dead_end is not None:
-        start = x_vals[-1] - dead_end
-        de0 = np.clip(start, x0, x1)
-        de1 = np.clip(start + dead_end, x0, x1)
-        arrow = FancyArrowPatch((de0, y_arrow), (de1, y_arrow),
-                                arrowstyle='<|-|>', mutation_scale=20,
-                                color='#13338E', lw=1.5, clip_on=False)
-        ax.add_patch(arrow)
-
-    ax.legend(fontsize=10, loc='best')
-    base = os.path.splitext(os.path.basename(file))[0]
-    plt.savefig(os.path.join(output_folder, f"{base}_transferlength.pdf"), format='pdf')
-    plt.savefig(os.path.join(output_folder, f"{base}_transferlength.png"), format='png')
-    plt.close()
-    return fig
-
-
-
-
-
 class EnhancedTLCGUI(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -253,12 +229,16 @@ class EnhancedTLCGUI(QMainWindow):
         self.setCentralWidget(self.stacked_widget)
 
         self.file_path = None
-        self.df = None           # <<<<<<<< NEU
+        self.dataset = None
         self.selected_time = None
-        self.selected_row = None
+        self.selected_index = None
+        self.sra_enabled = False
+        self.sra_interpolate = False
         self.output_folder = os.path.join(os.getcwd(), "results")
         os.makedirs(self.output_folder, exist_ok=True)
         self.results = {}
+        # geöffnete Messungen für den Vergleich; erneutes Öffnen liest die Datei nicht noch einmal
+        self.library = DatasetLibrary()
 
         self.init_opening_screen()
 
@@ -413,6 +393,24 @@ class EnhancedTLCGUI(QMainWindow):
         b.setCursor(Qt.PointingHandCursor)
         b.clicked.connect(self.select_file)
         btn_layout.addWidget(b)
+        b = QPushButton("Campaign Report")
+        b.setFixedHeight(50)
+        b.setMinimumWidth(220)
+        b.setCursor(Qt.PointingHandCursor)
+        b.clicked.connect(self.create_campaign_report)
+        btn_layout.addWidget(b)
+        b = QPushButton("Open Project")
+        b.setFixedHeight(50)
+        b.setMinimumWidth(220)
+        b.setCursor(Qt.PointingHandCursor)
+        b.clicked.connect(self.open_project)
+        btn_layout.addWidget(b)
+        b = QPushButton("Compare Specimens")
+        b.setFixedHeight(50)
+        b.setMinimumWidth(220)
+        b.setCursor(Qt.PointingHandCursor)
+        b.clicked.connect(self.show_comparison_screen)
+        btn_layout.addWidget(b)
         layout.addLayout(btn_layout)
 
         # Footer
@@ -432,20 +430,157 @@ class EnhancedTLCGUI(QMainWindow):
         self.stacked_widget.addWidget(widget)
         self.stacked_widget.setCurrentWidget(widget)
 
+    def create_campaign_report(self):
+        """
+        Bericht über viele Probekörper: mehrere Messdateien (aktuelle Parameter)
+        oder eine Kampagnentabelle mit Spalte "file" (siehe tlc_report.read_campaign).
+        """
+        files, _ = QFileDialog.getOpenFileNames(
+            self, "Select Measurement Files or Campaign Table", "", "Excel/CSV Files (*.xlsx *.csv)"
+        )
+        if not files:
+            return
+        try:
+            if len(files) == 1 and is_campaign_table(files[0]):
+                specs = read_campaign(files[0])
+            else:
+                specs = [specimen(f, eps=getattr(self, "current_eps", 0.023), l_ol=getattr(self, "current_lol", 17),
+                                  method=getattr(self, "current_method", "histogram"),
+                                  sra=getattr(self, "sra_enabled", False)) for f in files]
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Could not read campaign:\n{e}")
+            return
+        if not specs:
+            QMessageBox.warning(self, "Warning", "No specimens found.")
+            return
+
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save Campaign Report", os.path.join(self.output_folder, "campaign_report.pdf"), "PDF Files (*.pdf)"
+        )
+        if not path:
+            return
+
+        progress = QProgressDialog("Evaluating specimens…", "Cancel", 0, 2 * len(specs), self)
+        progress.setWindowTitle("Campaign Report")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.show()
+
+        def on_progress(done, total):
+            if done > len(specs):
+                progress.setLabelText("Writing report pages…")
+            progress.setValue(done)
+            QApplication.processEvents()
+            return not progress.wasCanceled()
+
+        try:
+            # Auswertung immer im Prozesspool, damit die Oberfläche auch
+            # während eines einzelnen Probekörpers bedienbar bleibt
+            summary = build_report(specs, path, n_jobs=max(2, default_n_jobs()), progress_callback=on_progress)
+        except ReportCancelled:
+            progress.close()
+            return
+        except Exception as e:
+            progress.close()
+            QMessageBox.critical(self, "Error", f"Report failed: {e}")
+            return
+        progress.close()
+        failed = int((summary["Error"] != "").sum())
+        QMessageBox.information(
+            self, "Report Saved",
+            f"{len(specs)} specimens ({failed} failed)\n{path}\n{os.path.splitext(path)[0]}_summary.xlsx"
+        )
+
     def select_file(self):
         file_name, _ = QFileDialog.getOpenFileName(
             self, "Select Excel File", "", "Excel Files (*.xlsx)"
         )
         if file_name:
             self.file_path = file_name
-            self.df = read_excel(file_name,self)  # <<<<<<<< Nur hier wird geladen!
-            if self.df is None:
+            try:
+                # Nur hier wird geladen (bereits geöffnete/gecachte Dateien ohne erneutes Lesen)
+                key = self.library.open(file_name, reader=lambda p: read_excel(p, self))
+            except Exception:
                 QMessageBox.critical(self, "Error", "Could not read file.")
                 return
+            self.dataset = self.library.get(key)
             self.init_time_selection_screen()
         else:
             QMessageBox.warning(self, "Warning", "No file selected.")
 
+    # Zustand, der in Projektdateien (tlc_session) gespeichert wird
+    PROJECT_ATTRS = ("file_path", "selected_time", "selected_index", "sra_enabled", "sra_interpolate",
+                     "current_eps", "current_lol", "current_segments", "current_method", "current_ci",
+                     "results_list", "param_history", "integral_events")
+
+    def project_state(self):
+        state = {name: getattr(self, name) for name in self.PROJECT_ATTRS if hasattr(self, name)}
+        # Bootstrap-Cache: Tupel-Schlüssel als [schlüssel, wert]-Paare
+        state["ci_cache"] = [[list(k), list(v)] for k, v in getattr(self, "ci_cache", {}).items()]
+        return state
+
+    def restore_project_state(self, state):
+        for name in self.PROJECT_ATTRS:
+            if name in state:
+                setattr(self, name, state[name])
+        self.ci_cache = {
+            tuple(k): tuple(tuple(ci) if ci is not None else None for ci in v)
+            for k, v in state.get("ci_cache", [])
+        }
+
+    def open_project(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Open Project", self.output_folder, f"TLC Projects (*{PROJECT_SUFFIX})"
+        )
+        if not path:
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            dataset, state = load_project(path)
+        except Exception as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.critical(self, "Error", f"Could not open project:\n{e}")
+            return
+        QApplication.restoreOverrideCursor()
+
+        self.dataset = dataset
+        self.restore_project_state(state)
+        if state.get("source_changed"):
+            QMessageBox.warning(self, "Warning",
+                                "The source file has changed since the project was saved.\n"
+                                "Cached results were discarded and will be recomputed.")
+        if self.selected_index is None or self.selected_index >= dataset.n_times:
+            self.init_time_selection_screen()
+        else:
+            self.init_analysis_dashboard()
+
+    def save_project_dialog(self):
+        modes = [("Embedded data (compressed)", "compressed"),
+                 ("Embedded data (uncompressed, opens fastest)", "raw"),
+                 ("Reference to measurement file (smallest)", "reference")]
+        label, ok = QInputDialog.getItem(self, "Save Project", "Strain data:", [m[0] for m in modes], 0, False)
+        if not ok:
+            return
+        strain = dict(modes)[label]
+        base = os.path.splitext(os.path.basename(self.file_path or "project"))[0]
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save Project", os.path.join(self.output_folder, base + PROJECT_SUFFIX),
+            f"TLC Projects (*{PROJECT_SUFFIX})"
+        )
+        if not path:
+            return
+        if not path.endswith(PROJECT_SUFFIX):
+            path += PROJECT_SUFFIX
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            save_project(path, self.dataset, self.project_state(), strain=strain)
+        except Exception as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.critical(self, "Error", f"Save failed: {e}")
+            return
+        QApplication.restoreOverrideCursor()
+        QMessageBox.information(self, "Saved", f"Project saved.\n{path}")
+
     from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSizePolicy
 
     from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSizePolicy
@@ -522,13 +657,29 @@ class EnhancedTLCGUI(QMainWindow):
 
         layout.addLayout(desc_layout)
 
+        # SRA-Bereinigung (Strain Reading Anomalies) für alle Auswertungen
+        sra_layout = QHBoxLayout()
+        sra_layout.setSpacing(30)
+        self.sra_checkbox = QCheckBox("Mask strain reading anomalies (SRA)")
+        self.sra_checkbox.setChecked(self.sra_enabled)
+        self.sra_checkbox.setToolTip("Flags spikes that stand out from their neighbours in space and time.")
+        sra_layout.addWidget(self.sra_checkbox)
+        self.sra_interp_checkbox = QCheckBox("Interpolate flagged gauges")
+        self.sra_interp_checkbox.setChecked(self.sra_interpolate)
+        self.sra_interp_checkbox.setEnabled(self.sra_enabled)
+        self.sra_checkbox.toggled.connect(self.sra_interp_checkbox.setEnabled)
+        sra_layout.addWidget(self.sra_interp_checkbox)
+        sra_layout.addStretch()
+        layout.addLayout(sra_layout)
+
         # Buttons nur auf Englisch
         btn_layout = QHBoxLayout()
         btn_layout.setSpacing(20)
         button_defs = [
             ("Integral Peak", "Uses the time of maximum strain integral.", self.select_time_by_integral),
             ("First Measurement", "Uses first data timestamp.", self.select_time_first_row),
-            ("Manual Entry", "Enter custom time in seconds.", self.manual_time_input)
+            ("Manual Entry", "Enter custom time in seconds.", self.manual_time_input),
+            ("Heatmap", "Pick the time in the space-time strain heatmap.", self.show_heatmap_screen)
         ]
         for text, tip, slot in button_defs:
             b = QPushButton(text)
@@ -556,20 +707,36 @@ class EnhancedTLCGUI(QMainWindow):
         self.stacked_widget.addWidget(widget)
         self.stacked_widget.setCurrentWidget(widget)
 
+    def apply_sra_options(self):
+        """Übernimmt die SRA-Auswahl der Zeitwahl in den Datensatz."""
+        if hasattr(self, "sra_checkbox"):
+            self.sra_enabled = self.sra_checkbox.isChecked()
+            self.sra_interpolate = self.sra_interp_checkbox.isChecked()
+        if self.sra_enabled:
+            self.dataset.set_sra_options(interpolate=self.sra_interpolate)
+        else:
+            self.dataset.clear_sra_options()
+
     def select_time_by_integral(self):
-        df = self.df   # <<<<<<<
-        if df is None:
+        dataset = self.dataset
+        if dataset is None:
             QMessageBox.critical(self, "Error", "Data not loaded.")
             return
-        cols = df.columns[:-1]
-        df_clean = df.dropna(subset=cols, how='all')
-        _, max_t = plot_integral_with_max(df, self.output_folder, "integral_plot.pdf")
+        self.apply_sra_options()
+
+        # weitere Kandidaten (lokale Maxima, Rissbeginn, Sprünge einzelner
+        # Messstellen) zur Auswahl anbieten; das Integral wird dabei einmal
+        # berechnet und im Plot wiederverwendet
+        times, integrals, rows = integral_series(dataset)
+        events = [e for e in detect_events(times, integrals, rows=rows) if e["type"] != "drop"]
+        self.integral_events = sorted(events + detect_gauge_events(dataset), key=lambda e: e["time"])
+        _, max_t = plot_integral_with_max(dataset, self.output_folder, "integral_plot.pdf",
+                                          events=self.integral_events or None)
         if max_t is None:
             QMessageBox.critical(self, "Error", "Integral plot failed.")
             return
         self.selected_time = max_t
-        df_clean['time_diff'] = (df_clean[df.columns[-1]] - max_t).abs()
-        self.selected_row = df_clean.loc[df_clean['time_diff'].idxmin()].copy()
+        self.selected_index = nearest_row(dataset, max_t, dataset.valid_rows())
         QMessageBox.information(self, "Time Determined", f"t = {self.selected_time}")
         self.show_integral_plot_screen()
 
@@ -584,11 +751,13 @@ class EnhancedTLCGUI(QMainWindow):
         title_layout.setSpacing(50)
 
         lbl_eng = QLabel(f"Integral Plot (t = {self.selected_time:.3f} s)")
+        self.integral_title_eng = lbl_eng
         lbl_eng.setAlignment(Qt.AlignCenter)
         lbl_eng.setStyleSheet("font-size: 24px; font-weight: 300;")
         title_layout.addWidget(lbl_eng, 1)
 
         lbl_deu = QLabel(f"Integral-Plot (t = {self.selected_time:.3f} s)")
+        self.integral_title_deu = lbl_deu
         lbl_deu.setAlignment(Qt.AlignCenter)
         lbl_deu.setStyleSheet("font-size: 24px; font-weight: 300;")
         title_layout.addWidget(lbl_deu, 1)
@@ -629,6 +798,24 @@ class EnhancedTLCGUI(QMainWindow):
 
         layout.addLayout(desc_layout)
 
+        # Auswahl unter den erkannten Ereignissen (Maxima, Rissbeginn)
+        events = getattr(self, "integral_events", [])
+        if events:
+            event_layout = QHBoxLayout()
+            event_layout.addWidget(QLabel("Analysis time:"), stretch=0)
+            self.event_combo = QComboBox()
+            self.event_combo.addItem(f"Global maximum (t = {self.selected_time:.3f} s)", None)
+            names = {"peak": "Local peak", "crack": "Before crack", "gauge_jump": "Gauge jump"}
+            for e in events:
+                where = f"x = {e['position']:.3f} m, {e['n_gauges']} gauges, " if e["type"] == "gauge_jump" else ""
+                self.event_combo.addItem(
+                    f"{names.get(e['type'], e['type'])} ({where}t = {e['time']:.3f} s, Δ = {e['size']:.3g})", e)
+            self.event_combo.currentIndexChanged.connect(self.select_integral_event)
+            event_layout.addWidget(self.event_combo, stretch=1)
+            layout.addLayout(event_layout)
+            self.integral_max_time = self.selected_time
+            self.integral_max_index = self.selected_index
+
         # Plot-Bild
         img = os.path.join(self.output_folder, "integral_plot.png")
         if os.path.exists(img):
@@ -636,6 +823,7 @@ class EnhancedTLCGUI(QMainWindow):
             pl = QLabel()
             pl.setPixmap(pix)
             pl.setAlignment(Qt.AlignCenter)
+            self.integral_plot_label = pl
             layout.addWidget(pl)
         else:
             not_found = QLabel("Plot not found.")
@@ -660,6 +848,20 @@ class EnhancedTLCGUI(QMainWindow):
         self.stacked_widget.addWidget(widget)
         self.stacked_widget.setCurrentWidget(widget)
 
+    def select_integral_event(self, _=None):
+        """Übernimmt das im Integral-Plot gewählte Ereignis als Analysezeit."""
+        event = self.event_combo.currentData()
+        if event is None:
+            self.selected_time, self.selected_index = self.integral_max_time, self.integral_max_index
+        else:
+            self.selected_time, self.selected_index = event["time"], event["row"]
+        plot_integral_with_max(self.dataset, self.output_folder, "integral_plot.pdf",
+                               events=self.integral_events, selected_time=self.selected_time)
+        self.integral_title_eng.setText(f"Integral Plot (t = {self.selected_time:.3f} s)")
+        self.integral_title_deu.setText(f"Integral-Plot (t = {self.selected_time:.3f} s)")
+        if hasattr(self, "integral_plot_label"):
+            self.integral_plot_label.setPixmap(QPixmap(os.path.join(self.output_folder, "integral_plot.png")))
+
     def save_integral_plot(self):
         base = os.path.join(self.output_folder, "integral_plot")
         src_png = base + ".png"
@@ -683,30 +885,275 @@ class EnhancedTLCGUI(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Save failed: {e}")
 
+    def show_heatmap_screen(self):
+        dataset = self.dataset
+        if dataset is None:
+            QMessageBox.critical(self, "Error", "Data not loaded.")
+            return
+        self.apply_sra_options()
+
+        from PyQt5.QtGui import QCursor
+        QApplication.setOverrideCursor(QCursor(Qt.WaitCursor))
+        try:
+            pyramid = StrainPyramid.for_dataset(dataset)
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        widget = QWidget()
+        layout = QVBoxLayout()
+        layout.setContentsMargins(40, 40, 40, 40)
+        layout.setSpacing(20)
+
+        title = QLabel("Strain Heatmap – click a point to select the analysis time")
+        title.setAlignment(Qt.AlignCenter)
+        title.setStyleSheet("font-size: 24px; font-weight: 300;")
+        layout.addWidget(title)
+
+        canvas = HeatmapCanvas(dataset, pyramid, self.select_time_from_heatmap, widget)
+        toolbar = NavigationToolbar2QT(canvas, widget)
+        canvas.toolbar = toolbar
+
+        controls = QHBoxLayout()
+        controls.addWidget(toolbar, stretch=1)
+        controls.addWidget(QLabel("Show:"), stretch=0)
+        stat_combo = QComboBox()
+        for label, stat in [("Mean", "mean"), ("Max", "max"), ("Min", "min")]:
+            stat_combo.addItem(label, stat)
+        stat_combo.currentIndexChanged.connect(lambda _: canvas.set_stat(stat_combo.currentData()))
+        controls.addWidget(stat_combo, stretch=0)
+        layout.addLayout(controls)
+        layout.addWidget(canvas, stretch=1)
+
+        btn_layout = QHBoxLayout()
+        b = QPushButton("Back")
+        b.setFixedHeight(50)
+        b.setCursor(Qt.PointingHandCursor)
+        b.clicked.connect(self.init_time_selection_screen)
+        btn_layout.addWidget(b)
+        layout.addLayout(btn_layout)
+
+        widget.setLayout(layout)
+        self.stacked_widget.addWidget(widget)
+        self.stacked_widget.setCurrentWidget(widget)
+
+    def show_comparison_screen(self):
+        widget = QWidget()
+        layout = QVBoxLayout()
+        layout.setContentsMargins(40, 40, 40, 40)
+        layout.setSpacing(16)
+
+        title = QLabel("Specimen Comparison – integral curves and strain profiles at the integral peak")
+        title.setAlignment(Qt.AlignCenter)
+        title.setStyleSheet("font-size: 24px; font-weight: 300;")
+        layout.addWidget(title)
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Δε<sub>c</sub> [‰]:"), stretch=0)
+        self.compare_eps = QLineEdit(str(getattr(self, "current_eps", 0.023)))
+        self.compare_eps.setMaximumWidth(80)
+        controls.addWidget(self.compare_eps, stretch=0)
+        controls.addWidget(QLabel("l<sub>ol</sub> [mm]:"), stretch=0)
+        self.compare_lol = QLineEdit(str(getattr(self, "current_lol", 17)))
+        self.compare_lol.setMaximumWidth(80)
+        controls.addWidget(self.compare_lol, stretch=0)
+        controls.addWidget(QLabel("Mode:"), stretch=0)
+        self.compare_method = QComboBox()
+        for label, key in MODE_CHOICES:
+            self.compare_method.addItem(label, key)
+        self.compare_method.setCurrentIndex(
+            [key for _, key in MODE_CHOICES].index(getattr(self, "current_method", "histogram")))
+        controls.addWidget(self.compare_method, stretch=0)
+        self.compare_normalize = QCheckBox("Normalize integrals")
+        controls.addWidget(self.compare_normalize, stretch=0)
+        self.compare_sra = QCheckBox("Mask SRA")
+        self.compare_sra.setChecked(self.sra_enabled)
+        controls.addWidget(self.compare_sra, stretch=0)
+        b = QPushButton("Update")
+        b.setCursor(Qt.PointingHandCursor)
+        b.clicked.connect(self.update_comparison)
+        controls.addWidget(b, stretch=0)
+        controls.addStretch()
+        layout.addLayout(controls)
+
+        self.compare_error = QLabel("")
+        self.compare_error.setStyleSheet("color:red; font-size:15px;")
+        layout.addWidget(self.compare_error)
+
+        middle = QHBoxLayout()
+        side = QVBoxLayout()
+        self.compare_list = QListWidget()
+        self.compare_list.setMaximumWidth(320)
+        self.compare_list.itemChanged.connect(lambda _: self.update_comparison())
+        side.addWidget(self.compare_list, stretch=1)
+        for text, slot in (("Add Files…", self.add_comparison_files), ("Remove", self.remove_comparison_item),
+                           ("Open in Dashboard", self.open_comparison_item)):
+            b = QPushButton(text)
+            b.setCursor(Qt.PointingHandCursor)
+            b.clicked.connect(slot)
+            side.addWidget(b)
+        middle.addLayout(side, stretch=0)
+
+        self.compare_fig = Figure(figsize=(10, 8))
+        self.compare_canvas = FigureCanvasQTAgg(self.compare_fig)
+        self.compare_canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        plot_box = QVBoxLayout()
+        plot_box.addWidget(NavigationToolbar2QT(self.compare_canvas, widget))
+        plot_box.addWidget(self.compare_canvas, stretch=1)
+        middle.addLayout(plot_box, stretch=1)
+        layout.addLayout(middle, stretch=5)
+
+        headers = ["Specimen", "Time [s]", "Live End [mm]", "Dead End [mm]", "Note"]
+        self.compare_table = QTableWidget(0, len(headers))
+        self.compare_table.setHorizontalHeaderLabels(headers)
+        layout.addWidget(self.compare_table, stretch=1)
+
+        btn_layout = QHBoxLayout()
+        b = QPushButton("Back")
+        b.setFixedHeight(50)
+        b.setCursor(Qt.PointingHandCursor)
+        b.clicked.connect(self.leave_comparison)
+        btn_layout.addWidget(b)
+        layout.addLayout(btn_layout)
+
+        widget.setLayout(layout)
+        self.stacked_widget.addWidget(widget)
+        self.stacked_widget.setCurrentWidget(widget)
+        self.refresh_comparison_list()
+        self.update_comparison()
+
+    def refresh_comparison_list(self):
+        self.compare_list.blockSignals(True)
+        self.compare_list.clear()
+        for key in self.library.keys():
+            item = QListWidgetItem(self.library.name(key))
+            item.setData(Qt.UserRole, key)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked)
+            item.setToolTip(self.library.info(key)["path"] or "")
+            self.compare_list.addItem(item)
+        self.compare_list.blockSignals(False)
+
+    def add_comparison_files(self):
+        files, _ = QFileDialog.getOpenFileNames(
+            self, "Add Measurement Files", "", "Excel/CSV Files (*.xlsx *.csv)"
+        )
+        for f in files:
+            try:
+                self.library.open(f, reader=lambda p: read_excel(p, self))
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Could not read {os.path.basename(f)}:\n{e}")
+        self.refresh_comparison_list()
+        self.update_comparison()
+
+    def remove_comparison_item(self):
+        item = self.compare_list.currentItem()
+        if item is not None:
+            self.library.remove(item.data(Qt.UserRole))
+            self.refresh_comparison_list()
+            self.update_comparison()
+
+    def open_comparison_item(self):
+        """Öffnet den gewählten Probekörper in der Einzelauswertung (ohne erneutes Einlesen)."""
+        item = self.compare_list.currentItem()
+        if item is None:
+            QMessageBox.warning(self, "Warning", "No specimen selected.")
+            return
+        key = item.data(Qt.UserRole)
+        self.dataset = self.library.get(key)
+        self.file_path = self.library.info(key)["path"] or self.library.name(key)
+        self.results_list = []
+        self.ci_cache = {}
+        self.integral_events = []
+        self.selected_time = None
+        self.selected_index = None
+        self.init_time_selection_screen()
+
+    def leave_comparison(self):
+        if self.dataset is not None and self.selected_index is not None:
+            self.init_analysis_dashboard()
+        else:
+            self.init_opening_screen()
+
+    def compare_current(self):
+        """Nimmt die aktuelle Messung in den Vergleich auf und öffnet die Vergleichsansicht."""
+        if self.dataset is not None:
+            if self.file_path and os.path.isfile(self.file_path):
+                # bereits geöffnete Dateien werden nicht erneut gelesen
+                self.library.open(self.file_path, reader=lambda p: read_excel(p, self))
+            else:
+                self.library.add(self.dataset, os.path.basename(self.file_path or "current"))
+        self.show_comparison_screen()
+
+    def update_comparison(self):
+        try:
+            eps = float(self.compare_eps.text())
+            l_ol = float(self.compare_lol.text())
+        except ValueError:
+            self.compare_error.setText("Both values must be valid numbers!")
+            return
+        if eps <= 0 or l_ol <= 0:
+            self.compare_error.setText("Both values must be greater than zero!")
+            return
+        self.compare_error.setText("")
+
+        keys = [self.compare_list.item(i).data(Qt.UserRole) for i in range(self.compare_list.count())
+                if self.compare_list.item(i).checkState() == Qt.Checked]
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            results = compare_specimens(self.library, keys, eps, l_ol, self.compare_method.currentData(),
+                                        sra=self.compare_sra.isChecked())
+        finally:
+            QApplication.restoreOverrideCursor()
+        plot_comparison(results, fig=self.compare_fig, normalize=self.compare_normalize.isChecked())
+        self.compare_canvas.draw_idle()
+
+        self.compare_table.setRowCount(len(results))
+        for row_idx, r in enumerate(results):
+            cells = [r["name"], f"{r['time']:.3f}" if r["time"] is not None else "",
+                     f"{r['live_end']:.2f}" if r["live_end"] is not None else "",
+                     f"{r['dead_end']:.2f}" if r["dead_end"] is not None else "", r["error"] or ""]
+            for col, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                item.setTextAlignment(Qt.AlignCenter)
+                self.compare_table.setItem(row_idx, col, item)
+        self.compare_table.resizeColumnsToContents()
+
+    def select_time_from_heatmap(self, t):
+        dataset = self.dataset
+        self.apply_sra_options()
+        valid = dataset.valid_rows()
+        if valid.size == 0:
+            QMessageBox.critical(self, "Error", "All rows are NaN.")
+            return
+        # Ausfallzeilen (nur NaN) nicht auswählen, wie bei der Integralauswahl
+        self.selected_index = nearest_row(dataset, t, valid)
+        self.selected_time = dataset.times[self.selected_index]
+        QMessageBox.information(self, "Time Selected", f"t = {self.selected_time}")
+        self.init_analysis_dashboard()
+
     def select_time_first_row(self):
-        df = self.df  # <<<<<<<
-        if df is None:
+        dataset = self.dataset
+        if dataset is None:
             QMessageBox.critical(self, "Error", "Data not loaded.")
             return
-        first = df.iloc[0]
-        self.selected_time = first[df.columns[-1]]
-        self.selected_row = first.copy()
+        self.apply_sra_options()
+        self.selected_index = 0
+        self.selected_time = dataset.times[0]
         QMessageBox.information(self, "Time Selected", f"t = {self.selected_time}")
         self.init_analysis_dashboard()
 
     def manual_time_input(self):
-        df = self.df  # <<<<<<<
-        if df is None:
+        dataset = self.dataset
+        if dataset is None:
             QMessageBox.critical(self, "Error", "Data not loaded.")
             return
+        self.apply_sra_options()
         s, ok = QInputDialog.getText(self, "Manual Time Input", "Enter time in seconds:")
         if ok:
             try:
                 val = float(s)
-                df['time_diff'] = (df[df.columns[-1]] - val).abs()
-                self.selected_row = df.loc[df['time_diff'].idxmin()].copy()
-                time_col = df.columns[-1]
-                self.selected_time = self.selected_row[time_col]  # <-- Der echte Tabellen-Zeitwert!
+                self.selected_index = nearest_row(dataset, val)
+                self.selected_time = dataset.times[self.selected_index]  # <-- Der echte Tabellen-Zeitwert!
                 QMessageBox.information(self, "Time Selected", f"t = {self.selected_time}")
                 self.init_analysis_dashboard()
             except ValueError:
@@ -743,6 +1190,32 @@ class EnhancedTLCGUI(QMainWindow):
                 dash_self.lol_input = QLineEdit(str(getattr(parent_gui, "current_lol", 17)))
                 dash_self.lol_input.setMaximumWidth(60)
                 inputbox.addWidget(dash_self.lol_input, stretch=0)
+                inputbox.addSpacing(10)
+                inputbox.addWidget(QLabel("Segments:"), stretch=0)
+                dash_self.seg_input = QLineEdit(getattr(parent_gui, "current_segments", ""))
+                dash_self.seg_input.setPlaceholderText("all")
+                dash_self.seg_input.setToolTip(
+                    "Empty: whole fiber. 'auto': split at position gaps and near-zero strain.\n"
+                    "Manual: start:end ranges in mm, e.g. 0:500; 600:1100")
+                dash_self.seg_input.setMaximumWidth(220)
+                inputbox.addWidget(dash_self.seg_input, stretch=0)
+                inputbox.addSpacing(10)
+                inputbox.addWidget(QLabel("Mode:"), stretch=0)
+                dash_self.method_combo = QComboBox()
+                for label, key in MODE_CHOICES:
+                    dash_self.method_combo.addItem(label, key)
+                dash_self.method_combo.setCurrentIndex(
+                    [key for _, key in MODE_CHOICES].index(getattr(parent_gui, "current_method", "histogram")))
+                dash_self.method_combo.setToolTip(
+                    "Histogram: fixed Δε_c classes from 0 (paper method).\n"
+                    "Sliding window / KDE: densest Δε_c-wide strain band, incl. negative strains.")
+                inputbox.addWidget(dash_self.method_combo, stretch=0)
+                inputbox.addSpacing(10)
+                dash_self.ci_checkbox = QCheckBox("95% CI")
+                dash_self.ci_checkbox.setChecked(getattr(parent_gui, "current_ci", False))
+                dash_self.ci_checkbox.setToolTip(
+                    "Bootstrap uncertainty: 1000 replicates with gauge noise and 5% gauge dropouts.")
+                inputbox.addWidget(dash_self.ci_checkbox, stretch=0)
                 inputbox.addSpacing(16)
 
                 dash_self.confirm_btn = QPushButton("Confirm")
@@ -750,6 +1223,12 @@ class EnhancedTLCGUI(QMainWindow):
                 dash_self.confirm_btn.clicked.connect(dash_self.on_confirm)
                 dash_self.confirm_btn.setMaximumWidth(200)
                 inputbox.addWidget(dash_self.confirm_btn, stretch=0)
+                inputbox.addSpacing(10)
+                # bereits bestätigte Parameter erneut anwenden
+                dash_self.history_combo = QComboBox()
+                dash_self.history_combo.setToolTip("Previously confirmed parameters")
+                dash_self.history_combo.activated.connect(dash_self.apply_history)
+                inputbox.addWidget(dash_self.history_combo, stretch=0)
                 inputbox.addStretch()
                 top_row.addLayout(inputbox, stretch=2)
 
@@ -766,6 +1245,22 @@ class EnhancedTLCGUI(QMainWindow):
                 top_row.addWidget(recommendation, stretch=3)
                 dash_self.layout.addLayout(top_row)
 
+                # Vorschlag der stabilsten Parameter für dieses Profil
+                suggest_row = QHBoxLayout()
+                dash_self.suggest_label = QLabel("")
+                dash_self.suggest_label.setTextFormat(Qt.RichText)
+                dash_self.suggest_label.setToolTip(
+                    "Δε_c and l_ol where live and dead end change least when both parameters vary\n"
+                    "(coarse grid search with refinement around the most stable points).")
+                suggest_row.addWidget(dash_self.suggest_label, stretch=0)
+                dash_self.suggest_btn = QPushButton("Apply Suggestion")
+                dash_self.suggest_btn.setCursor(Qt.PointingHandCursor)
+                dash_self.suggest_btn.clicked.connect(dash_self.apply_suggestion)
+                suggest_row.addWidget(dash_self.suggest_btn, stretch=0)
+                suggest_row.addStretch()
+                dash_self.layout.addLayout(suggest_row)
+                dash_self.method_combo.currentIndexChanged.connect(dash_self.update_suggestion)
+
                 # Fehlerlabel
                 dash_self.error_label = QLabel("")
                 dash_self.error_label.setStyleSheet("color:red; font-size:15px; margin-bottom:0;")
@@ -774,26 +1269,25 @@ class EnhancedTLCGUI(QMainWindow):
                 # Plot ohne Erklärungstext
                 plot_and_text_layout = QHBoxLayout()
 
-                dash_self.analysis_plot_label = QLabel()
-                dash_self.analysis_plot_label.setAlignment(Qt.AlignCenter)
-                dash_self.analysis_plot_label.setStyleSheet(
-                    "background: white; border:1px solid #ddd; min-height:300px;")
-                plot_and_text_layout.addWidget(dash_self.analysis_plot_label, 1)
+                # Figur wird einmal angelegt und bei neuen Parametern nur aktualisiert
+                dash_self.tl_plot = TransferLengthPlot()
+                dash_self.analysis_canvas = FigureCanvasQTAgg(dash_self.tl_plot.fig)
+                dash_self.analysis_canvas.setMinimumHeight(300)
+                dash_self.analysis_canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+                plot_and_text_layout.addWidget(dash_self.analysis_canvas, 1)
 
                 dash_self.layout.addLayout(plot_and_text_layout, stretch=5)
 
                 # Ergebnisse-Tabelle
-                dash_self.analysis_table = QTableWidget(0, 5)
-                dash_self.analysis_table.setHorizontalHeaderLabels(
-                    ["Time [s]", "Δε₍c₎ [‰]", "l₍ol₎ [mm]", "Live End [mm]", "Dead End [mm]"]
-                )
+                dash_self.analysis_table = QTableWidget(0, len(RESULT_KEYS))
+                dash_self.analysis_table.setHorizontalHeaderLabels(RESULT_KEYS)
                 dash_self.analysis_table.horizontalHeader().setStyleSheet("font-weight: 400; font-size: 18px;")
                 dash_self.layout.addWidget(dash_self.analysis_table, stretch=1)
 
                 # BUTTONS unten
                 btns = QHBoxLayout()
 
-                btn_save = QPushButton("Save All as Excel")
+                btn_save = QPushButton("Export")
                 btn_save.setCursor(Qt.PointingHandCursor)
                 btn_save.clicked.connect(parent_gui.save_dashboard_results)
                 btns.addWidget(btn_save)
@@ -803,6 +1297,16 @@ class EnhancedTLCGUI(QMainWindow):
                 btn_save_plot.clicked.connect(dash_self.save_current_plot)
                 btns.addWidget(btn_save_plot)
 
+                btn_save_project = QPushButton("Save Project")
+                btn_save_project.setCursor(Qt.PointingHandCursor)
+                btn_save_project.clicked.connect(parent_gui.save_project_dialog)
+                btns.addWidget(btn_save_project)
+
+                btn_compare = QPushButton("Compare")
+                btn_compare.setCursor(Qt.PointingHandCursor)
+                btn_compare.clicked.connect(parent_gui.compare_current)
+                btns.addWidget(btn_compare)
+
                 btn_new_start = QPushButton("New Start")
                 btn_new_start.setCursor(Qt.PointingHandCursor)
                 btn_new_start.clicked.connect(dash_self.new_start)
@@ -820,13 +1324,12 @@ class EnhancedTLCGUI(QMainWindow):
                 # Ergebnisliste initialisieren, falls nicht vorhanden
                 if not hasattr(parent_gui, 'results_list'):
                     parent_gui.results_list = []
+                if not hasattr(parent_gui, 'param_history'):
+                    parent_gui.param_history = []
 
+                dash_self.update_suggestion()
                 dash_self.on_confirm()
 
-            def resizeEvent(dash_self, event):
-                dash_self.on_confirm()
-                super().resizeEvent(event)
-
             def on_confirm(dash_self):
                 try:
                     eps = float(dash_self.eps_input.text())
@@ -838,123 +1341,160 @@ class EnhancedTLCGUI(QMainWindow):
                 if eps <= 0 or l_ol <= 0:
                     dash_self.error_label.setText("Both values must be greater than zero!")
                     return
-                else:
-                    dash_self.error_label.setText("")
+
+                try:
+                    segments = parse_segments(dash_self.seg_input.text())
+                except ValueError as e:
+                    dash_self.error_label.setText(str(e))
+                    return
+                dash_self.error_label.setText("")
 
                 parent_gui = dash_self.parent_gui
                 parent_gui.current_eps = eps
                 parent_gui.current_lol = l_ol
-
-                # --- Robuste Auswahl der numerischen Positionsspalten ---
-                row = parent_gui.selected_row
-                deformation_cols = []
-                positions = []
-                for c in row.index[:-1]:
-                    try:
-                        f = float(str(c).strip())
-                        deformation_cols.append(c)
-                        positions.append(f)
-                    except Exception:
-                        continue
-
-                # Debug-Ausgaben (im Terminal sichtbar)
-                print("DEBUG deformation_cols:", deformation_cols)
-                print("DEBUG positions:", positions)
-                print("DEBUG row.shape:", row.shape)
-                print("DEBUG row:", row[deformation_cols].values)
-
-                if not positions:
+                parent_gui.current_segments = dash_self.seg_input.text().strip()
+                method = dash_self.method_combo.currentData()
+                parent_gui.current_method = method
+                with_ci = dash_self.ci_checkbox.isChecked()
+                parent_gui.current_ci = with_ci
+                entry = {"eps": eps, "l_ol": l_ol, "segments": parent_gui.current_segments,
+                         "method": method, "ci": with_ci}
+                if not parent_gui.param_history or parent_gui.param_history[-1] != entry:
+                    parent_gui.param_history.append(entry)
+                dash_self.update_history_combo()
+
+                # --- Profil der gewählten Zeile (numerische Positionsspalten, ohne NaN) ---
+                dataset = parent_gui.dataset
+                if np.isnan(dataset.positions).all():
                     dash_self.error_label.setText("Keine numerischen Positionsspalten erkannt!")
                     return
 
-                vals = row[deformation_cols].values
-                pts = [[v, positions[i]] for i, v in enumerate(vals) if not np.isnan(v)]
-                y_arr = np.array([p[0] for p in pts])
+                y_arr, x_arr = dataset.profile(parent_gui.selected_index)
                 if y_arr.size == 0:
                     dash_self.error_label.setText("Keine Daten in der Zeile!")
                     return
 
-                # --- Histogramm-Berechnung und Bin-Analyse ---
-                bins = np.arange(0, np.nanmax(y_arr) + eps, eps)
-                counts, _ = np.histogram(y_arr, bins=bins)
-                digs = np.digitize(y_arr, bins) - 1
-                bins_pts = [[] for _ in range(len(bins) - 1)]
-                for i, pt in enumerate(pts):
-                    bi = digs[i]
-                    if 0 <= bi < len(bins_pts):
-                        bins_pts[bi].append(pt)
-                mb = np.argmax(counts)
-                mb_vals = bins_pts[mb]
-                max_edges = (bins[mb], bins[mb + 1])
-
-                # --- Live End & Dead End Berechnung ---
-                live_end, dead_end = None, None
-                for i in range(len(mb_vals)):
-                    valid = True
-                    if i + 1 < len(mb_vals) and mb_vals[i][1] + l_ol <= mb_vals[i + 1][1]:
-                        valid = False
-                    if valid:
-                        live_end = mb_vals[i][1]
-                        break
-                for i in range(len(mb_vals) - 1, -1, -1):
-                    valid = True
-                    if i - 1 >= 0 and mb_vals[i][1] >= mb_vals[i - 1][1] + l_ol:
-                        valid = False
-                    if valid:
-                        dead_end = pts[-1][1] - mb_vals[i][1]
-                        break
-
-                parent_gui.results = {
-                    "Time [s]": parent_gui.selected_time,
-                    "Δε₍c₎ [‰]": eps,
-                    "l₍ol₎ [mm]": l_ol,
-                    "Live End [mm]": live_end,
-                    "Dead End [mm]": dead_end
-                }
-
-                # --- Ergebnisliste pflegen ---
-                already = False
-                for i, rowx in enumerate(parent_gui.results_list):
-                    if (
-                            abs(rowx["Time [s]"] - parent_gui.selected_time) < 1e-6
-                            and abs(rowx["Δε₍c₎ [‰]"] - eps) < 1e-9
-                            and abs(rowx["l₍ol₎ [mm]"] - l_ol) < 1e-9
-                    ):
-                        parent_gui.results_list[i] = parent_gui.results.copy()
-                        already = True
-                        break
-                if not already:
-                    parent_gui.results_list.append(parent_gui.results.copy())
+                # --- Histogramm, Plateau-Klasse, Live End & Dead End ---
+                try:
+                    evaluated = evaluate_profile(y_arr, x_arr, eps, l_ol, segments, method)
+                except ValueError as e:
+                    dash_self.error_label.setText(str(e))
+                    return
+                if segments is None:
+                    live_end, dead_end, max_edges = (evaluated[0]["live_end"], evaluated[0]["dead_end"],
+                                                     evaluated[0]["max_bin_edges"])
+                    seg_plot = None
+                else:
+                    live_end, dead_end, max_edges = None, None, None
+                    seg_plot = [(r["start"], r["end"], r["live_end"], r["dead_end"], r["max_bin_edges"])
+                                for r in evaluated]
+                rows = [(r["segment"], r["live_end"], r["dead_end"], r["start"], r["mask"]) for r in evaluated]
+
+                uncertainty = []
+                for segment, le, de, start, in_seg in rows:
+                    live_ci, dead_ci = None, None
+                    if with_ci:
+                        live_ci, dead_ci = dash_self.bootstrap_ci(
+                            segment, y_arr[in_seg], x_arr[in_seg], start, eps, l_ol, method)
+                    uncertainty.append((live_ci, dead_ci))
+                    parent_gui.results = {
+                        "Time [s]": parent_gui.selected_time,
+                        "Segment": segment,
+                        "Mode": method,
+                        "Δε₍c₎ [‰]": eps,
+                        "l₍ol₎ [mm]": l_ol,
+                        "Live End [mm]": le,
+                        "Dead End [mm]": de,
+                        "Live End 95% CI [mm]": f"{live_ci[0]:.1f}–{live_ci[1]:.1f}" if live_ci else "",
+                        "Dead End 95% CI [mm]": f"{dead_ci[0]:.1f}–{dead_ci[1]:.1f}" if dead_ci else ""
+                    }
+
+                    # --- Ergebnisliste pflegen ---
+                    already = False
+                    for i, rowx in enumerate(parent_gui.results_list):
+                        if (
+                                abs(rowx["Time [s]"] - parent_gui.selected_time) < 1e-6
+                                and rowx.get("Segment", "all") == segment
+                                and rowx.get("Mode", "histogram") == method
+                                and abs(rowx["Δε₍c₎ [‰]"] - eps) < 1e-9
+                                and abs(rowx["l₍ol₎ [mm]"] - l_ol) < 1e-9
+                        ):
+                            parent_gui.results_list[i] = parent_gui.results.copy()
+                            already = True
+                            break
+                    if not already:
+                        parent_gui.results_list.append(parent_gui.results.copy())
 
                 dash_self.update_results_table()
 
-                # --- Plot-Größe bestimmen ---
-                aspect_ratio = 10 / 6
-                widget_w = dash_self.analysis_plot_label.width()
-                widget_h = dash_self.analysis_plot_label.height()
-                if widget_w / aspect_ratio < widget_h:
-                    width = max(6, widget_w / 100)
-                    height = width / aspect_ratio
-                else:
-                    height = max(4, widget_h / 100)
-                    width = height * aspect_ratio
-
-                # --- Plot erzeugen und anzeigen ---
-                plot_results(
-                    pts, live_end, dead_end, l_ol, eps, max_edges,
-                    parent_gui.output_folder, parent_gui.file_path, parent_gui.selected_time,
-                    y_limits=None, figsize=(width, height)
+                # --- Plot aktualisieren (Achsen bleiben bestehen) ---
+                dash_self.tl_plot.update(
+                    y_arr, x_arr, live_end, dead_end, l_ol, eps, max_edges,
+                    segments=seg_plot, uncertainty=uncertainty if with_ci else None
                 )
-                base = os.path.splitext(os.path.basename(parent_gui.file_path))[0]
-                img = os.path.join(parent_gui.output_folder, f"{base}_transferlength.png")
-                if os.path.exists(img):
-                    pix = QPixmap(img)
-                    dash_self.analysis_plot_label.setPixmap(pix.scaled(
-                        dash_self.analysis_plot_label.size(),
-                        Qt.KeepAspectRatio, Qt.SmoothTransformation
-                    ))
-                else:
-                    dash_self.analysis_plot_label.setText("Plot not found.")
+                dash_self.analysis_canvas.draw_idle()
+
+            def bootstrap_ci(dash_self, segment, y_arr, x_arr, start, eps, l_ol, method):
+                """Bootstrap-Intervalle für Live/Dead End (je Zeit/Parameter gecacht)."""
+                parent_gui = dash_self.parent_gui
+                cache = parent_gui.__dict__.setdefault("ci_cache", {})
+                key = (parent_gui.selected_index, repr(parent_gui.dataset.sra_options),
+                       segment, eps, l_ol, method)
+                if key not in cache:
+                    n_jobs = 1 if method == "histogram" else default_n_jobs()
+                    res = bootstrap_transfer_length(y_arr, x_arr, eps, l_ol, method=method, n_jobs=n_jobs)
+                    live_ci = res["live_ci"]
+                    if live_ci is not None:
+                        live_ci = (live_ci[0] - start, live_ci[1] - start)
+                    cache[key] = (live_ci, res["dead_ci"])
+                return cache[key]
+
+            def update_suggestion(dash_self):
+                parent_gui = dash_self.parent_gui
+                dash_self.suggestion = None
+                y_arr, x_arr = parent_gui.dataset.profile(parent_gui.selected_index)
+                try:
+                    rec = recommend_parameters(y_arr, x_arr, dash_self.method_combo.currentData())
+                except ValueError:
+                    dash_self.suggest_label.setText("No stable parameter region found.")
+                    dash_self.suggest_btn.setEnabled(False)
+                    return
+                dash_self.suggestion = rec
+                dash_self.suggest_label.setText(
+                    f"Most stable for this profile: Δε<sub>c</sub> = <b>{rec['eps']:g}</b>‰, "
+                    f"l<sub>ol</sub> = <b>{rec['l_ol']:g}</b> mm "
+                    f"<span style='color:#888;'>(live/dead end vary within {rec['spread_live']:.1f} / "
+                    f"{rec['spread_dead']:.1f} mm)</span>")
+                dash_self.suggest_btn.setEnabled(True)
+
+            def apply_suggestion(dash_self):
+                rec = dash_self.suggestion
+                if rec is None:
+                    return
+                dash_self.eps_input.setText(f"{rec['eps']:g}")
+                dash_self.lol_input.setText(f"{rec['l_ol']:g}")
+                dash_self.on_confirm()
+
+            def update_history_combo(dash_self):
+                combo = dash_self.history_combo
+                combo.clear()
+                labels = dict((key, label) for label, key in MODE_CHOICES)
+                for entry in reversed(dash_self.parent_gui.param_history):
+                    text = f"Δε {entry['eps']:g} / l_ol {entry['l_ol']:g} / {labels.get(entry['method'], entry['method'])}"
+                    if entry["segments"]:
+                        text += f" / {entry['segments']}"
+                    combo.addItem(text, entry)
+
+            def apply_history(dash_self, index):
+                entry = dash_self.history_combo.itemData(index)
+                if not entry:
+                    return
+                dash_self.eps_input.setText(str(entry["eps"]))
+                dash_self.lol_input.setText(str(entry["l_ol"]))
+                dash_self.seg_input.setText(entry["segments"])
+                dash_self.method_combo.setCurrentIndex([key for _, key in MODE_CHOICES].index(entry["method"]))
+                dash_self.ci_checkbox.setChecked(entry.get("ci", False))
+                dash_self.on_confirm()
 
             def update_results_table(dash_self):
                 parent_gui = dash_self.parent_gui
@@ -962,9 +1502,7 @@ class EnhancedTLCGUI(QMainWindow):
                 for row_idx, result in enumerate(
                         parent_gui.results_list
                 ):
-                    for col, key in enumerate(
-                            ["Time [s]", "Δε₍c₎ [‰]", "l₍ol₎ [mm]", "Live End [mm]", "Dead End [mm]"]
-                    ):
+                    for col, key in enumerate(RESULT_KEYS):
                         item = QTableWidgetItem(str(result.get(key, "")))
                         item.setTextAlignment(Qt.AlignCenter)
                         dash_self.analysis_table.setItem(row_idx, col, item)
@@ -974,13 +1512,14 @@ class EnhancedTLCGUI(QMainWindow):
             def save_current_plot(dash_self):
                 parent_gui = dash_self.parent_gui
                 base = os.path.splitext(os.path.basename(parent_gui.file_path))[0]
-                src = os.path.join(parent_gui.output_folder, f"{base}_transferlength.png")
                 path, _ = QFileDialog.getSaveFileName(
-                    dash_self, "Save Transfer Length Plot", "", "PNG Files (*.png)"
+                    dash_self, "Save Transfer Length Plot",
+                    os.path.join(parent_gui.output_folder, f"{base}_transferlength.png"),
+                    "PNG Files (*.png);;PDF Files (*.pdf)"
                 )
                 if path:
                     try:
-                        shutil.copy(src, path)
+                        dash_self.tl_plot.save(path)
                         QMessageBox.information(dash_self, "Saved", "Plot saved.")
                     except Exception as e:
                         QMessageBox.critical(dash_self, "Error", f"Save failed: {e}")
@@ -989,8 +1528,13 @@ class EnhancedTLCGUI(QMainWindow):
                 # Leert die Tabelle und öffnet Dateiauswahl
                 parent_gui = dash_self.parent_gui
                 parent_gui.results_list = []
+                parent_gui.ci_cache = {}
+                parent_gui.param_history = []
+                parent_gui.integral_events = []
                 parent_gui.file_path = None
+                parent_gui.dataset = None
                 parent_gui.selected_time = None
+                parent_gui.selected_index = None
                 parent_gui.init_opening_screen()
 
         dash_widget = DashboardWidget(self)
@@ -998,6 +1542,14 @@ class EnhancedTLCGUI(QMainWindow):
         self.stacked_widget.setCurrentWidget(dash_widget)
 
     def save_dashboard_results(self):
+        label, ok = QInputDialog.getItem(self, "Export", "Export:", [c[0] for c in EXPORT_CHOICES], 0, False)
+        if not ok:
+            return
+        content = dict(EXPORT_CHOICES)[label]
+        if content != "results":
+            self.export_series(content, label)
+            return
+
         path, _ = QFileDialog.getSaveFileName(
             self, "Save Excel Results", "", "Excel Files (*.xlsx)"
         )
@@ -1012,8 +1564,70 @@ class EnhancedTLCGUI(QMainWindow):
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Save failed: {e}")
 
+    def export_series(self, content, label):
+        """
+        Exportiert Integralverlauf, Zeitverlauf von Live/Dead End (aktuelle
+        Parameter) oder eine Dehnungsmatrix blockweise als CSV/Excel in einem
+        Hintergrund-Thread (ExportWorker); der Fortschrittsdialog kann abbrechen.
+        """
+        base = os.path.splitext(os.path.basename(self.file_path or "export"))[0]
+        # Matrizen standardmäßig als CSV (Excel: langsam, höchstens 16384 Spalten)
+        filters = ["Excel Files (*.xlsx)", "CSV Files (*.csv)"]
+        if content in STRAIN_KINDS:
+            filters.reverse()
+        path, selected = QFileDialog.getSaveFileName(
+            self, f"Export {label}", os.path.join(self.output_folder, f"{base}_{content}"), ";;".join(filters)
+        )
+        if not path:
+            return
+        if os.path.splitext(path)[1].lower() not in EXPORT_FORMATS:
+            path += ".csv" if selected.startswith("CSV") else ".xlsx"
+
+        if content == "integral":
+            worker = ExportWorker(export_integral, self.dataset, path, parent=self)
+        elif content == "history":
+            worker = ExportWorker(export_time_history, self.dataset, path, getattr(self, "current_eps", 0.023),
+                                  getattr(self, "current_lol", 17), getattr(self, "current_method", "histogram"),
+                                  parent=self)
+        else:
+            worker = ExportWorker(export_strain, self.dataset, path, content, parent=self)
+
+        progress = QProgressDialog(f"Exporting {label.lower()}…", "Cancel", 0, 100, self)
+        progress.setWindowTitle("Export")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+        progress.canceled.connect(worker.cancel)
+
+        def on_progress(done, total):
+            progress.setValue(int(100 * done / total) if total else 100)
+            if progress.wasCanceled():
+                worker.cancel()
+
+        # Export im Hintergrund-Thread; die lokale Ereignisschleife hält die Oberfläche bedienbar
+        loop = QEventLoop()
+        worker.progressed.connect(on_progress)
+        worker.finished.connect(loop.quit)
+        progress.show()
+        worker.start()
+        loop.exec_()
+        progress.close()
+
+        if worker.cancelled:
+            return
+        if worker.error is not None:
+            QMessageBox.critical(self, "Error", f"Export failed: {worker.error}")
+            return
+        rows = worker.rows
+        QMessageBox.information(self, "Saved", f"{label}: {rows} rows exported.\n{path}")
+
 
 if __name__ == "__main__":
+    # Prozesspools (Bootstrap) in der gepackten Windows-Anwendung
+    import multiprocessing
+    multiprocessing.freeze_support()
+
     app = QApplication(sys.argv)
 
     app.setStyleSheet("""
@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+import corpus
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "perf: throughput guards against recorded baselines (TLC_SKIP_PERF=1 skips)")
+
+
+@pytest.fixture(scope="session")
+def example_table():
+    """Beispielmessung als Tabelle (einmal je Testlauf eingelesen)."""
+    return corpus.load_table("example")
+
+
+@pytest.fixture(scope="session")
+def example(example_table):
+    return corpus.DFOSDataset.from_dataframe(example_table, source=corpus.EXAMPLE_FILE)
+
+
+@pytest.fixture(scope="session")
+def corpus_datasets(example):
+    datasets = {"example": example}
+    for name, params in corpus.SYNTHETIC.items():
+        datasets[name] = corpus.synthetic_dataset(**params)
+    return datasets
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.environ.get("TLC_SKIP_PERF"):
+        skip = pytest.mark.skip(reason="TLC_SKIP_PERF set")
+        for item in items:
+            if "perf" in item.keywords:
+                item.add_marker(skip)
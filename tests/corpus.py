@@ -0,0 +1,159 @@
+"""
+Golden-Korpus der Regressionstests: Beispielmessung und synthetische
+Datensätze mit festen Zufallszahlen sowie die Fälle (Zeit, eps, l_ol, Modus),
+deren Ergebnisse in data/golden.json festgehalten sind.
+
+Neu erzeugen (nur bei beabsichtigter Änderung der Ergebnisse):
+    python tests/make_golden.py
+"""
+import hashlib
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from tlc_core import (  # noqa: E402
+    DFOSDataset, MODE_METHODS, integral_series, select_row, evaluate_transfer_length, evaluate_profile,
+    transfer_length_history
+)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+GOLDEN_FILE = os.path.join(DATA_DIR, "golden.json")
+EXAMPLE_FILE = os.path.join(ROOT, "dfos_data_example.xlsx")
+
+EPS_VALUES = [0.01, 0.015, 0.02, 0.023, 0.03, 0.05]
+L_OL_VALUES = [5.0, 10.0, 16.0, 17.0, 25.0, 40.0]
+METHODS = list(MODE_METHODS)
+HISTORY_STEP = 7
+
+# Name -> Parameter für synthetic_dataset
+SYNTHETIC = {
+    "synthetic_a": {"seed": 1},
+    "synthetic_nan_rows": {"seed": 2, "nan_rows": (0, 7, 50, 119)},
+    "synthetic_negative": {"seed": 3, "negative": True},
+    "synthetic_two_strands": {"seed": 4, "strands": 2},
+}
+
+
+def synthetic_dataset(seed, n_times=120, n_gauges=400, nan_rows=(), negative=False, strands=1):
+    """
+    Trapezförmige Dehnungsprofile (Anstieg über die Übertragungslänge,
+    Plateau, Abfall) mit über die Zeit wachsender Amplitude, Rauschen und
+    1 % Ausfällen. strands > 1 legt mehrere Litzen mit Lücke hintereinander.
+    """
+    rng = np.random.default_rng(seed)
+    x = np.arange(n_gauges) * 1.3
+    shape = np.zeros(n_gauges)
+    bounds = np.linspace(0, n_gauges, strands + 1).astype(int)
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        b -= (b - a) // 10 if strands > 1 else 0
+        xs = x[a:b] - x[a]
+        lt = rng.uniform(60.0, 140.0)
+        shape[a:b] = np.clip(np.minimum(xs, xs[-1] - xs) / lt, 0.0, 1.0)
+    times = np.arange(n_times) * 0.25
+    amplitude = 0.4 * (1.0 + 0.3 * times / times[-1])
+    strain = amplitude[:, None] * shape[None, :] + rng.normal(0.0, 0.004, (n_times, n_gauges))
+    strain[rng.random(strain.shape) < 0.01] = np.nan
+    strain[list(nan_rows)] = np.nan
+    if negative:
+        strain = -strain
+    return DFOSDataset(strain, x, times)
+
+
+def load_example():
+    import pandas as pd
+
+    return DFOSDataset.from_dataframe(pd.read_excel(EXAMPLE_FILE), source=EXAMPLE_FILE)
+
+
+def load_table(name):
+    """Messung als Tabelle wie in der Oberfläche eingelesen (Positionen als Spaltenköpfe, letzte Spalte Zeit)."""
+    import pandas as pd
+
+    if name == "example":
+        return pd.read_excel(EXAMPLE_FILE)
+    ds = synthetic_dataset(**SYNTHETIC[name])
+    df = pd.DataFrame(ds.strain, columns=list(ds.positions))
+    df["time"] = ds.times
+    return df
+
+
+def load_dataset(name):
+    return load_example() if name == "example" else synthetic_dataset(**SYNTHETIC[name])
+
+
+def array_digest(a):
+    return hashlib.sha256(np.ascontiguousarray(a, dtype=float).tobytes()).hexdigest()
+
+
+def case_rows(dataset):
+    """Erste und letzte gültige Zeile, Viertel, Hälfte und Integralmaximum (sofern gültig)."""
+    valid = dataset.valid_rows()
+    rows = {int(valid[0]), int(valid[-1]), int(valid[len(valid) // 4]), int(valid[len(valid) // 2])}
+    try:
+        rows.add(select_row(dataset, "max"))
+    except ValueError:
+        pass
+    return sorted(rows)
+
+
+def _num(v):
+    return None if v is None or not np.isfinite(v) else float(v)
+
+
+def evaluate_case(dataset, row, eps, l_ol, method):
+    """Ergebnis eines Falls als Liste [live_end, dead_end, band_lo, band_hi] oder Fehlername."""
+    values, positions = dataset.profile(row)
+    try:
+        live, dead, band = evaluate_transfer_length(values, positions, eps, l_ol, method)
+    except ValueError as e:
+        return {"error": type(e).__name__}
+    return [_num(live), _num(dead), _num(band[0]), _num(band[1])]
+
+
+def compute_golden(dataset):
+    """Alle festgehaltenen Ergebnisse eines Datensatzes."""
+    times, integrals, rows = integral_series(dataset)
+    out = {
+        "integral": array_digest(integrals),
+        "integral_rows": array_digest(rows),
+        "n_valid": int(rows.size),
+        "peak_row": select_row(dataset, "max"),
+        "first_row": select_row(dataset, "first"),
+        "lookup": {repr(t): select_row(dataset, t) for t in (0.0, 3.3, 12.5, 1e9)},
+        "cases": {},
+        "segments_auto": {},
+    }
+    for row in case_rows(dataset):
+        for method in METHODS:
+            out["cases"][f"{row}|{method}"] = [
+                [eps, l_ol, evaluate_case(dataset, row, eps, l_ol, method)]
+                for eps in EPS_VALUES for l_ol in L_OL_VALUES
+            ]
+        values, positions = dataset.profile(row)
+        try:
+            segs = evaluate_profile(values, positions, 0.023, 17.0, "auto")
+            out["segments_auto"][str(row)] = [[r["segment"], _num(r["live_end"]), _num(r["dead_end"])]
+                                              for r in segs]
+        except ValueError as e:
+            out["segments_auto"][str(row)] = {"error": type(e).__name__}
+
+    live, dead = transfer_length_history(dataset.strain[::HISTORY_STEP], dataset.positions, 0.023, 17.0)
+    out["history"] = {"live": [_num(v) for v in live], "dead": [_num(v) for v in dead]}
+
+    dataset.set_sra_options()
+    try:
+        _, sra_integrals, _ = integral_series(dataset)
+        out["sra_integral"] = array_digest(sra_integrals)
+        out["sra_mask_count"] = int(dataset.sra_mask().sum())
+    finally:
+        dataset.clear_sra_options()
+    return out
+
+
+def corpus_names():
+    return ["example"] + list(SYNTHETIC)
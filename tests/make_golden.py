@@ -0,0 +1,21 @@
+"""
+Schreibt data/golden.json mit den Ergebnissen der aktuellen Implementierung neu.
+
+Integral, Zeitwahl und Histogramm-Auswertung prüft test_golden.py zusätzlich
+gegen die ursprünglichen Zeilenschleifen in reference.py; diese Tests müssen
+nach dem Neuerzeugen weiter bestehen.
+"""
+import json
+import os
+
+from corpus import GOLDEN_FILE, compute_golden, corpus_names, load_dataset
+
+if __name__ == "__main__":
+    golden = {}
+    for name in corpus_names():
+        print(name)
+        golden[name] = compute_golden(load_dataset(name))
+    os.makedirs(os.path.dirname(GOLDEN_FILE), exist_ok=True)
+    with open(GOLDEN_FILE, "w", encoding="utf-8") as f:
+        json.dump(golden, f, ensure_ascii=False)
+    print(f"-> {GOLDEN_FILE}")
@@ -0,0 +1,90 @@
+"""
+Referenz-Orakel: die ursprünglichen zeilenweisen Schleifen aus TLC_DFOS.py
+(plot_integral_with_max und on_confirm im Dashboard) nahezu wörtlich, ohne
+Qt und Plot. Die Tests vergleichen tlc_core damit bitgenau, unabhängig von
+data/golden.json (das aus der aktuellen Implementierung erzeugt wird).
+
+Einzige Anpassung: np.trapz heißt in NumPy 2 np.trapezoid.
+"""
+import numpy as np
+
+_trapz = getattr(np, "trapezoid", None) or np.trapz
+
+
+def integral_loop(df):
+    """
+    Integralverlauf wie das ursprüngliche plot_integral_with_max: Zeilen, in
+    denen alle Werte NaN sind, entfallen; partielle NaNs zählen als 0.
+    Gibt (times, integrals, index) mit den DataFrame-Indizes der Zeilen zurück.
+    """
+    time_column = df.columns[-1]
+    deformation_columns = df.columns[:-1]
+    df_clean = df.dropna(subset=deformation_columns, how='all')
+
+    integrals = []
+    times = []
+    for _, row in df_clean.iterrows():
+        deformation_values = row[deformation_columns].fillna(0)
+        integrals.append(_trapz(deformation_values))
+        times.append(row[time_column])
+    return times, integrals, list(df_clean.index)
+
+
+def profile_points(row):
+    """
+    Punkte [[ε, x], ...] einer Tabellenzeile (pandas Series, letzte Spalte
+    Zeit) wie im ursprünglichen on_confirm: Spalten mit numerischem Kopf,
+    NaN-Werte ausgelassen.
+    """
+    deformation_cols = []
+    positions = []
+    for c in row.index[:-1]:
+        try:
+            f = float(str(c).strip())
+            deformation_cols.append(c)
+            positions.append(f)
+        except Exception:
+            continue
+
+    vals = row[deformation_cols].values
+    return [[v, positions[i]] for i, v in enumerate(vals) if not np.isnan(v)]
+
+
+def transfer_length_loop(pts, eps, l_ol):
+    """
+    Live/Dead End aus profile_points wie das ursprüngliche on_confirm:
+    Histogramm ab 0 mit Klassenbreite eps, Punkte der häufigsten Klasse,
+    Lücken größer l_ol überspringen. Gibt (live_end, dead_end, max_edges)
+    zurück; Fehler wie im Original (z. B. ValueError bei nur negativen
+    Dehnungen).
+    """
+    y_arr = np.array([p[0] for p in pts])
+
+    bins = np.arange(0, np.nanmax(y_arr) + eps, eps)
+    counts, _ = np.histogram(y_arr, bins=bins)
+    digs = np.digitize(y_arr, bins) - 1
+    bins_pts = [[] for _ in range(len(bins) - 1)]
+    for i, pt in enumerate(pts):
+        bi = digs[i]
+        if 0 <= bi < len(bins_pts):
+            bins_pts[bi].append(pt)
+    mb = np.argmax(counts)
+    mb_vals = bins_pts[mb]
+    max_edges = (bins[mb], bins[mb + 1])
+
+    live_end, dead_end = None, None
+    for i in range(len(mb_vals)):
+        valid = True
+        if i + 1 < len(mb_vals) and mb_vals[i][1] + l_ol <= mb_vals[i + 1][1]:
+            valid = False
+        if valid:
+            live_end = mb_vals[i][1]
+            break
+    for i in range(len(mb_vals) - 1, -1, -1):
+        valid = True
+        if i - 1 >= 0 and mb_vals[i][1] >= mb_vals[i - 1][1] + l_ol:
+            valid = False
+        if valid:
+            dead_end = pts[-1][1] - mb_vals[i][1]
+            break
+    return live_end, dead_end, max_edges
@@ -0,0 +1,178 @@
+"""Randfälle: NaN-Zeilen, eine einzige Klasse, negative Dehnungen, leere Profile."""
+import numpy as np
+import pytest
+
+import corpus
+from tlc_store import convert_to_store
+from tlc_core import (
+    DFOSDataset, MODE_METHODS, integral_series, select_row, nearest_row, evaluate_transfer_length,
+    sweep_transfer_length, transfer_length_history, evaluate_profile, EventDetector, GaugeEventDetector,
+    detect_events, detect_gauge_events, evaluate_segments, bootstrap_transfer_length
+)
+
+X = np.arange(50) * 1.3
+
+
+def test_all_nan_rows_are_skipped():
+    ds = corpus.synthetic_dataset(seed=2, nan_rows=(0, 7, 50, 119))
+    times, integrals, rows = integral_series(ds)
+    assert not np.isin([0, 7, 50, 119], rows).any()
+    assert rows.size == ds.n_times - 4
+    assert np.isfinite(integrals).all()
+    assert select_row(ds, "first") == 1
+    # Zeitsuche landet nie auf einer NaN-Zeile
+    assert select_row(ds, float(ds.times[7])) in (6, 8)
+    assert select_row(ds, float(ds.times[-1])) == 118
+
+
+def test_all_rows_nan():
+    ds = DFOSDataset(np.full((5, 4), np.nan), [0, 1, 2, 3], np.arange(5.0))
+    times, integrals, rows = integral_series(ds)
+    assert times.size == integrals.size == rows.size == 0
+    for time in ("max", "first", 2.0):
+        with pytest.raises(ValueError):
+            select_row(ds, time)
+    live, dead = transfer_length_history(ds.strain, ds.positions, 0.023, 17)
+    assert np.isnan(live).all() and np.isnan(dead).all()
+
+
+def test_partial_nan_counts_as_zero():
+    strain = np.array([[1.0, np.nan, 1.0], [1.0, 1.0, 1.0]])
+    ds = DFOSDataset(strain, [0, 1, 2], [0.0, 1.0])
+    _, integrals, _ = integral_series(ds)
+    assert integrals.tolist() == [1.0, 2.0]
+
+
+@pytest.mark.parametrize("method", list(MODE_METHODS))
+def test_single_bin_constant_profile(method):
+    # alle Werte in einer Klasse: Plateau über die ganze Faser
+    live, dead, band = evaluate_transfer_length(np.full(50, 0.1), X, 0.023, 17, method)
+    assert live == X[0]
+    assert dead == 0.0
+    assert band[0] <= 0.1 < band[1]
+
+
+def test_values_on_upper_edge_have_no_plateau():
+    # 1.0 liegt auf der letzten Klassengrenze: Häufigkeit zählt, Plateau-Punkte gibt es keine
+    values = np.ones(50)
+    live, dead, band = evaluate_transfer_length(values, X, 0.1, 17)
+    assert (live, dead) == (None, None)
+    assert evaluate_segments(values, X, [(X[0], X[24]), (X[25], X[-1])], 0.1, 17) == [(None, None, band)] * 2
+    result = bootstrap_transfer_length(values, X, 0.1, 17, n_boot=20, noise=0.0, dropout=0.0)
+    assert result["n_valid"] == 0 and result["live_ci"] is None
+
+
+@pytest.mark.parametrize("method", list(MODE_METHODS))
+def test_eps_larger_than_strains(method):
+    live, dead, _ = evaluate_transfer_length(np.full(50, 0.01), X, 0.023, 17, method)
+    assert (live, dead) == (0.0, 0.0)
+
+
+@pytest.mark.parametrize("method", list(MODE_METHODS))
+def test_single_gauge(method):
+    live, dead, _ = evaluate_transfer_length(np.array([0.2]), np.array([10.0]), 0.023, 17, method)
+    assert (live, dead) == (10.0, 0.0)
+
+
+def test_negative_strains_histogram_raises():
+    values = -np.abs(np.sin(X / 10)) - 0.1
+    with pytest.raises(ValueError):
+        evaluate_transfer_length(values, X, 0.023, 17, "histogram")
+    live, dead = transfer_length_history(values[None, :], X, 0.023, 17, "histogram")
+    assert np.isnan(live[0]) and np.isnan(dead[0])
+
+
+@pytest.mark.parametrize("method", ["window", "kde"])
+def test_negative_strains_band_estimators(method):
+    values = -np.abs(np.sin(X / 10)) - 0.1
+    live, dead, (lo, hi) = evaluate_transfer_length(values, X, 0.023, 17, method)
+    assert hi < 0
+    assert live is not None and dead is not None
+    # gespiegeltes Profil ergibt mit dem Fenster-Verfahren dieselben Positionen
+    if method == "window":
+        assert evaluate_transfer_length(-values, X, 0.023, 17, method)[:2] == (live, dead)
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        evaluate_transfer_length(np.ones(5), np.arange(5.0), 0.023, 17, "median")
+    with pytest.raises(ValueError):
+        sweep_transfer_length(np.ones(5), np.arange(5.0), [0.023], [17], "median")
+    with pytest.raises(ValueError):
+        transfer_length_history(np.ones((1, 5)), np.arange(5.0), 0.023, 17, "median")
+
+
+def test_non_numeric_columns_are_not_profile_positions():
+    strain = np.array([[0.1, 0.2, 0.3]])
+    ds = DFOSDataset(strain, [0.0, np.nan, 2.0], [0.0])
+    values, positions = ds.profile(0)
+    assert values.tolist() == [0.1, 0.3]
+    assert positions.tolist() == [0.0, 2.0]
+
+
+def test_auto_segments_without_strands():
+    with pytest.raises(ValueError):
+        evaluate_profile(np.zeros(50), X, 0.023, 17, "auto")
+
+
+def test_nearest_row_ties_pick_first():
+    ds = DFOSDataset(np.ones((3, 2)), [0, 1], [0.0, 1.0, 2.0])
+    assert nearest_row(ds, 0.5) == 0
+    assert nearest_row(ds, 1.5) == 1
+
+
+def test_flat_integral_has_no_events():
+    assert detect_events(np.arange(10.0), np.ones(10)) == []
+    assert detect_events(np.arange(10.0), np.zeros(10), chunk_size=3) == []
+    assert detect_events(np.arange(3.0), np.full(3, np.nan)) == []
+
+
+def test_streaming_equal_chunk_has_no_events():
+    detector = EventDetector(prominence=0.5, drop=0.2)
+    assert detector.feed(np.arange(4.0), [0.0, 1.0, 2.0, 2.0]) == []
+    assert detector.feed(np.arange(4.0, 8.0), np.full(4, 2.0)) == []
+    assert [e["index"] for e in detector.finish()] == [2]
+    with pytest.raises(ValueError):
+        EventDetector(prominence=0.0)
+    with pytest.raises(ValueError):
+        EventDetector(prominence=0.5, drop=0.0)
+
+
+def test_flat_matrix_has_no_gauge_events():
+    assert detect_gauge_events(DFOSDataset(np.ones((20, 5)), np.arange(5), np.arange(20.0))) == []
+    assert detect_gauge_events(DFOSDataset(np.full((4, 5), np.nan), np.arange(5), np.arange(4.0))) == []
+    with pytest.raises(ValueError):
+        GaugeEventDetector(np.arange(5), 0.0)
+
+
+def _xlsx_without_dimension(path, rows):
+    """Arbeitsblatt ohne <dimension>: openpyxl (read_only) liefert die Zeilen dann ungleich lang."""
+    import re
+    import zipfile
+
+    import openpyxl
+
+    wb = openpyxl.Workbook()
+    for row in rows:
+        wb.active.append(row)
+    wb.save(path + ".orig")
+    with zipfile.ZipFile(path + ".orig") as zin, zipfile.ZipFile(path, "w") as zout:
+        for item in zin.infolist():
+            data = zin.read(item.filename)
+            if item.filename == "xl/worksheets/sheet1.xml":
+                data = re.sub(rb"<dimension [^>]*>", b"", data)
+            zout.writestr(item, data)
+
+
+def test_excel_store_rows(tmp_path):
+    path = str(tmp_path / "rows.xlsx")
+    rows = [[0, 1.5, "time"], [True, 2.0, 0.0], [1.0, "x", 1.0], [3.0, 4.0]]
+    _xlsx_without_dimension(path, rows)
+    store = convert_to_store(path)
+    np.testing.assert_array_equal(store.rows(0, 3), [[np.nan, 2.0], [1.0, np.nan], [3.0, 4.0]])
+    np.testing.assert_array_equal(store.times, [0.0, 1.0, np.nan])
+
+    _xlsx_without_dimension(path, rows + [[1.0, 2.0, 3.0, 4.0]])
+    with pytest.raises(ValueError, match="Row 5 has 4 columns"):
+        convert_to_store(path, str(tmp_path / "bad.tlcs"))
+    assert not (tmp_path / "bad.tlcs").exists()
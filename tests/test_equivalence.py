@@ -0,0 +1,424 @@
+"""
+Gleichwertigkeit der optimierten Pfade mit den einfachen Referenzwegen:
+Sweep, Segmente, Zeitverlauf, Block-Store, Projektdateien, API und Bibliothek
+müssen Wert für Wert dieselben Ergebnisse liefern.
+"""
+import os
+import shutil
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import corpus
+from tlc_core import (
+    DFOSDataset, integral_series, select_row, evaluate_transfer_length, sweep_transfer_length,
+    transfer_length_history, evaluate_segments, _evaluate_segments_each, recommend_parameters,
+    detect_events, detect_gauge_events, event_thresholds
+)
+import tlc_api
+import tlc_kernels
+from tlc_library import DatasetLibrary, compare_specimens
+from tlc_session import save_project, load_project
+from tlc_store import (
+    convert_to_store, stream_events, stream_integral, stream_peak, stream_select_row, stream_time_history
+)
+
+
+def _same(a, b):
+    """Gleich einschließlich NaN an denselben Stellen."""
+    np.testing.assert_array_equal(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+
+
+def _profiles(ds, n=4):
+    valid = ds.valid_rows()
+    for row in valid[np.linspace(0, valid.size - 1, n).astype(int)]:
+        yield ds.profile(row)
+
+
+@pytest.fixture(scope="module")
+def synthetic():
+    return corpus.synthetic_dataset(**corpus.SYNTHETIC["synthetic_a"])
+
+
+@pytest.fixture(scope="module")
+def csv_file(tmp_path_factory):
+    """Synthetische Messung mit NaN-Zeilen als CSV (Positionen als Spaltenköpfe, letzte Spalte Zeit)."""
+    ds = corpus.synthetic_dataset(**corpus.SYNTHETIC["synthetic_nan_rows"])
+    df = pd.DataFrame(ds.strain, columns=[f"{p:g}" for p in ds.positions])
+    df["time"] = ds.times
+    path = tmp_path_factory.mktemp("csv") / "specimen.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def csv_dataset(csv_file):
+    return DFOSDataset.from_dataframe(pd.read_csv(csv_file), source=csv_file)
+
+
+@pytest.mark.parametrize("method", corpus.METHODS)
+@pytest.mark.parametrize("name", ["example", "synthetic_a", "synthetic_negative"])
+def test_sweep_matches_single_evaluations(corpus_datasets, name, method):
+    ds = corpus_datasets[name]
+    for values, positions in _profiles(ds, 3):
+        try:
+            sweep = sweep_transfer_length(values, positions, corpus.EPS_VALUES, corpus.L_OL_VALUES, method)
+        except ValueError:
+            with pytest.raises(ValueError):
+                evaluate_transfer_length(values, positions, corpus.EPS_VALUES[0], corpus.L_OL_VALUES[0], method)
+            continue
+        for i, eps in enumerate(corpus.EPS_VALUES):
+            for j, l_ol in enumerate(corpus.L_OL_VALUES):
+                live, dead, band = evaluate_transfer_length(values, positions, eps, l_ol, method)
+                assert corpus._num(live) == corpus._num(sweep["live_end"][i, j]) or \
+                    (live is None and np.isnan(sweep["live_end"][i, j]))
+                assert (dead is None and np.isnan(sweep["dead_end"][i, j])) or dead == sweep["dead_end"][i, j]
+                assert tuple(sweep["band"][i]) == tuple(band)
+
+
+@pytest.mark.parametrize("method", corpus.METHODS)
+def test_grouped_segments_match_per_segment(corpus_datasets, method):
+    ds = corpus_datasets["synthetic_two_strands"]
+    for values, positions in _profiles(ds):
+        mid = positions[positions.size // 2]
+        segments = [(positions[0], mid), (mid, positions[-1] + 1.0)]
+        for eps in corpus.EPS_VALUES:
+            for l_ol in (10.0, 17.0, 40.0):
+                grouped = evaluate_segments(values, positions, segments, eps, l_ol, method)
+                each = _evaluate_segments_each(values, positions, segments, eps, l_ol, method)
+                for (l1, d1, b1), (l2, d2, b2) in zip(grouped, each):
+                    assert (l1, d1) == (l2, d2)
+                    assert (b1 is None) == (b2 is None)
+                    if b1 is not None:
+                        assert tuple(map(float, b1)) == tuple(map(float, b2))
+
+
+@pytest.mark.parametrize("method", corpus.METHODS)
+@pytest.mark.parametrize("name", ["example", "synthetic_nan_rows", "synthetic_negative"])
+def test_history_matches_row_by_row(corpus_datasets, name, method):
+    ds = corpus_datasets[name]
+    rows = np.arange(0, ds.n_times, corpus.HISTORY_STEP)
+    live, dead = transfer_length_history(ds.strain[rows], ds.positions, 0.023, 17, method)
+    for k, row in enumerate(rows):
+        values, positions = ds.profile(row)
+        try:
+            expected = evaluate_transfer_length(values, positions, 0.023, 17, method)[:2] if values.size else (None,)*2
+        except ValueError:
+            expected = (None, None)
+        assert corpus._num(expected[0]) == corpus._num(live[k]) or (expected[0] is None and np.isnan(live[k]))
+        assert corpus._num(expected[1]) == corpus._num(dead[k]) or (expected[1] is None and np.isnan(dead[k]))
+
+
+def _history_reference(strain, positions, eps, l_ol, method):
+    live = np.full(strain.shape[0], np.nan)
+    dead = np.full(strain.shape[0], np.nan)
+    for i, row in enumerate(strain):
+        keep = ~np.isnan(positions) & ~np.isnan(row)
+        try:
+            le, de, _ = evaluate_transfer_length(row[keep], positions[keep], eps, l_ol, method)
+        except ValueError:
+            continue
+        if le is not None:
+            live[i], dead[i] = le, de
+    return live, dead
+
+
+def _random_matrices(n=120):
+    """Zufallsmatrizen mit Werten auf Klassengrenzen, negativen Zeilen, NaN, ±inf und NaN-Positionen."""
+    rng = np.random.default_rng(11)
+    for k in range(n):
+        n_gauges, n_rows = rng.integers(1, 50), rng.integers(1, 20)
+        positions = np.sort(rng.random(n_gauges) * 100)
+        positions[rng.random(n_gauges) < 0.05] = np.nan
+        eps = float(rng.choice([0.01, 0.023, 0.05, 0.25]))
+        strain = rng.normal(0.3, 0.3, (n_rows, n_gauges))
+        if k % 4 == 1:
+            strain = np.round(strain / eps) * eps
+        elif k % 4 == 2:
+            strain[: n_rows // 2] = -np.abs(strain[: n_rows // 2])
+        elif k % 4 == 3:
+            strain[:, ::2] = eps * rng.integers(0, 5, (n_rows, (n_gauges + 1) // 2))
+        strain[rng.random(strain.shape) < 0.1] = np.nan
+        if k % 10 == 0:
+            strain[0] = rng.choice([np.inf, -np.inf])
+        yield strain, positions, eps, float(rng.choice([1.0, 5.0, 17.0, 40.0]))
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_history_kernels_match_row_by_row():
+    # NumPy-Variante und Schleifenkerne (mit Numba kompiliert, sonst als Python)
+    for strain, positions, eps, l_ol in _random_matrices():
+        expected = _history_reference(strain, positions, eps, l_ol, "histogram")
+        for live, dead in (tlc_kernels._history_histogram_numpy(strain, positions, eps, l_ol, chunk_rows=3),
+                           tlc_kernels._history_histogram_loop(strain, positions, eps, l_ol)):
+            _same(live, expected[0])
+            _same(dead, expected[1])
+        live, dead = tlc_kernels._history_window_loop(strain, positions, eps, l_ol)
+        expected = _history_reference(strain, positions, eps, l_ol, "window")
+        _same(live, expected[0])
+        _same(dead, expected[1])
+
+
+@pytest.mark.parametrize("use_numba", [False, True])
+@pytest.mark.parametrize("method", corpus.METHODS)
+def test_backends_give_identical_results(corpus_datasets, monkeypatch, method, use_numba):
+    monkeypatch.setattr(tlc_kernels, "USE_NUMBA", use_numba)
+    ds = corpus_datasets["synthetic_nan_rows"]
+    rows = np.arange(0, ds.n_times, 5)
+    live, dead = transfer_length_history(ds.strain[rows], ds.positions, 0.023, 17, method)
+    expected = _history_reference(ds.strain[rows], ds.positions, 0.023, 17, method)
+    _same(live, expected[0])
+    _same(dead, expected[1])
+
+    values, positions = ds.profile(rows[-1])
+    sweep = sweep_transfer_length(values, positions, corpus.EPS_VALUES, corpus.L_OL_VALUES, method)
+    monkeypatch.setattr(tlc_kernels, "USE_NUMBA", not use_numba)
+    other = sweep_transfer_length(values, positions, corpus.EPS_VALUES, corpus.L_OL_VALUES, method)
+    _same(sweep["live_end"], other["live_end"])
+    _same(sweep["dead_end"], other["dead_end"])
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_compiled_kernels_match_numpy(corpus_datasets, monkeypatch):
+    numba = pytest.importorskip("numba")
+    monkeypatch.setattr(tlc_kernels, "USE_NUMBA", True)
+    # kompilierte Kerne (Zeitverlauf über prange), nicht die Python-Schleifen
+    for kernel in (tlc_kernels._history_histogram_loop, tlc_kernels._history_window_loop,
+                   tlc_kernels._live_dead_many_loop):
+        assert isinstance(kernel, numba.core.dispatcher.Dispatcher)
+
+    for strain, positions, eps, l_ol in _random_matrices():
+        numpy_live, numpy_dead = tlc_kernels._history_histogram_numpy(strain, positions, eps, l_ol)
+        live, dead = tlc_kernels.history(strain, positions, eps, l_ol, "histogram")
+        _same(live, numpy_live)
+        _same(dead, numpy_dead)
+        live, dead = tlc_kernels.history(strain, positions, eps, l_ol, "window")
+        expected = _history_reference(strain, positions, eps, l_ol, "window")
+        _same(live, expected[0])
+        _same(dead, expected[1])
+    assert tlc_kernels._history_histogram_loop.signatures and tlc_kernels._history_window_loop.signatures
+
+    for name, ds in corpus_datasets.items():
+        for method in ("histogram", "window"):
+            live, dead = transfer_length_history(ds.strain, ds.positions, 0.023, 17, method)
+            monkeypatch.setattr(tlc_kernels, "USE_NUMBA", False)
+            expected = transfer_length_history(ds.strain, ds.positions, 0.023, 17, method)
+            monkeypatch.setattr(tlc_kernels, "USE_NUMBA", True)
+            _same(live, expected[0])
+            _same(dead, expected[1])
+
+        values, positions = ds.profile(ds.valid_rows()[-1])
+        sweep = sweep_transfer_length(values, positions, corpus.EPS_VALUES, corpus.L_OL_VALUES)
+        monkeypatch.setattr(tlc_kernels, "USE_NUMBA", False)
+        other = sweep_transfer_length(values, positions, corpus.EPS_VALUES, corpus.L_OL_VALUES)
+        monkeypatch.setattr(tlc_kernels, "USE_NUMBA", True)
+        _same(sweep["live_end"], other["live_end"])
+        _same(sweep["dead_end"], other["dead_end"])
+    assert tlc_kernels._live_dead_many_loop.signatures
+
+
+def test_process_pool_after_compiled_kernels(tmp_path):
+    # Prozesspool nach parallelen Numba-Kernen: Kindprozesse dürfen nicht hängen
+    pytest.importorskip("numba")
+    script = tmp_path / "pool.py"
+    script.write_text(
+        "import numpy as np\n"
+        "import tlc_kernels\n"
+        "from tlc_core import bootstrap_transfer_length\n"
+        "if __name__ == '__main__':\n"
+        "    tlc_kernels.history(np.ones((50, 20)), np.arange(20.0), 0.1, 5.0, 'histogram')\n"
+        "    x = np.arange(200.0)\n"
+        "    values = np.clip(np.minimum(x, x[-1] - x) / 50, 0, 1)\n"
+        "    r = bootstrap_transfer_length(values, x, 0.1, 5.0, n_boot=600, noise=0.01, n_jobs=2)\n"
+        "    print(r['n_valid'])\n", encoding="utf-8")
+    env = dict(os.environ, PYTHONPATH=corpus.ROOT, TLC_KERNELS="")
+    done = subprocess.run([sys.executable, str(script)], env=env, capture_output=True, text=True, timeout=300)
+    assert done.returncode == 0, done.stderr
+    assert int(done.stdout) > 0
+
+
+def test_store_streaming_matches_memory(csv_file, csv_dataset, tmp_path):
+    store = convert_to_store(csv_file, str(tmp_path / "specimen.tlcs"), block_rows=16)
+    assert store.n_blocks > 1
+    _same(store.rows(0, store.n_times), csv_dataset.strain)
+
+    times, integrals, rows = integral_series(csv_dataset)
+    s_times, s_integrals, s_rows = stream_integral(store)
+    _same(s_integrals, integrals)
+    _same(s_times, times)
+    assert s_rows.tolist() == rows.tolist()
+
+    row = select_row(csv_dataset, "max")
+    assert stream_peak(store)[0] == row
+    for time in ("max", "first", float(csv_dataset.times[7]), float(csv_dataset.times[-1]), 1e9):
+        assert stream_select_row(store, time) == select_row(csv_dataset, time)
+
+    history = stream_time_history(store, 0.023, 17, step=corpus.HISTORY_STEP)
+    rows = np.arange(0, csv_dataset.n_times, corpus.HISTORY_STEP)
+    assert history["rows"].tolist() == rows.tolist()
+    live, dead = transfer_length_history(csv_dataset.strain[rows], csv_dataset.positions, 0.023, 17)
+    _same(history["live_end"], live)
+    _same(history["dead_end"], dead)
+
+
+def test_store_without_cached_integral(csv_file, csv_dataset, tmp_path):
+    # Spitzen- und Zeitsuche direkt über die Blöcke (ohne integral.npz)
+    store = convert_to_store(csv_file, str(tmp_path / "fresh.tlcs"), block_rows=7)
+    row = select_row(csv_dataset, "max")
+    assert stream_peak(store)[0] == row
+    # "max" liest die Blöcke nur einmal
+    reads = []
+    iter_blocks = store.iter_blocks
+    store.iter_blocks = lambda progress=None: reads.append(1) or iter_blocks(progress)
+    assert stream_select_row(store, "max") == row
+    assert len(reads) == 1
+    del store.iter_blocks
+    assert stream_select_row(store, "first") == select_row(csv_dataset, "first")
+    assert stream_select_row(store, float(csv_dataset.times[50])) == select_row(csv_dataset, float(csv_dataset.times[50]))
+
+
+@pytest.fixture(scope="module")
+def cracking(tmp_path_factory):
+    """Zwei Lastzyklen, Riss (Abfall) im zweiten, Sprünge an einzelnen Messstellen, NaN-Zeilen."""
+    rng = np.random.default_rng(11)
+    n, positions = 300, np.linspace(0, 0.5, 50)
+    load = np.concatenate([np.linspace(0, 1, 80), np.linspace(1, 0.3, 60), np.linspace(0.3, 1.5, 100),
+                           np.full(60, 0.6)])
+    strain = load[:, None] * np.sin(np.pi * positions / 0.5)[None, :] + rng.normal(0, 0.002, (n, 50))
+    strain[200:, 20] += 0.8
+    strain[260:, 31:33] -= 0.9
+    strain[[50, 51, 120]] = np.nan
+    ds = DFOSDataset(strain, positions, np.arange(n) * 2.0)
+    df = pd.DataFrame(strain, columns=[f"{p:g}" for p in positions])
+    df["time"] = ds.times
+    path = tmp_path_factory.mktemp("cracking") / "cracking.csv"
+    df.to_csv(path, index=False)
+    return ds, str(path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64])
+def test_events_stream_like_full_series(cracking, chunk_size):
+    ds, _ = cracking
+    times, integrals, rows = integral_series(ds)
+    full = detect_events(times, integrals, rows=rows, chunk_size=times.size)
+    assert {"peak", "crack", "drop"} <= {e["type"] for e in full}
+    assert detect_events(times, integrals, rows=rows, chunk_size=chunk_size) == full
+    assert all(e["row"] == rows[e["index"]] for e in full)
+
+    # Einzelsprünge und der Lastabfall (Zeile 240) an fast allen Messstellen
+    gauges = detect_gauge_events(ds, chunk_rows=ds.n_times)
+    assert [e["row"] for e in gauges] == [200, 240, 260]
+    assert gauges[0]["position"] == ds.positions[20] and gauges[0]["n_gauges"] == 1
+    assert gauges[1]["n_gauges"] > 30
+    assert gauges[2]["position"] in ds.positions[31:33] and gauges[2]["n_gauges"] == 2
+    assert detect_gauge_events(ds, chunk_rows=chunk_size) == gauges
+
+
+@pytest.mark.parametrize("block_rows", [1, 16])
+def test_store_events_match_memory(cracking, tmp_path, block_rows):
+    _, path = cracking
+    ds = DFOSDataset.from_dataframe(pd.read_csv(path))
+    store = convert_to_store(path, str(tmp_path / "cracking.tlcs"), block_rows=block_rows)
+    times, integrals, rows = integral_series(ds)
+    expected = detect_events(times, integrals, rows=rows)
+    threshold = 0.5
+    gauges = detect_gauge_events(ds, threshold)
+
+    # Schwellen aus dem Verlauf, danach ein Durchlauf über die Blöcke für beide Detektoren
+    streamed, streamed_gauges = stream_events(store, gauge_threshold=threshold)
+    assert streamed == expected and streamed_gauges == gauges
+    prominence, drop = event_thresholds(integrals)
+    assert stream_events(store, prominence, drop) == (expected, [])
+
+
+@pytest.mark.filterwarnings("ignore:All-NaN slice:RuntimeWarning")
+@pytest.mark.parametrize("mode", ["compressed", "raw", "reference"])
+def test_project_round_trip(csv_file, mode, tmp_path):
+    ds = DFOSDataset.from_dataframe(pd.read_csv(csv_file), source=csv_file)
+    ds.set_sra_options()
+    times, integrals, rows = integral_series(ds)
+    state = {"eps": 0.023, "l_ol": 17.0, "history": [(0.023, 17.0)]}
+    path = str(tmp_path / f"project_{mode}.tlcp")
+    save_project(path, ds, state, strain=mode, chunk_rows=32)
+
+    loaded, loaded_state = load_project(path)
+    _same(loaded.strain, ds.strain)
+    _same(loaded.positions, ds.positions)
+    _same(loaded.times, ds.times)
+    assert loaded.sra_options == ds.sra_options
+    assert loaded_state["eps"] == 0.023 and loaded_state["history"] == [[0.023, 17.0]]
+    l_times, l_integrals, l_rows = integral_series(loaded)
+    _same(l_integrals, integrals)
+    assert l_rows.tolist() == rows.tolist()
+    np.testing.assert_array_equal(loaded.sra_mask(), ds.sra_mask())
+
+
+def test_api_uses_arrays_without_copy(synthetic):
+    strain = np.ascontiguousarray(synthetic.strain)
+    ds = tlc_api.from_arrays(strain, synthetic.positions, synthetic.times)
+    assert np.shares_memory(ds.strain, strain)
+    times, integrals = tlc_api.integral(ds)
+    _same(integrals, integral_series(synthetic)[1])
+    row, t = tlc_api.select_time(ds)
+    assert row == select_row(synthetic, "max")
+    res = tlc_api.evaluate(ds, eps=0.023, l_ol=17, row=row)[0]
+    values, positions = synthetic.profile(row)
+    live, dead, band = evaluate_transfer_length(values, positions, 0.023, 17)
+    assert (res["live_end"], res["dead_end"]) == (live, dead)
+
+
+def test_recommendation_is_reproducible(example):
+    values, positions = example.profile(select_row(example, "max"))
+    rec = recommend_parameters(values, positions)
+    live, dead, _ = evaluate_transfer_length(values, positions, rec["eps"], rec["l_ol"])
+    assert (rec["live_end"], rec["dead_end"]) == (live, dead)
+    grid = rec["coarse"]
+    direct = sweep_transfer_length(values, positions, grid["eps"], grid["l_ol"])
+    _same(grid["live_end"], direct["live_end"])
+    assert recommend_parameters(values, positions)["eps"] == rec["eps"]
+
+
+def test_library_eviction_reloads_identical_data(csv_file, csv_dataset, synthetic, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    library = DatasetLibrary(max_datasets=1, cache_dir=cache_dir)
+    key = library.open(csv_file)
+    assert library.open(csv_file) == key
+    assert not os.path.exists(cache_dir)         # erst beim Verdrängen geschrieben
+    other = library.add(synthetic, "synthetic")
+    assert not library.is_loaded(key)            # verdrängt, Datei im Cache-Verzeichnis
+    assert library.is_loaded(other)              # ohne Cache-Datei bleibt im Speicher
+    assert len(os.listdir(cache_dir)) == 1
+    assert not os.path.exists(csv_file + ".tlc_cache")
+
+    reloaded = library.get(key)
+    _same(reloaded.strain, csv_dataset.strain)
+    _same(integral_series(reloaded)[1], integral_series(csv_dataset)[1])
+
+    # neue Sitzung: aus dem Cache-Verzeichnis, ohne die CSV-Datei zu lesen
+    def fail(path):
+        raise AssertionError("source file read again")
+    fresh = DatasetLibrary(cache_dir=cache_dir)
+    _same(fresh.get(fresh.open(csv_file, reader=fail)).strain, csv_dataset.strain)
+
+    result = compare_specimens(library, [key, other], 0.023, 17)
+    for entry, ds in zip(result, (csv_dataset, synthetic)):
+        values, positions = ds.profile(select_row(ds, "max"))
+        assert (entry["live_end"], entry["dead_end"]) == evaluate_transfer_length(values, positions, 0.023, 17)[:2]
+
+
+def test_library_replaces_outdated_cache(csv_file, synthetic, tmp_path):
+    source = str(tmp_path / "specimen.csv")
+    shutil.copy(csv_file, source)
+    cache_dir = str(tmp_path / "cache")
+    library = DatasetLibrary(max_datasets=1, cache_dir=cache_dir)
+    library.open(source)
+    library.add(synthetic, "synthetic")
+    old = os.listdir(cache_dir)
+    st = os.stat(source)
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    library.open(source)
+    library.add(corpus.synthetic_dataset(seed=9), "other")
+    assert len(os.listdir(cache_dir)) == 1 and os.listdir(cache_dir) != old
@@ -0,0 +1,140 @@
+"""Tabellen-Export: CSV bitgenau, Excel auf Folgeblättern, Stores, Abbruch."""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import corpus
+import tlc_export
+from tlc_core import DFOSDataset, integral_series, transfer_length_history
+from tlc_export import (
+    ExportCancelled, TableWriter, export_integral, export_time_history, export_strain, STRAIN_KINDS
+)
+from tlc_store import convert_to_store
+
+pytestmark = pytest.mark.filterwarnings("ignore:All-NaN slice:RuntimeWarning")
+
+
+def _read(path, **kwargs):
+    if path.endswith(".csv"):
+        return pd.read_csv(path, float_precision="round_trip", **kwargs)
+    return pd.read_excel(path, **kwargs)
+
+
+@pytest.fixture
+def dataset():
+    ds = corpus.synthetic_dataset(**corpus.SYNTHETIC["synthetic_nan_rows"])
+    ds.set_sra_options()
+    return ds
+
+
+def test_integral_csv_round_trip(dataset, tmp_path):
+    path = str(tmp_path / "integral.csv")
+    assert export_integral(dataset, path) == dataset.n_times - 4
+    df = _read(path)
+    times, integrals, rows = integral_series(dataset)
+    assert list(df.columns) == ["Row", "Time [s]", "Integral [‰]"]
+    np.testing.assert_array_equal(df["Row"], rows)
+    np.testing.assert_array_equal(df["Time [s]"], times)
+    np.testing.assert_array_equal(df["Integral [‰]"], integrals)
+
+
+def test_excel_continues_on_new_sheets(dataset, tmp_path, monkeypatch):
+    monkeypatch.setattr(tlc_export, "EXCEL_MAX_ROWS", 40)
+    monkeypatch.setattr(tlc_export, "EXPORT_CHUNK_ROWS", 25)
+    path = str(tmp_path / "integral.xlsx")
+    export_integral(dataset, path)
+    sheets = pd.read_excel(path, sheet_name=None)
+    _, integrals, rows = integral_series(dataset)
+    n_sheets = -(-rows.size // 39)
+    assert n_sheets > 2
+    assert list(sheets) == ["Integral"] + [f"Integral ({i})" for i in range(2, n_sheets + 1)]
+    assert [len(df) for df in sheets.values()] == [39] * (n_sheets - 1) + [rows.size - 39 * (n_sheets - 1)]
+    df = pd.concat(sheets.values(), ignore_index=True)
+    np.testing.assert_array_equal(df["Row"], rows)
+    # openpyxl schreibt 16 signifikante Stellen
+    np.testing.assert_allclose(df["Integral [‰]"], integrals, rtol=1e-15, atol=0)
+
+
+@pytest.mark.parametrize("ext", [".csv", ".xlsx"])
+def test_time_history(dataset, tmp_path, ext):
+    path = str(tmp_path / f"history{ext}")
+    assert export_time_history(dataset, path, 0.023, 17, step=3) == len(range(0, dataset.n_times, 3))
+    df = _read(path)
+    live, dead = transfer_length_history(dataset.analysis_strain()[::3], dataset.positions, 0.023, 17)
+    np.testing.assert_array_equal(df["Row"], np.arange(0, dataset.n_times, 3))
+    np.testing.assert_allclose(df["Live End [mm]"], live, rtol=1e-15, atol=0)
+    np.testing.assert_allclose(df["Dead End [mm]"], dead, rtol=1e-15, atol=0)
+
+
+@pytest.mark.parametrize("kind", list(STRAIN_KINDS))
+def test_strain_matrix_reopens_as_dataset(dataset, tmp_path, kind):
+    path = str(tmp_path / f"{kind}.csv")
+    export_strain(dataset, path, kind)
+    back = DFOSDataset.from_dataframe(_read(path))
+    expected = {"raw": dataset.strain, "masked": dataset.cleaned_strain(),
+                "cleaned": dataset.cleaned_strain(interpolate=True), "mask": dataset.sra_mask()}[kind]
+    np.testing.assert_array_equal(back.strain, expected.astype(float))
+    np.testing.assert_array_equal(back.positions, dataset.positions)
+    np.testing.assert_array_equal(back.times, dataset.times)
+
+
+def test_store_source(tmp_path):
+    ds = corpus.synthetic_dataset(**corpus.SYNTHETIC["synthetic_a"])
+    export_strain(ds, str(tmp_path / "raw.csv"), "raw")
+    store = convert_to_store(str(tmp_path / "raw.csv"), str(tmp_path / "raw.tlcs"), block_rows=16)
+    export_strain(store, str(tmp_path / "copy.csv"), "raw")
+    np.testing.assert_array_equal(DFOSDataset.from_dataframe(_read(str(tmp_path / "copy.csv"))).strain,
+                                  store.rows(0, store.n_times))
+    # blockweise aus dem Store wie aus dem Speicher
+    export_time_history(store, str(tmp_path / "history.csv"), 0.023, 17, step=5)
+    export_time_history(store.to_dataset(), str(tmp_path / "history_mem.csv"), 0.023, 17, step=5)
+    assert (tmp_path / "history.csv").read_text() == (tmp_path / "history_mem.csv").read_text()
+    with pytest.raises(ValueError):
+        export_strain(store, str(tmp_path / "masked.csv"), "masked")
+
+
+def test_cancel_leaves_no_file(dataset, tmp_path, monkeypatch):
+    monkeypatch.setattr(tlc_export, "EXPORT_CHUNK_ROWS", 10)
+    path = str(tmp_path / "history.xlsx")
+    calls = []
+
+    def progress(done, total):
+        calls.append(done)
+        return len(calls) < 2
+
+    with pytest.raises(ExportCancelled):
+        export_integral(dataset, path, progress)
+    assert calls == [10, 20]
+    assert os.listdir(tmp_path) == []
+
+
+def test_format_and_column_limits(tmp_path, monkeypatch):
+    with pytest.raises(ValueError):
+        TableWriter(str(tmp_path / "a.parquet"), ["x"])
+    monkeypatch.setattr(tlc_export, "EXCEL_MAX_COLUMNS", 3)
+    with pytest.raises(ValueError, match="CSV"):
+        TableWriter(str(tmp_path / "a.xlsx"), ["a", "b", "c", "d"])
+
+
+def test_failed_replace_removes_temp_file(dataset, tmp_path, monkeypatch):
+    def locked(src, dst):
+        raise PermissionError("target is open in another program")
+    monkeypatch.setattr(tlc_export.os, "replace", locked)
+    for ext in (".csv", ".xlsx"):
+        with pytest.raises(PermissionError):
+            export_integral(dataset, str(tmp_path / f"integral{ext}"))
+    assert os.listdir(tmp_path) == []
+
+
+def test_row_wise_history_reports_often(dataset, tmp_path, monkeypatch):
+    monkeypatch.setattr(tlc_export, "ROW_WISE_CHUNK_ROWS", 10)
+    calls = []
+    path = str(tmp_path / "history.csv")
+    export_time_history(dataset, path, 0.023, 17, "kde", progress=lambda done, total: calls.append(done))
+    assert np.diff([0] + calls).max() <= 10 and calls[-1] == dataset.n_times
+    live, dead = transfer_length_history(dataset.analysis_strain(), dataset.positions, 0.023, 17, "kde")
+    df = _read(path)
+    np.testing.assert_array_equal(df["Live End [mm]"], live)
+    np.testing.assert_array_equal(df["Dead End [mm]"], dead)
@@ -0,0 +1,133 @@
+"""
+Ergebnisse auf dem Golden-Korpus (data/golden.json) müssen bitgenau gleich
+bleiben, wenn Kernfunktionen durch schnellere Implementierungen ersetzt werden.
+
+golden.json wird aus der aktuellen Implementierung erzeugt; Integral,
+Zeitwahl und Histogramm-Auswertung werden zusätzlich direkt mit den
+ursprünglichen Zeilenschleifen (reference.py) verglichen.
+"""
+import json
+
+import numpy as np
+import pytest
+
+import corpus
+import reference
+from tlc_core import integral_series, select_row, evaluate_profile, transfer_length_history
+
+
+@pytest.fixture(scope="module")
+def golden():
+    with open(corpus.GOLDEN_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("name", corpus.corpus_names())
+def test_integral_and_time_selection(name, corpus_datasets, golden):
+    ds, ref = corpus_datasets[name], golden[name]
+    _, integrals, rows = integral_series(ds)
+    assert corpus.array_digest(integrals) == ref["integral"]
+    assert corpus.array_digest(rows) == ref["integral_rows"]
+    assert rows.size == ref["n_valid"]
+    assert select_row(ds, "max") == ref["peak_row"]
+    assert select_row(ds, "first") == ref["first_row"]
+    for t, row in ref["lookup"].items():
+        assert select_row(ds, float(t)) == row, t
+
+
+@pytest.mark.parametrize("method", corpus.METHODS)
+@pytest.mark.parametrize("name", corpus.corpus_names())
+def test_transfer_length_cases(name, method, corpus_datasets, golden):
+    ds, ref = corpus_datasets[name], golden[name]
+    mismatches = []
+    n = 0
+    for key, cases in ref["cases"].items():
+        row, case_method = key.split("|")
+        if case_method != method:
+            continue
+        for eps, l_ol, expected in cases:
+            n += 1
+            got = corpus.evaluate_case(ds, int(row), eps, l_ol, method)
+            if isinstance(expected, dict) or isinstance(got, dict):
+                ok = got == expected
+            else:
+                # Live/Dead End bitgenau; die KDE-Bandgrenzen stammen aus einer FFT
+                ok = got[:2] == expected[:2] and (
+                    got[2:] == expected[2:] if method != "kde" else got[2:] == pytest.approx(expected[2:], rel=1e-12))
+            if not ok:
+                mismatches.append((row, eps, l_ol, expected, got))
+    assert n > 0
+    assert not mismatches, f"{len(mismatches)}/{n} cases differ, first: {mismatches[:3]}"
+
+
+@pytest.mark.parametrize("name", corpus.corpus_names())
+def test_auto_segments(name, corpus_datasets, golden):
+    ds, ref = corpus_datasets[name], golden[name]
+    for row, expected in ref["segments_auto"].items():
+        values, positions = ds.profile(int(row))
+        try:
+            got = [[r["segment"], corpus._num(r["live_end"]), corpus._num(r["dead_end"])]
+                   for r in evaluate_profile(values, positions, 0.023, 17.0, "auto")]
+        except ValueError as e:
+            got = {"error": type(e).__name__}
+        assert got == expected, row
+
+
+@pytest.mark.parametrize("name", corpus.corpus_names())
+def test_time_history(name, corpus_datasets, golden):
+    ds, ref = corpus_datasets[name], golden[name]
+    live, dead = transfer_length_history(ds.strain[::corpus.HISTORY_STEP], ds.positions, 0.023, 17.0)
+    assert [corpus._num(v) for v in live] == ref["history"]["live"]
+    assert [corpus._num(v) for v in dead] == ref["history"]["dead"]
+
+
+@pytest.mark.filterwarnings("ignore:All-NaN slice")
+@pytest.mark.parametrize("name", corpus.corpus_names())
+def test_sra_cleaned_integral(name, corpus_datasets, golden):
+    ds, ref = corpus_datasets[name], golden[name]
+    ds.set_sra_options()
+    try:
+        _, integrals, _ = integral_series(ds)
+        assert corpus.array_digest(integrals) == ref["sra_integral"]
+        assert int(ds.sra_mask().sum()) == ref["sra_mask_count"]
+    finally:
+        ds.clear_sra_options()
+
+
+@pytest.fixture(scope="module")
+def tables(example_table):
+    return {name: example_table if name == "example" else corpus.load_table(name) for name in corpus.corpus_names()}
+
+
+@pytest.mark.parametrize("name", corpus.corpus_names())
+def test_integral_matches_original_loop(name, corpus_datasets, tables):
+    ds = corpus_datasets[name]
+    ref_times, ref_integrals, ref_index = reference.integral_loop(tables[name])
+    times, integrals, rows = integral_series(ds)
+    assert rows.tolist() == ref_index
+    assert corpus.array_digest(integrals) == corpus.array_digest(ref_integrals)
+    assert corpus.array_digest(times) == corpus.array_digest(ref_times)
+    # Zeit vor Riss: erste Zeile mit dem größten Integral
+    assert select_row(ds, "max") == ref_index[int(np.argmax(ref_integrals))]
+
+
+@pytest.mark.parametrize("name", corpus.corpus_names())
+def test_histogram_matches_original_loop(name, corpus_datasets, tables):
+    ds, df = corpus_datasets[name], tables[name]
+    rows = sorted(set(corpus.case_rows(ds)) | set(ds.valid_rows()[::10].tolist()))
+    mismatches = []
+    n = 0
+    for row in rows:
+        pts = reference.profile_points(df.iloc[row])
+        for eps in corpus.EPS_VALUES:
+            for l_ol in corpus.L_OL_VALUES:
+                n += 1
+                try:
+                    live, dead, edges = reference.transfer_length_loop(pts, eps, l_ol)
+                    expected = [corpus._num(live), corpus._num(dead), corpus._num(edges[0]), corpus._num(edges[1])]
+                except ValueError as e:
+                    expected = {"error": type(e).__name__}
+                got = corpus.evaluate_case(ds, row, eps, l_ol, "histogram")
+                if got != expected:
+                    mismatches.append((row, eps, l_ol, expected, got))
+    assert not mismatches, f"{len(mismatches)}/{n} cases differ, first: {mismatches[:3]}"
@@ -0,0 +1,130 @@
+"""
+Durchsatz-Wächter für die Auswertungsstufen.
+
+Jede Stufe wird mehrfach gemessen (bester Lauf zählt) und mit dem in
+data/perf_baselines.json festgehaltenen Durchsatz verglichen; der Test schlägt
+fehl, wenn weniger als TLC_PERF_TOLERANCE (Standard 0.5) davon erreicht wird.
+Die Werte hängen vom Rechner ab; nach einem Rechnerwechsel oder einer
+beabsichtigten Änderung neu aufnehmen:
+
+    python tests/test_performance.py --record
+
+TLC_SKIP_PERF=1 überspringt die Wächter (z. B. auf ausgelasteten CI-Rechnern).
+"""
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+import corpus
+from tlc_core import (
+    integral_series, select_row, nearest_row, evaluate_transfer_length, sweep_transfer_length, detect_sra,
+    transfer_length_history, recommend_parameters
+)
+
+BASELINE_FILE = os.path.join(corpus.DATA_DIR, "perf_baselines.json")
+REPEATS = 5
+
+
+def _best_rate(fn, units, repeats=REPEATS):
+    """Einheiten pro Sekunde im schnellsten von repeats Läufen."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return units / max(best, 1e-9)
+
+
+def _stages(ds):
+    """Stufenname -> (Funktion, Einheiten je Aufruf, Einheit)."""
+    values, positions = ds.profile(select_row(ds, "max"))
+    eps = np.linspace(0.01, 0.05, 21)
+    l_ol = np.linspace(4, 40, 19)
+    rows = ds.valid_rows()
+    lookups = ds.times[rows][:: max(rows.size // 200, 1)]
+
+    def integral():
+        ds.clear_cache("integral")
+        integral_series(ds)
+
+    def select():
+        # Zeitwahl einschließlich Integral (sonst nur Nachschlagen im Cache)
+        ds.clear_cache("integral")
+        select_row(ds, "max")
+
+    def lookup():
+        for t in lookups:
+            nearest_row(ds, t)
+
+    return {
+        "integral_series": (integral, ds.n_times, "rows/s"),
+        "evaluate_transfer_length": (lambda: evaluate_transfer_length(values, positions, 0.023, 17), 1, "calls/s"),
+        "sweep_transfer_length": (lambda: sweep_transfer_length(values, positions, eps, l_ol), eps.size * l_ol.size,
+                                  "points/s"),
+        "detect_sra": (lambda: detect_sra(ds.strain), ds.strain.size, "values/s"),
+        "transfer_length_history": (lambda: transfer_length_history(ds.strain, ds.positions, 0.023, 17), ds.n_times,
+                                    "rows/s"),
+        "nearest_row": (lookup, lookups.size, "lookups/s"),
+        "select_row": (select, 1, "calls/s"),
+        "recommend_parameters": (lambda: recommend_parameters(values, positions), 1, "calls/s"),
+    }
+
+
+def _baselines():
+    if not os.path.exists(BASELINE_FILE):
+        return {}
+    with open(BASELINE_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+STAGES = ["integral_series", "evaluate_transfer_length", "sweep_transfer_length", "detect_sra",
+          "transfer_length_history", "nearest_row", "select_row", "recommend_parameters"]
+
+
+@pytest.fixture(scope="module")
+def stages(example):
+    return _stages(example)
+
+
+def test_stages_recompute(example):
+    # die Wächter messen Berechnungen, keine Cache-Treffer
+    first = integral_series(example)[1]
+    example.clear_cache("integral")
+    assert integral_series(example)[1] is not first
+    assert integral_series(example)[1] is integral_series(example)[1]
+
+
+@pytest.mark.perf
+@pytest.mark.filterwarnings("ignore:All-NaN slice:RuntimeWarning")
+@pytest.mark.parametrize("stage", STAGES)
+def test_throughput(stages, stage):
+    baseline = _baselines().get(stage)
+    if baseline is None:
+        pytest.skip("no baseline recorded (python tests/test_performance.py --record)")
+    fn, units, unit = stages[stage]
+    tolerance = float(os.environ.get("TLC_PERF_TOLERANCE", "0.5"))
+    rate = _best_rate(fn, units)
+    assert rate >= baseline * tolerance, f"{stage}: {rate:.4g} {unit} < {tolerance:g} × {baseline:.4g} {unit}"
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    stages = _stages(corpus.load_example())
+    rates = {}
+    for name, (fn, units, unit) in stages.items():
+        rates[name] = _best_rate(fn, units)
+        print(f"{name:28s} {rates[name]:12.4g} {unit}")
+    if "--record" in argv:
+        os.makedirs(corpus.DATA_DIR, exist_ok=True)
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            json.dump({k: float(f"{v:.4g}") for k, v in rates.items()}, f, indent=1)
+            f.write("\n")
+        print(f"written to {BASELINE_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""TransferLengthPlot: wiederholtes update() ersetzt alle Artists des vorherigen Ergebnisses (Agg, ohne Qt)."""
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import to_rgba
+
+from tlc_plots import TransferLengthPlot
+
+
+def _profile(n, peak):
+    x = np.linspace(0.0, 200.0, n)
+    return np.minimum(np.minimum(x, x[-1] - x) / 50.0, 1.0) * peak, x
+
+
+def test_update_replaces_previous_result():
+    plot = TransferLengthPlot()
+    canvas = FigureCanvasAgg(plot.fig)
+
+    y1, x1 = _profile(101, 1.0)
+    plot.update(y1, x1, 40.0, 45.0, 17, 0.1, (0.9, 1.0),
+                uncertainty=[((35.0, 45.0), (40.0, 50.0))])
+    canvas.draw()
+    assert len(plot.end_lines.get_segments()) == 2 and len(plot.ci_spans.get_paths()) == 2
+
+    y2, x2 = _profile(61, 2.0)
+    x2 = x2 * 2
+    segments = [(0.0, 200.0, 30.0, None, (1.5, 2.0)), (200.0, 400.0, 60.0, 70.0, None)]
+    plot.update(y2, x2, None, None, 20, 0.5, None, segments=segments)
+    canvas.draw()
+
+    # Histogramm: Klassen der zweiten Auswertung (ε = 0.5 bis 2.0), Plateau-Klasse hervorgehoben
+    counts, edges = np.histogram(y2, bins=np.arange(0, y2.max() + 0.5, 0.5))
+    paths = plot.bars.get_paths()
+    assert len(paths) == counts.size
+    np.testing.assert_allclose([-p.vertices[:, 0].min() for p in paths], counts)
+    np.testing.assert_allclose([p.vertices[:, 1].min() for p in paths], edges[:-1])
+    centers = (edges[:-1] + edges[1:]) / 2
+    highlighted = [tuple(c) == to_rgba("lightblue") for c in plot.bars.get_facecolors()]
+    assert highlighted == list((centers >= 1.5) & (centers < 2.0)) and any(highlighted)
+
+    # Live/Dead End je Segment, keine Unsicherheitsbänder mehr, ein Band je Segment mit Plateau
+    assert [seg[0][0] for seg in plot.end_lines.get_segments()] == [30.0, 260.0, 330.0]
+    assert len(plot.arrows) == 3
+    assert len(plot.ci_spans.get_paths()) == 0
+    assert not plot.band_full.get_visible() and len(plot.band_segments.get_paths()) == 1
+    np.testing.assert_array_equal(plot.line.get_xdata(), x2)
+
+    # Grenzen folgen dem zweiten Profil
+    np.testing.assert_allclose(plot.ax.get_xlim(), (-20.0, 420.0))
+    assert plot.ax_hist.get_ylim()[0] < edges[0] and plot.ax_hist.get_ylim()[1] > edges[-1]
+    assert plot.ax_hist.get_xlim() == (-counts.max() * 1.1, 0)
+    assert "l_{ol}=20.0" in plot.ax.get_legend().get_texts()[-1].get_text()
@@ -0,0 +1,56 @@
+"""Heatmap-Pyramide: Bildgröße begrenzt durch die Zeichenfläche, auch für schmale Ausschnitte."""
+import numpy as np
+import pytest
+
+from tlc_pyramid import StrainPyramid
+
+
+@pytest.fixture(scope="module")
+def pyramid():
+    rng = np.random.default_rng(5)
+    return StrainPyramid.build(rng.normal(size=(20000, 400)))
+
+
+@pytest.mark.parametrize("shape_px", [(500, 800), (800, 500), (40, 1000)])
+def test_non_square_view_is_bounded_by_canvas(pyramid, shape_px):
+    height_px, width_px = shape_px
+    n_rows, n_cols = pyramid.strain.shape
+    image, level, (r0, r1, c0, c1) = pyramid.view((0, n_rows), (0, n_cols), height_px, width_px)
+    assert image.shape[0] <= 2 * height_px and image.shape[1] <= 2 * width_px
+    assert (r0, r1, c0, c1) == (0, n_rows, 0, n_cols)
+    # die kurze Achse bleibt mindestens in Pixelauflösung (sofern die Daten reichen)
+    assert image.shape[1] >= min(width_px, n_cols)
+
+
+def test_square_view_reads_level_unchanged(pyramid):
+    image, level, (r0, r1, c0, c1) = pyramid.view((1000, 5000), (0, 400), 600, 100)
+    f = 2 ** level
+    assert level > 0
+    np.testing.assert_array_equal(image, pyramid.levels[level]["mean"][1000 // f:-(-5000 // f), :400 // f])
+    assert (r0, r1, c0, c1) == (1000, 5000, 0, 400)
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+@pytest.mark.parametrize("stat", ["max", "min", "mean"])
+def test_strided_view_reduces_windows(stat):
+    strain = np.random.default_rng(6).normal(size=(20000, 400))
+    strain[12345, 105] = 1e3  # Spitze zwischen zwei Abtastzeilen
+    strain[12346, 105] = -1e3
+    strain[400:800, 101] = np.nan
+    pyramid = StrainPyramid.build(strain)
+    image, level, (r0, r1, c0, c1) = pyramid.view((0, 20000), (100, 110), 50, 100, stat=stat)
+    assert level == 0
+    assert image.shape == (50, 10)
+    windows = strain[:, 100:110].reshape(50, 400, 10)
+    expected = {"max": np.nanmax, "min": np.nanmin, "mean": np.nanmean}[stat](windows, axis=1)
+    np.testing.assert_allclose(image, expected, rtol=1e-12)
+    if stat != "mean":
+        assert image[12345 // 400, 5] == (1e3 if stat == "max" else -1e3)
+    assert np.isnan(image[1, 1])
+    assert (r0, r1, c0, c1) == (0, 20000, 100, 110)
+
+
+def test_strided_view_on_level_keeps_extremes(pyramid):
+    image, level, _ = pyramid.view((0, 20000), (0, 400), 20, 100, stat="max")
+    assert level > 0 and image.shape[0] <= 40 and image.shape[1] <= 200
+    assert image.max() == np.nanmax(pyramid.strain)
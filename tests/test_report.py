@@ -0,0 +1,50 @@
+"""Kampagnenbericht: Vektorseiten ohne eingebettete Rasterbilder, Abbruch ohne Datei."""
+import os
+
+import pytest
+
+import corpus
+from tlc_export import export_strain
+from tlc_report import SUMMARY_KEYS, ReportCancelled, build_report, specimen
+
+pytestmark = pytest.mark.filterwarnings("ignore:All-NaN slice:RuntimeWarning")
+
+
+@pytest.fixture(scope="module")
+def specs(tmp_path_factory):
+    folder = tmp_path_factory.mktemp("campaign")
+    paths = []
+    for name in ("synthetic_a", "synthetic_two_strands"):
+        path = str(folder / f"{name}.csv")
+        export_strain(corpus.load_dataset(name), path, "raw")
+        paths.append(path)
+    return [specimen(paths[0]), specimen(paths[1], segments="auto"), specimen(str(folder / "missing.csv"))]
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_report_pages_are_vector(specs, tmp_path, n_jobs):
+    calls = []
+    pdf = str(tmp_path / "report.pdf")
+    summary = build_report(specs, pdf, n_jobs=n_jobs, progress_callback=lambda done, total: calls.append(done))
+    assert list(summary["Error"] != "") == [False, False, False, True]
+    assert calls[-1] == 2 * len(specs)
+    data = open(pdf, "rb").read()
+    assert data.count(b"/Type /Page\n") + data.count(b"/Type /Page ") >= 4
+    assert b"/Subtype /Image" not in data
+    assert os.path.exists(str(tmp_path / "report_summary.xlsx"))
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_report_cancel(specs, tmp_path, n_jobs):
+    pdf = str(tmp_path / "report.pdf")
+    with pytest.raises(ReportCancelled):
+        build_report(specs, pdf, n_jobs=n_jobs, progress_callback=lambda done, total: False)
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_report_empty_campaign(tmp_path, n_jobs):
+    pdf = str(tmp_path / "report.pdf")
+    summary = build_report([], pdf, n_jobs=n_jobs)
+    assert summary.empty and list(summary.columns) == SUMMARY_KEYS
+    assert os.path.exists(pdf) and os.path.exists(str(tmp_path / "report_summary.xlsx"))
@@ -0,0 +1,167 @@
+"""Lokaler Analysedienst: HTTP-Ergebnisse entsprechen tlc_api, Fehler als 400/404."""
+import asyncio
+import http.client
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import corpus
+import tlc_api
+import tlc_server
+from tlc_server import AnalysisService, Client, serve
+
+
+@pytest.fixture(scope="module")
+def client():
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(serve(0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield Client(port=server.sockets[0].getsockname()[1], timeout=60)
+    loop.call_soon_threadsafe(server.close)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+
+
+@pytest.fixture(scope="module")
+def example_id(client):
+    return client.open(corpus.EXAMPLE_FILE)["id"]
+
+
+def test_open_is_idempotent(client, example_id, example):
+    info = client.open(corpus.EXAMPLE_FILE)
+    assert info["id"] == example_id
+    assert (info["n_times"], info["n_gauges"]) == (example.n_times, example.n_gauges)
+    assert example_id in [d["id"] for d in client.datasets()]
+
+
+def test_integral_and_time(client, example_id, example):
+    data = client.integral(example_id)
+    times, integrals = tlc_api.integral(example)
+    np.testing.assert_array_equal(data["integrals"], integrals)
+    assert data["max_time"] == float(times[np.argmax(integrals)])
+    assert client.time(example_id, "max") == {"row": 411, "time": float(example.times[411])}
+    assert client.time(example_id, "first")["row"] == tlc_api.select_time(example, "first")[0]
+
+
+@pytest.mark.parametrize("method", corpus.METHODS)
+def test_evaluate_matches_api(client, example_id, example, method):
+    res = client.evaluate(example_id, eps=0.023, l_ol=17, method=method)
+    expected = tlc_api.evaluate(example, 0.023, 17, method=method)[0]
+    assert res["row"] == 411
+    assert res["results"][0]["live_end"] == expected["live_end"]
+    assert res["results"][0]["dead_end"] == expected["dead_end"]
+
+
+def test_evaluate_batch(client, example_id, example):
+    params = [(0.02, 15), (0.023, 17), (0.03, 25)]
+    batch = client.evaluate_batch(example_id, params, time="max")
+    for (eps, l_ol), res in zip(params, batch):
+        expected = tlc_api.evaluate(example, eps, l_ol)[0]
+        assert (res["eps"], res["l_ol"]) == (eps, l_ol)
+        assert (res["results"][0]["live_end"], res["results"][0]["dead_end"]) == \
+            (expected["live_end"], expected["dead_end"])
+    assert batch[1]["results"][0]["live_end"] == 288.9499999999998
+    assert batch[1]["results"][0]["dead_end"] == 320.16999999999894
+
+
+@pytest.mark.parametrize("method", corpus.METHODS)
+def test_evaluate_batch_grid_uses_sweep(example, method, monkeypatch):
+    service = AnalysisService()
+    ds_id = service._add(example, "example")["id"]
+    calls = []
+    sweep = tlc_server.sweep_transfer_length
+    monkeypatch.setattr(tlc_server, "sweep_transfer_length", lambda *a, **k: calls.append(a[2]) or sweep(*a, **k))
+    params = [(eps, l_ol) for eps in (0.015, 0.023, 0.05) for l_ol in (5, 17, 40)] + [(0.023, 17)]
+    batch = service.evaluate_batch(ds_id, params, time="max", method=method)
+    assert len(calls) == 3
+    for (eps, l_ol), res in zip(params, batch):
+        expected = tlc_api.evaluate(example, eps, l_ol, row=411, method=method)[0]
+        got = res["results"][0]
+        assert (res["eps"], res["l_ol"], res["row"]) == (eps, l_ol, 411)
+        assert (got["live_end"], got["dead_end"]) == (expected["live_end"], expected["dead_end"])
+        np.testing.assert_array_equal(got["max_bin_edges"], expected["max_bin_edges"])
+    # zweiter Aufruf aus dem Ergebnis-Cache, einzelne Auswertung mit gleichem Ergebnis
+    assert service.evaluate_batch(ds_id, params, time="max", method=method) == batch
+    assert len(calls) == 3
+    single = service.evaluate(ds_id, 0.023, 17, time="max", method=method)
+    assert single["results"][0]["live_end"] == batch[4]["results"][0]["live_end"]
+
+
+def test_errors(client, example_id):
+    with pytest.raises(RuntimeError, match="^404: "):
+        client.evaluate("nope", eps=0.023, l_ol=17)
+    with pytest.raises(RuntimeError, match="^400: .*l_ol"):
+        client.request("POST", f"/datasets/{example_id}/evaluate", json_body={"eps": 0.023})
+    with pytest.raises(RuntimeError, match="^400: "):
+        client.evaluate(example_id, eps=0.023, l_ol=17, method="median")
+    with pytest.raises(RuntimeError, match="^400: "):
+        client.evaluate(example_id, eps=0, l_ol=17)
+    with pytest.raises(RuntimeError, match="^404: "):
+        client.request("GET", "/unknown")
+
+
+def test_upload_csv(client, tmp_path):
+    ds = corpus.synthetic_dataset(**corpus.SYNTHETIC["synthetic_a"])
+    df = pd.DataFrame(ds.strain, columns=[f"{p:g}" for p in ds.positions])
+    df["time"] = ds.times
+    path = tmp_path / "upload.csv"
+    df.to_csv(path, index=False)
+    info = client.upload(str(path))
+    assert (info["n_times"], info["n_gauges"]) == (ds.n_times, ds.n_gauges)
+    local = tlc_api.load(str(path))
+    res = client.evaluate(info["id"], eps=0.023, l_ol=17)
+    expected = tlc_api.evaluate(local, 0.023, 17)[0]
+    assert res["results"][0]["live_end"] == expected["live_end"]
+    assert client.close(info["id"]) == {"closed": info["id"]}
+    with pytest.raises(RuntimeError, match="^404: "):
+        client.close(info["id"])
+
+
+def test_plots(client, example_id):
+    png = client.plot(example_id, "transferlength", eps=0.023, l_ol=17)
+    assert png[:8] == b"\x89PNG\r\n\x1a\n"
+    pdf = client.plot(example_id, "integral", format="pdf")
+    assert pdf[:5] == b"%PDF-"
+
+
+def _raw_request(client, headers, method="GET", path="/datasets", body=None):
+    conn = http.client.HTTPConnection(client.base[len("http://"):], timeout=10)
+    try:
+        conn.putrequest(method, path, skip_host=True)
+        for k, v in headers.items():
+            conn.putheader(k, v)
+        if body is not None:
+            conn.putheader("Content-Length", str(len(body)))
+        conn.endheaders()
+        if body is not None:
+            conn.send(body)
+        resp = conn.getresponse()
+        return resp.status, json.loads(resp.read())
+    finally:
+        conn.close()
+
+
+def test_foreign_host_and_origin_rejected(client):
+    port = client.base.rsplit(":", 1)[1]
+    assert _raw_request(client, {"Host": f"localhost:{port}"})[0] == 200
+    assert _raw_request(client, {"Host": f"127.0.0.1:{port}", "Origin": f"http://127.0.0.1:{port}"})[0] == 200
+    for headers in ({"Host": f"attacker.example:{port}"}, {},
+                    {"Host": f"127.0.0.1:{port}", "Origin": "http://attacker.example"},
+                    {"Host": f"127.0.0.1:{port}", "Origin": "null"}):
+        assert _raw_request(client, headers)[0] == 403
+    status, data = _raw_request(client, {"Host": f"attacker.example:{port}"}, "POST", "/datasets/open",
+                                json.dumps({"path": corpus.EXAMPLE_FILE}).encode())
+    assert status == 403
+
+
+def test_body_limit(client, example_id, monkeypatch):
+    monkeypatch.setattr(tlc_server, "MAX_BODY", 64)
+    port = client.base.rsplit(":", 1)[1]
+    body = json.dumps({"eps": 0.023, "l_ol": 17, "segments": " " * 100}).encode()
+    status, _ = _raw_request(client, {"Host": f"127.0.0.1:{port}"}, "POST",
+                             f"/datasets/{example_id}/evaluate", body)
+    assert status == 413
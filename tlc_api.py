@@ -0,0 +1,138 @@
+"""
+Python-Schnittstelle des Transfer Length Calculators für Notebooks und
+Auswerteketten (ohne Qt-Abhängigkeit).
+
+Alle Funktionen arbeiten auf NumPy-Arrays, die bereits im Speicher liegen;
+eine Excel-Datei ist nicht nötig. float64-Arrays in C-Reihenfolge (auch
+schreibgeschützte Arrays und np.memmap) werden ohne Kopie übernommen,
+andere Datentypen oder Speicherlayouts einmalig umgewandelt.
+
+Beispiel:
+
+    import numpy as np
+    import tlc_api as tlc
+
+    ds = tlc.from_arrays(strain, positions, times)     # (n_zeiten, n_sensoren), [mm], [s]
+    times, integrals = tlc.integral(ds)
+    row, t = tlc.select_time(ds)                       # Integralmaximum (Zeit vor Riss)
+    tlc.evaluate(ds, eps=0.023, l_ol=17, row=row)
+    values, x = tlc.profile(ds, row)
+    grid = tlc.sweep(values, x, eps=np.linspace(0.01, 0.05, 9), l_ol=[10, 17, 25])
+    tlc.recommend(ds, row=row)["eps"]                  # stabilste Parameter
+"""
+import numpy as np
+
+from tlc_core import (
+    DFOSDataset, integral_series, select_row, evaluate_profile, evaluate_transfer_length,
+    bootstrap_transfer_length, sweep_transfer_length, recommend_parameters, parse_segments, MODE_METHODS
+)
+
+__all__ = [
+    "DFOSDataset", "from_arrays", "load", "integral", "select_time", "profile", "evaluate",
+    "evaluate_transfer_length", "sweep", "recommend", "MODE_METHODS",
+]
+
+
+def from_arrays(strain, positions, times, sra=False, sra_interpolate=False):
+    """
+    Datensatz aus Arrays: strain (n_zeiten, n_sensoren) [‰], positions
+    (n_sensoren,) [mm], times (n_zeiten,) [s]. Die Arrays werden nicht
+    kopiert, sofern sie bereits float64 (strain zusätzlich C-contiguous)
+    sind, und vom Datensatz nicht verändert.
+
+    sra=True aktiviert die SRA-Bereinigung für alle Auswertungen.
+    """
+    dataset = DFOSDataset(strain, positions, times)
+    if sra:
+        dataset.set_sra_options(interpolate=sra_interpolate)
+    return dataset
+
+
+def load(path):
+    """Datensatz aus einer Messdatei (.xlsx oder .csv, letzte Spalte = Zeit)."""
+    import pandas as pd
+
+    df = pd.read_csv(path) if str(path).lower().endswith(".csv") else pd.read_excel(path)
+    return DFOSDataset.from_dataframe(df, source=str(path))
+
+
+def integral(dataset):
+    """
+    Integral der Dehnung über den Ort je Zeitschritt: (times, integrals).
+    Zeilen, in denen alle Werte NaN sind, fehlen; einzelne NaN zählen als 0.
+    """
+    times, integrals, _ = integral_series(dataset)
+    return times, integrals
+
+
+def select_time(dataset, time="max"):
+    """
+    Zeile für die Auswertung: "max" = Integralmaximum, "first" = erste gültige
+    Messung, Zahl = nächste gültige Zeile zu dieser Zeit [s]. Gibt (row, time) zurück.
+    """
+    row = select_row(dataset, time)
+    return row, float(dataset.times[row])
+
+
+def profile(dataset, row):
+    """Dehnungsprofil einer Zeile als (values, positions), ohne NaN und Nicht-Positionsspalten."""
+    return dataset.profile(row)
+
+
+def evaluate(dataset, eps, l_ol, time="max", row=None, segments=None, method="histogram", ci=False, seed=0):
+    """
+    Live/Dead End einer Zeile (row) oder Zeit (time, wie select_time).
+
+    segments: None (ganze Faser), [(start, end), ...], Text wie "0:500; 600:1100"
+    oder "auto". method: "histogram", "window" oder "kde". ci=True ergänzt
+    95%-Bootstrap-Intervalle.
+
+    Gibt je Faser/Segment ein dict mit "segment", "start", "end", "live_end",
+    "dead_end", "max_bin_edges", "live_ci" und "dead_ci" zurück (Live End ab
+    Segmentbeginn, Dead End ab letzter Messstelle des Segments).
+    """
+    if row is None:
+        row = select_row(dataset, time)
+    values, positions = dataset.profile(row)
+    if values.size == 0:
+        raise ValueError("No data in the selected row")
+    if isinstance(segments, str):
+        segments = parse_segments(segments)
+
+    results = []
+    for r in evaluate_profile(values, positions, eps, l_ol, segments, method):
+        live_ci, dead_ci = None, None
+        if ci:
+            res = bootstrap_transfer_length(values[r["mask"]], positions[r["mask"]], eps, l_ol,
+                                            method=method, seed=seed)
+            live_ci, dead_ci = res["live_ci"], res["dead_ci"]
+            if live_ci is not None:
+                live_ci = (live_ci[0] - r["start"], live_ci[1] - r["start"])
+        results.append({"segment": r["segment"], "start": r["start"], "end": r["end"],
+                        "live_end": r["live_end"], "dead_end": r["dead_end"],
+                        "max_bin_edges": r["max_bin_edges"], "live_ci": live_ci, "dead_ci": dead_ci})
+    return results
+
+
+def sweep(values, positions, eps, l_ol, method="histogram"):
+    """
+    Parameterstudie auf einem Profil: Live/Dead End für alle Kombinationen
+    eps × l_ol als Matrizen (n_eps, n_l_ol), NaN = kein Ergebnis.
+    Siehe tlc_core.sweep_transfer_length.
+    """
+    return sweep_transfer_length(np.asarray(values, dtype=float), np.asarray(positions, dtype=float),
+                                 eps, l_ol, method)
+
+
+def recommend(dataset, time="max", row=None, method="histogram", **options):
+    """
+    Parameter (eps, l_ol) mit den stabilsten Live/Dead Ends für eine Zeile
+    (row) oder Zeit (time, wie select_time). options: Suchbereich und Gitter,
+    siehe tlc_core.recommend_parameters.
+    """
+    if row is None:
+        row = select_row(dataset, time)
+    values, positions = dataset.profile(row)
+    if values.size == 0:
+        raise ValueError("No data in the selected row")
+    return recommend_parameters(values, positions, method, **options)
@@ -0,0 +1,1167 @@
+"""
+Rechenkern des Transfer Length Calculators (ohne Qt-Abhängigkeit).
+
+Enthält das Datenmodell (DFOSDataset), die Erkennung von Strain Reading
+Anomalies (SRA) sowie die Auswertung von Integral und Übertragungslänge.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import tlc_kernels
+
+# np.trapz wurde in NumPy 2 in np.trapezoid umbenannt
+_trapz = getattr(np, "trapezoid", None) or np.trapz
+
+DEFAULT_SRA_Z = 3.5
+
+# Spalten der Ergebnistabelle (Dashboard, Excel-Export, Kampagnenbericht)
+RESULT_KEYS = ["Time [s]", "Segment", "Mode", "Δε₍c₎ [‰]", "l₍ol₎ [mm]", "Live End [mm]", "Dead End [mm]",
+               "Live End 95% CI [mm]", "Dead End 95% CI [mm]"]
+
+
+def parse_positions(columns):
+    """
+    Wandelt Spaltenköpfe in Sensorpositionen [mm] um.
+    Nicht-numerische Köpfe werden zu NaN.
+    """
+    positions = np.full(len(columns), np.nan)
+    for i, c in enumerate(columns):
+        try:
+            positions[i] = float(str(c).strip())
+        except Exception:
+            continue
+    return positions
+
+
+class DFOSDataset:
+    """
+    Dehnungs-Zeit-Matrix einer DFOS-Messung.
+
+      - strain:    (n_zeiten, n_sensoren) float64, C-contiguous
+      - positions: Sensorpositionen je Spalte [mm] (NaN = keine Positionsspalte)
+      - times:     Zeitstempel je Zeile [s]
+
+    float64-Arrays (strain in C-Reihenfolge) werden ohne Kopie übernommen
+    und nie verändert; bereinigte Matrizen sind eigene Arrays.
+
+    SRA-Maske, bereinigte Matrix und Integralverlauf werden je Parametersatz
+    im Datensatz zwischengespeichert. Ist `sra_options` gesetzt, arbeiten alle
+    Auswertungen (Integral, Zeitwahl, Profil) auf der bereinigten Matrix.
+    """
+
+    def __init__(self, strain, positions, times, columns=None, source=None):
+        self.strain = np.ascontiguousarray(strain, dtype=float)
+        self.positions = np.asarray(positions, dtype=float)
+        self.times = np.asarray(times, dtype=float)
+        if self.strain.ndim != 2:
+            raise ValueError("strain must be a 2D array (time x position)")
+        if self.strain.shape != (len(self.times), len(self.positions)):
+            raise ValueError("strain shape does not match times/positions")
+        self.columns = list(columns) if columns is not None else list(self.positions)
+        self.source = source
+        self.sra_options = None
+        self._cache = {}
+
+    @classmethod
+    def from_dataframe(cls, df, source=None):
+        """Letzte Spalte = Zeit, alle übrigen Spalten = Dehnungswerte."""
+        deformation_columns = df.columns[:-1]
+        strain = df[deformation_columns].to_numpy(dtype=float)
+        times = df[df.columns[-1]].to_numpy(dtype=float)
+        return cls(strain, parse_positions(deformation_columns), times,
+                   columns=deformation_columns, source=source)
+
+    @property
+    def n_times(self):
+        return self.strain.shape[0]
+
+    @property
+    def n_gauges(self):
+        return self.strain.shape[1]
+
+    def set_sra_options(self, z_thresh=DEFAULT_SRA_Z, max_jump=None, interpolate=False):
+        """Aktiviert die SRA-Bereinigung für alle Auswertungen."""
+        self.sra_options = {"z_thresh": z_thresh, "max_jump": max_jump, "interpolate": interpolate}
+
+    def clear_sra_options(self):
+        self.sra_options = None
+
+    def sra_mask(self, z_thresh=DEFAULT_SRA_Z, max_jump=None):
+        """SRA-Maske der gesamten Matrix (gecacht je Parametersatz)."""
+        key = ("mask", z_thresh, max_jump)
+        if key not in self._cache:
+            self._cache[key] = detect_sra(self.strain, z_thresh=z_thresh, max_jump=max_jump)
+        return self._cache[key]
+
+    def cleaned_strain(self, z_thresh=DEFAULT_SRA_Z, max_jump=None, interpolate=False):
+        """
+        Matrix mit maskierten SRAs (NaN). Mit interpolate=True werden markierte
+        Messstellen und Ausfälle linear über die Position interpoliert.
+        """
+        key = ("clean", z_thresh, max_jump, interpolate)
+        if key not in self._cache:
+            mask = self.sra_mask(z_thresh, max_jump)
+            if interpolate:
+                clean = interpolate_masked(self.strain, self.positions, mask)
+            else:
+                clean = self.strain.copy()
+                clean[mask] = np.nan
+            self._cache[key] = clean
+        return self._cache[key]
+
+    def cache_snapshot(self):
+        """
+        Zwischenergebnisse, die sich zu speichern lohnen: Integralverläufe und
+        SRA-Masken je Parametersatz (bereinigte Matrizen werden daraus neu gebildet).
+        """
+        return {k: v for k, v in self._cache.items() if k[0] in ("integral", "mask")}
+
+    def clear_cache(self, kind=None):
+        """
+        Verwirft Zwischenergebnisse: kind = "integral", "mask", "clean" oder
+        None (alle), z. B. nach Änderung der Matrix oder für Zeitmessungen.
+        """
+        for key in [k for k in self._cache if kind is None or k[0] == kind]:
+            del self._cache[key]
+
+    def restore_cache(self, items):
+        """Übernimmt Einträge aus cache_snapshot (z. B. aus einer Projektdatei)."""
+        self._cache.update(items)
+
+    def analysis_strain(self):
+        """Matrix, auf der alle Auswertungen arbeiten (roh oder SRA-bereinigt)."""
+        if self.sra_options is None:
+            return self.strain
+        return self.cleaned_strain(**self.sra_options)
+
+    def valid_rows(self):
+        """Indizes der Zeilen, in denen nicht ALLE Dehnungswerte NaN sind."""
+        strain = self.analysis_strain()
+        return np.flatnonzero(~np.isnan(strain).all(axis=1))
+
+    def profile(self, row_idx):
+        """
+        Dehnungsprofil einer Zeile: (Dehnungen, Positionen) aller Messstellen
+        mit numerischer Position und gültigem Wert, in Spaltenreihenfolge.
+        """
+        values = self.analysis_strain()[row_idx]
+        keep = ~np.isnan(self.positions) & ~np.isnan(values)
+        return values[keep], self.positions[keep]
+
+
+def dataset_cache_dir(dataset):
+    """
+    Cache-Verzeichnis neben der Quelldatei ("<datei>.tlc_cache"), angelegt bei
+    Bedarf. None für Datensätze ohne Quelldatei.
+    """
+    if not dataset.source or not os.path.isfile(dataset.source):
+        return None
+    path = dataset.source + ".tlc_cache"
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def dataset_fingerprint(dataset):
+    """Kennung der Quelldatei (Pfad, Größe, Änderungszeit) und der Matrixform."""
+    st = os.stat(dataset.source)
+    return f"{os.path.abspath(dataset.source)}|{st.st_size}|{st.st_mtime_ns}|{dataset.strain.shape}"
+
+
+def _robust_z(residual, axis):
+    """Robuster z-Wert (Median/MAD) entlang einer Achse; MAD = 0 ergibt z = 0."""
+    with np.errstate(invalid="ignore"):
+        med = np.nanmedian(residual, axis=axis, keepdims=True)
+        mad = np.nanmedian(np.abs(residual - med), axis=axis, keepdims=True)
+    mad = np.where(mad > 0, mad, np.inf)
+    return 0.6745 * (residual - med) / mad
+
+
+def _neighbour_residual(strain, axis):
+    """Abweichung jedes Werts vom Mittel seiner beiden Nachbarn entlang `axis`."""
+    a = np.moveaxis(strain, axis, -1)
+    res = np.full(a.shape, np.nan)
+    if a.shape[-1] >= 3:
+        res[..., 1:-1] = a[..., 1:-1] - 0.5 * (a[..., :-2] + a[..., 2:])
+    if a.shape[-1] >= 2:
+        res[..., 0] = a[..., 0] - a[..., 1]
+        res[..., -1] = a[..., -1] - a[..., -2]
+    return np.moveaxis(res, -1, axis)
+
+
+def detect_sra(strain, z_thresh=DEFAULT_SRA_Z, max_jump=None):
+    r"""
+    Vektorisierte Erkennung von Strain Reading Anomalies (SRA) in einem Durchgang.
+
+    Eine Messstelle gilt als SRA, wenn ihr Nachbar-Residuum
+      - über den Ort (robuster z-Wert je Zeile) UND
+      - über die Zeit (robuster z-Wert je Messstelle)
+    den Schwellwert z_thresh überschreitet. Echte Risse sind örtlich scharf,
+    bleiben aber über die Zeit bestehen und werden deshalb nicht markiert.
+    Bei weniger als 3 Zeitschritten wird nur das Ortskriterium verwendet.
+
+    Optional markiert max_jump [‰] zusätzlich jeden Sprung zu beiden
+    Nachbarn, der betragsmäßig größer als max_jump ist.
+
+    Gibt eine boolesche Maske in Form der Matrix zurück (NaN-Werte: False).
+    """
+    strain = np.asarray(strain, dtype=float)
+    with np.errstate(invalid="ignore"):
+        z_space = np.abs(_robust_z(_neighbour_residual(strain, axis=1), axis=1))
+        mask = z_space > z_thresh
+        if strain.shape[0] >= 3:
+            z_time = np.abs(_robust_z(_neighbour_residual(strain, axis=0), axis=0))
+            mask &= z_time > z_thresh
+
+        if max_jump is not None and strain.shape[1] >= 2:
+            d = np.abs(np.diff(strain, axis=1))
+            left = np.zeros(strain.shape, dtype=bool)
+            right = np.zeros(strain.shape, dtype=bool)
+            left[:, 1:] = d > max_jump
+            right[:, :-1] = d > max_jump
+            # Randwerte haben nur einen Nachbarn
+            left[:, 0] = right[:, 0]
+            right[:, -1] = left[:, -1]
+            mask |= left & right
+    return mask
+
+
+def interpolate_masked(strain, positions, mask):
+    """
+    Lineare Interpolation über die Position für markierte Messstellen und
+    Ausfälle (NaN) – vektorisiert für die gesamte Matrix. Werte ohne gültigen
+    Nachbarn auf beiden Seiten (Ränder) bleiben NaN.
+    """
+    strain = np.asarray(strain, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    bad = mask | np.isnan(strain)
+    n_rows, n_cols = strain.shape
+    out = strain.copy()
+    if n_cols == 0 or not bad.any():
+        return out
+
+    cols = np.arange(n_cols)
+    good = ~bad
+    # Index des letzten gültigen Werts links bzw. des nächsten rechts
+    left = np.where(good, cols, -1)
+    np.maximum.accumulate(left, axis=1, out=left)
+    right = np.where(good, cols, n_cols)
+    right = np.minimum.accumulate(right[:, ::-1], axis=1)[:, ::-1]
+
+    fill = bad & (left >= 0) & (right < n_cols)
+    r, c = np.nonzero(fill)
+    li, ri = left[r, c], right[r, c]
+    x0, x1, x = positions[li], positions[ri], positions[c]
+    y0, y1 = strain[r, li], strain[r, ri]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        w = np.where(x1 != x0, (x - x0) / (x1 - x0), 0.5)
+    out[r, c] = y0 + w * (y1 - y0)
+    out[bad & ~fill] = np.nan
+    return out
+
+
+def integral_series(dataset):
+    """
+    Integral der Dehnung je Zeitschritt (partielle NaNs = 0, Stützstellenabstand 1).
+    Zeilen, in denen alle Werte NaN sind, werden ausgelassen.
+
+    Gibt (times, integrals, rows) zurück; rows = Zeilenindizes im Datensatz.
+    Das Ergebnis wird im Datensatz zwischengespeichert.
+    """
+    key = ("integral", repr(dataset.sra_options))
+    if key not in dataset._cache:
+        rows = dataset.valid_rows()
+        strain = dataset.analysis_strain()[rows]
+        integrals = _trapz(np.nan_to_num(strain, nan=0.0), axis=1)
+        dataset._cache[key] = (dataset.times[rows], integrals, rows)
+    return dataset._cache[key]
+
+
+def nearest_row(dataset, t, rows=None):
+    """Index der (ersten) Zeile, deren Zeit am nächsten an t liegt."""
+    if rows is None:
+        rows = np.arange(dataset.n_times)
+    return int(rows[np.nanargmin(np.abs(dataset.times[rows] - t))])
+
+
+def select_row(dataset, time=None):
+    """
+    Zeile für die Auswertung: time=None oder "max" = Maximum des Integrals
+    (Zeit vor Riss), "first" = erste gültige Messung, Zahl = nächste gültige
+    Zeile zu dieser Zeit [s]. ValueError, wenn alle Zeilen NaN sind.
+    """
+    valid = dataset.valid_rows()
+    if valid.size == 0:
+        raise ValueError("All rows are NaN")
+    if time is None or time == "max":
+        _, integrals, rows = integral_series(dataset)
+        return int(rows[np.argmax(integrals)])
+    if time == "first":
+        return int(valid[0])
+    return nearest_row(dataset, float(time), valid)
+
+
+def _histogram_band(values, eps):
+    """Plateau als am stärksten besetzte Klasse von np.arange(0, max + eps, eps)."""
+    bins = np.arange(0, np.nanmax(values) + eps, eps)
+    counts, _ = np.histogram(values, bins=bins)
+    digs = np.digitize(values, bins) - 1
+    mb = np.argmax(counts)
+    return (bins[mb], bins[mb + 1]), digs == mb
+
+
+def _window_band(values, eps):
+    """
+    Dichtestes Band [lo, lo + eps) über ein gleitendes Fenster auf den
+    sortierten Werten – O(n log n), ohne Klassenarray, auch für negative Dehnungen.
+    """
+    v = np.sort(values[~np.isnan(values)])
+    counts = np.searchsorted(v, v + eps, side="left") - np.arange(v.size)
+    lo = v[np.argmax(counts)]
+    return (lo, lo + eps), (values >= lo) & (values < lo + eps)
+
+
+KDE_MAX_GRID = 2 ** 16
+
+
+def _kde_grid(v, lo, hi, sigma):
+    """Dichte auf einem Gitter über [lo, hi] (lineares Binning + FFT-Faltung)."""
+    n_grid = int(min(KDE_MAX_GRID, 2 ** np.ceil(np.log2(max((hi - lo) / (sigma / 4), 2)))))
+    delta = (hi - lo) / (n_grid - 1)
+    v = v[(v >= lo) & (v <= hi)]
+
+    pos = (v - lo) / delta
+    left = np.minimum(np.floor(pos).astype(np.intp), n_grid - 2)
+    frac = pos - left
+    weights = np.bincount(left, 1 - frac, minlength=n_grid) + np.bincount(left + 1, frac, minlength=n_grid)
+
+    # zero padding gegen Umlauf der zyklischen Faltung
+    k_half = min(n_grid - 1, int(np.ceil(4 * sigma / delta)))
+    offsets = np.arange(-k_half, k_half + 1) * delta
+    kernel = np.exp(-0.5 * (offsets / sigma) ** 2)
+    n_fft = int(2 ** np.ceil(np.log2(n_grid + kernel.size)))
+    density = np.fft.irfft(np.fft.rfft(weights, n_fft) * np.fft.rfft(kernel, n_fft), n_fft)
+    return density[k_half:k_half + n_grid], delta
+
+
+def _kde_band(values, eps):
+    """
+    Modus einer Kerndichteschätzung (Gauß, σ = eps/2) mit linearem Binning und
+    FFT-Faltung; das Plateau ist das Band der Breite eps um den Modus. Das
+    Gitter ist auf KDE_MAX_GRID Punkte begrenzt; reicht das für den
+    Wertebereich nicht aus, wird um den groben Modus verfeinert.
+    """
+    v = values[~np.isnan(values)]
+    sigma = eps / 2
+    lo, hi = v.min() - 4 * sigma, v.max() + 4 * sigma
+    while True:
+        density, delta = _kde_grid(v, lo, hi, sigma)
+        mode = lo + np.argmax(density) * delta
+        if delta <= sigma / 4:
+            break
+        lo, hi = mode - 4 * (delta + sigma), mode + 4 * (delta + sigma)
+
+    band = (mode - eps / 2, mode + eps / 2)
+    return band, (values >= band[0]) & (values < band[1])
+
+
+MODE_METHODS = {
+    "histogram": _histogram_band,
+    "window": _window_band,
+    "kde": _kde_band,
+}
+
+
+def _live_dead(xs, last_position, l_ol):
+    """
+    Live End = erste, Dead End (ab last_position) = letzte Plateau-Messstelle,
+    deren Abstand zum Nachbarn im Plateau kleiner als l_ol ist.
+    """
+    if not xs.size:
+        return None, None
+    fwd = np.append(~(xs[:-1] + l_ol <= xs[1:]), True)
+    bwd = np.insert(~(xs[1:] >= xs[:-1] + l_ol), 0, True)
+    live_end = float(xs[np.argmax(fwd)])
+    dead_end = float(last_position - xs[len(xs) - 1 - np.argmax(bwd[::-1])])
+    return live_end, dead_end
+
+
+def evaluate_transfer_length(values, positions, eps, l_ol, method="histogram"):
+    r"""
+    Übertragungslänge aus einem Dehnungsprofil.
+
+    Das Plateau ist das Dehnungsband der Breite eps mit den meisten Messwerten:
+      - "histogram": Klassen der Breite eps ab 0 (Originalverfahren; negative
+        Dehnungen fallen heraus)
+      - "window":    dichtestes Band über gleitendes Fenster auf sortierten Werten
+      - "kde":       Band um den Modus einer FFT-Kerndichteschätzung
+    Live End ist die erste, Dead End (vom Profilende gemessen) die letzte
+    Plateau-Messstelle, deren Abstand zum Nachbarn im Plateau kleiner als l_ol ist.
+
+    Gibt (live_end, dead_end, max_bin_edges) zurück.
+    """
+    values = np.asarray(values, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    try:
+        band_fn = MODE_METHODS[method]
+    except KeyError:
+        raise ValueError(f"Unknown mode estimator '{method}'")
+
+    max_edges, in_band = band_fn(values, eps)
+    live_end, dead_end = _live_dead(positions[in_band], positions[-1], l_ol)
+    return live_end, dead_end, max_edges
+
+
+def _live_dead_many(xs, last_position, l_ols):
+    """_live_dead für mehrere l_ol auf einmal (gleiche Vergleiche, NaN = kein Plateau)."""
+    n = len(l_ols)
+    if not xs.size:
+        return np.full(n, np.nan), np.full(n, np.nan)
+    ones = np.ones((n, 1), dtype=bool)
+    fwd = np.hstack([~(xs[:-1] + l_ols[:, None] <= xs[1:]), ones])
+    bwd = np.hstack([ones, ~(xs[1:] >= xs[:-1] + l_ols[:, None])])
+    live = xs[np.argmax(fwd, axis=1)]
+    dead = last_position - xs[len(xs) - 1 - np.argmax(bwd[:, ::-1], axis=1)]
+    return live, dead
+
+
+def sweep_transfer_length(values, positions, eps_values, l_ol_values, method="histogram"):
+    """
+    Live/Dead End für alle Kombinationen aus eps_values × l_ol_values.
+
+    Das Plateau-Band wird je eps einmal bestimmt, alle l_ol werden danach
+    gemeinsam ausgewertet; die Ergebnisse entsprechen Wert für Wert
+    evaluate_transfer_length.
+
+    Gibt ein dict mit "eps", "l_ol" und den Matrizen (n_eps, n_l_ol)
+    "live_end" und "dead_end" (NaN = kein Ergebnis) sowie "band"
+    ((n_eps, 2), Plateau-Grenzen je eps) zurück.
+    """
+    values = np.asarray(values, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    eps_values = np.atleast_1d(np.asarray(eps_values, dtype=float))
+    l_ol_values = np.atleast_1d(np.asarray(l_ol_values, dtype=float))
+    try:
+        band_fn = MODE_METHODS[method]
+    except KeyError:
+        raise ValueError(f"Unknown mode estimator '{method}'")
+
+    live_dead = tlc_kernels.live_dead_many if tlc_kernels.USE_NUMBA else _live_dead_many
+    live = np.full((eps_values.size, l_ol_values.size), np.nan)
+    dead = np.full_like(live, np.nan)
+    band = np.full((eps_values.size, 2), np.nan)
+    for i, eps in enumerate(eps_values):
+        band[i], in_band = band_fn(values, eps)
+        live[i], dead[i] = live_dead(positions[in_band], positions[-1], l_ol_values)
+    return {"eps": eps_values, "l_ol": l_ol_values, "live_end": live, "dead_end": dead, "band": band}
+
+
+# Empfehlungen aus Serrano-Mesa et al. (2025): (Δε_c [‰], l_ol [mm])
+PAPER_PARAMETERS = {"embedded": (0.023, 17.0), "glued": (0.020, 16.0)}
+
+
+def _window_range(a, w):
+    """
+    Spannweite (max - min) im (2w+1) x (2w+1)-Fenster um jeden Gitterpunkt.
+    Fenster mit NaN (kein Ergebnis) oder über den Gitterrand hinaus ergeben inf.
+    """
+    padded = np.pad(a, w, constant_values=np.nan)
+    win = np.lib.stride_tricks.sliding_window_view(padded, (2 * w + 1, 2 * w + 1))
+    r = win.max(axis=(-2, -1)) - win.min(axis=(-2, -1))
+    return np.where(np.isnan(r), np.inf, r)
+
+
+def _stability(sweep, w):
+    """Größte Spannweite von Live und Dead End je Gitterpunkt (ergänzt sweep)."""
+    spread_live = _window_range(sweep["live_end"], w)
+    spread_dead = _window_range(sweep["dead_end"], w)
+    sweep["spread_live"], sweep["spread_dead"] = spread_live, spread_dead
+    sweep["score"] = np.maximum(spread_live, spread_dead)
+    return sweep
+
+
+def _ranked_points(sweep, prefer, scale):
+    """
+    Gitterpunkte mit endlicher Spannweite, beste zuerst: kleinste Spannweite,
+    bei Gleichstand kleinere Summe der Spannweiten, dann Nähe zu prefer.
+    """
+    ee, ll = np.meshgrid(sweep["eps"], sweep["l_ol"], indexing="ij")
+    dist = np.hypot((ee - prefer[0]) / scale[0], (ll - prefer[1]) / scale[1])
+    total = sweep["spread_live"] + sweep["spread_dead"]
+    order = np.lexsort((dist.ravel(), total.ravel(), sweep["score"].ravel()))
+    order = order[np.isfinite(sweep["score"].ravel()[order])]
+    return [np.unravel_index(k, sweep["score"].shape) for k in order]
+
+
+def recommend_parameters(values, positions, method="histogram", eps_range=(0.01, 0.05), l_ol_range=(4.0, 40.0),
+                         n_eps=21, n_l_ol=19, levels=2, candidates=3, prefer=PAPER_PARAMETERS["embedded"]):
+    """
+    Sucht (eps, l_ol), bei denen Live und Dead End am stabilsten sind.
+
+    Die Stabilität eines Gitterpunkts ist die größte Spannweite von Live bzw.
+    Dead End in seiner Umgebung von ±1 Schritt des Grobgitters (n_eps x n_l_ol
+    über eps_range x l_ol_range). Um die besten `candidates` nicht benachbarten
+    Punkte des Grobgitters wird levels-mal mit halbierter Schrittweite
+    verfeinert; die Umgebung bleibt dabei gleich groß, so dass das feinere
+    Gitter auch Sprünge zwischen den Grobpunkten erfasst. Bei gleicher
+    Stabilität gewinnt der Punkt mit der kleineren Summe der Spannweiten,
+    danach der nächste zu prefer. Alle Gitter werden mit sweep_transfer_length
+    ausgewertet.
+
+    Gibt ein dict mit "eps", "l_ol", "live_end", "dead_end", "spread_live",
+    "spread_dead" (Spannweiten in mm) sowie den Gittern "coarse" und "fine"
+    (sweep-Ergebnisse ergänzt um "spread_live", "spread_dead", "score") zurück.
+    ValueError, wenn kein Gitterpunkt eine vollständige Umgebung mit Ergebnis hat.
+    """
+    values = np.asarray(values, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    h_eps = (eps_range[1] - eps_range[0]) / (n_eps - 1)
+    h_lol = (l_ol_range[1] - l_ol_range[0]) / (n_l_ol - 1)
+    scale = (eps_range[1] - eps_range[0], l_ol_range[1] - l_ol_range[0])
+
+    coarse = _stability(sweep_transfer_length(values, positions, np.linspace(*eps_range, n_eps),
+                                              np.linspace(*l_ol_range, n_l_ol), method), 1)
+    starts = []
+    for i, j in _ranked_points(coarse, prefer, scale):
+        if all(max(abs(i - a), abs(j - b)) > 1 for a, b in starts):
+            starts.append((i, j))
+            if len(starts) == candidates:
+                break
+    if not starts:
+        raise ValueError("No stable parameter region found")
+
+    best = None
+    for i, j in starts:
+        grid = coarse
+        for level in range(1, levels + 1):
+            # Gitter ±2 Grobschritte um den besten Punkt, Umgebung weiterhin ±1 Grobschritt
+            w = 2 ** level
+            offsets = np.arange(-2 * w, 2 * w + 1) / w
+            eps_values = np.round(grid["eps"][i] + offsets * h_eps, 9)
+            l_ol_values = np.round(grid["l_ol"][j] + offsets * h_lol, 9)
+            fine = _stability(sweep_transfer_length(values, positions, eps_values[eps_values > 0],
+                                                    l_ol_values[l_ol_values > 0], method), w)
+            ranked = _ranked_points(fine, prefer, scale)
+            if not ranked:
+                break
+            grid, (i, j) = fine, ranked[0]
+        ee, ll = grid["eps"][i], grid["l_ol"][j]
+        key = (grid["score"][i, j], grid["spread_live"][i, j] + grid["spread_dead"][i, j],
+               np.hypot((ee - prefer[0]) / scale[0], (ll - prefer[1]) / scale[1]))
+        if best is None or key < best[0]:
+            best = (key, grid, i, j)
+
+    _, grid, i, j = best
+    return {
+        "eps": float(grid["eps"][i]), "l_ol": float(grid["l_ol"][j]),
+        "live_end": float(grid["live_end"][i, j]), "dead_end": float(grid["dead_end"][i, j]),
+        "spread_live": float(grid["spread_live"][i, j]), "spread_dead": float(grid["spread_dead"][i, j]),
+        "coarse": coarse, "fine": grid,
+    }
+
+
+def transfer_length_history(strain, positions, eps, l_ol, method="histogram"):
+    """
+    Live/Dead End je Zeile einer Dehnungsmatrix (Zeitverlauf).
+
+    Jede Zeile wird wie evaluate_transfer_length auf ihrem Profil ausgewertet
+    (Messstellen mit numerischer Position und gültigem Wert). Leere Zeilen und
+    Zeilen ohne Plateau ergeben NaN. Gibt (live_end, dead_end) als Arrays zurück.
+
+    Für "histogram" und (mit Numba) "window" rechnen die Kerne aus
+    tlc_kernels über alle Zeilen zugleich; sonst wird zeilenweise ausgewertet.
+    """
+    strain = np.asarray(strain, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    if method not in MODE_METHODS:
+        raise ValueError(f"Unknown mode estimator '{method}'")
+    result = tlc_kernels.history(strain, positions, eps, l_ol, method)
+    if result is not None:
+        return result
+    live = np.full(strain.shape[0], np.nan)
+    dead = np.full(strain.shape[0], np.nan)
+    has_pos = ~np.isnan(positions)
+    for i, row in enumerate(strain):
+        keep = has_pos & ~np.isnan(row)
+        if not keep.any():
+            continue
+        try:
+            le, de, _ = evaluate_transfer_length(row[keep], positions[keep], eps, l_ol, method)
+        except ValueError:
+            # z. B. nur negative Dehnungen im Histogramm-Verfahren
+            continue
+        if le is not None:
+            live[i], dead[i] = le, de
+    return live, dead
+
+
+def parse_segments(text):
+    """
+    Liest Segmentdefinitionen der Form "a:b; c:d" (Positionen in mm).
+    Leerer Text ergibt None (gesamte Faser), "auto" ergibt "auto".
+    """
+    text = (text or "").strip()
+    if not text:
+        return None
+    if text.lower() == "auto":
+        return "auto"
+    segments = []
+    for part in text.replace(",", ";").split(";"):
+        part = part.strip()
+        if not part:
+            continue
+        start, sep, end = part.partition(":")
+        if not sep:
+            raise ValueError(f"Segment '{part}' must have the form start:end")
+        start, end = float(start), float(end)
+        if end <= start:
+            raise ValueError(f"Segment '{part}': end must be greater than start")
+        segments.append((start, end))
+    return segments or None
+
+
+def _long_runs(mask, min_run):
+    """Markiert alle Elemente von True-Folgen mit mindestens min_run Elementen."""
+    padded = np.concatenate(([False], mask, [False]))
+    change = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    starts, ends = change[::2], change[1::2]
+    long_runs = (ends - starts) >= min_run
+    out = np.zeros(mask.size + 1, dtype=np.int8)
+    np.add.at(out, starts[long_runs], 1)
+    np.add.at(out, ends[long_runs], -1)
+    return np.cumsum(out[:-1]) > 0
+
+
+def detect_segments(positions, values=None, max_gap=None, zero_tol=None, min_zero_run=5,
+                    min_gauges=2):
+    """
+    Automatische Segmentierung einer Faser in Stränge/Probekörper.
+
+    Getrennt wird
+      - an Lücken in den Positionen größer als max_gap
+        (Standard: 5-facher Median-Messstellenabstand) und
+      - optional an Bereichen nahezu ohne Dehnung (|ε| <= zero_tol über
+        mindestens min_zero_run aufeinanderfolgende Messstellen), sofern
+        values angegeben ist.
+
+    Gibt eine Liste (start, end) der Positionen je Segment zurück; Segmente
+    mit weniger als min_gauges Messstellen werden verworfen.
+    """
+    positions = np.asarray(positions, dtype=float)
+    keep = ~np.isnan(positions)
+    if values is not None:
+        values = np.asarray(values, dtype=float)
+        keep &= ~np.isnan(values)
+        if zero_tol is not None:
+            keep &= ~_long_runs(np.abs(values) <= zero_tol, min_zero_run)
+    idx = np.flatnonzero(keep)
+    if idx.size == 0:
+        return []
+
+    x = positions[idx]
+    if max_gap is None:
+        spacing = np.diff(positions[~np.isnan(positions)])
+        max_gap = 5 * np.median(spacing) if spacing.size else np.inf
+    # neuer Abschnitt bei Positionslücke oder ausgelassener Messstelle
+    breaks = (np.diff(x) > max_gap) | (np.diff(idx) > 1)
+    starts = np.concatenate(([0], np.flatnonzero(breaks) + 1))
+    ends = np.concatenate((starts[1:], [x.size]))
+    return [(float(x[s]), float(x[e - 1])) for s, e in zip(starts, ends) if e - s >= min_gauges]
+
+
+def segment_labels(positions, segments):
+    """Segmentnummer je Messstelle (-1 = keinem Segment zugeordnet)."""
+    positions = np.asarray(positions, dtype=float)
+    labels = np.full(positions.shape, -1, dtype=np.intp)
+    # frühere Segmente haben bei Überlappung Vorrang
+    for k in range(len(segments) - 1, -1, -1):
+        start, end = segments[k]
+        labels[(positions >= start) & (positions <= end)] = k
+    return labels
+
+
+def evaluate_segments(values, positions, segments, eps, l_ol, method="histogram"):
+    r"""
+    Übertragungslänge für mehrere Segmente einer Faser in einem Durchgang.
+
+    Jedes Segment wird wie ein eigenes Profil ausgewertet (eigene Klassen
+    0..max(ε) mit Breite eps, eigene Plateau-Klasse); Klassenzuordnung,
+    Häufigkeiten und Nachbarabstände werden jedoch für alle Segmente
+    gemeinsam vektorisiert berechnet. Live End wird ab Segmentbeginn,
+    Dead End ab der letzten Messstelle des Segments gemessen.
+
+    Die Schätzer "window" und "kde" werden je Segment auf dessen Teilprofil
+    angewendet.
+
+    Gibt je Segment (live_end, dead_end, max_bin_edges) zurück.
+    """
+    values = np.asarray(values, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    if method != "histogram":
+        return _evaluate_segments_each(values, positions, segments, eps, l_ol, method)
+    n_seg = len(segments)
+    if n_seg == 0:
+        return []
+
+    labels = segment_labels(positions, segments)
+    sel = labels >= 0
+    live, dead, lo, hi = _grouped_transfer_length(values[sel], positions[sel], labels[sel], n_seg, eps, l_ol)
+
+    results = []
+    for k in range(n_seg):
+        if np.isnan(lo[k]):
+            results.append((None, None, None))
+            continue
+        live_end = None if np.isnan(live[k]) else float(live[k] - segments[k][0])
+        dead_end = None if np.isnan(dead[k]) else float(dead[k])
+        results.append((live_end, dead_end, (lo[k], hi[k])))
+    return results
+
+
+def _grouped_transfer_length(v, x, lab, n_groups, eps, l_ol):
+    """
+    Histogramm-Verfahren für viele Profile (Gruppen) gleichzeitig.
+
+    v, x, lab: Dehnung, Position und Gruppennummer je Messstelle, innerhalb
+    jeder Gruppe in Spaltenreihenfolge. Jede Gruppe erhält eigene Klassen wie
+    np.arange(0, max + eps, eps); Zuordnung (np.digitize) und Häufigkeit
+    (np.histogram, letzte Klasse rechts geschlossen) werden exakt nachgebildet.
+
+    Gibt Arrays (live_position, dead_end, band_lo, band_hi) je Gruppe zurück,
+    NaN wo kein Ergebnis existiert.
+    """
+    live = np.full(n_groups, np.nan)
+    dead = np.full(n_groups, np.nan)
+    lo = np.full(n_groups, np.nan)
+    hi = np.full(n_groups, np.nan)
+    if v.size == 0:
+        return live, dead, lo, hi
+
+    g_max = np.full(n_groups, -np.inf)
+    np.maximum.at(g_max, lab, v)
+    present = np.isfinite(g_max)
+    # Anzahl Klassen je Gruppe wie bei np.arange(0, max + eps, eps)
+    n_edges = np.zeros(n_groups, dtype=np.intp)
+    n_edges[present] = np.maximum(np.ceil((g_max[present] + eps) / eps), 0).astype(np.intp)
+    n_bins = np.maximum(n_edges - 1, 0)
+    if n_bins.max() == 0:
+        return live, dead, lo, hi
+    bins = np.arange(0, g_max[present].max() + eps, eps)
+
+    # Zuordnung wie np.digitize; für die Häufigkeit ist die letzte Klasse
+    # je Gruppe rechts geschlossen (wie np.histogram)
+    dig = np.searchsorted(bins, v, side="right") - 1
+    hist = dig.copy()
+    g_last = n_bins[lab]
+    at_edge = (g_last > 0) & (dig == g_last) & (v == bins[np.minimum(g_last, bins.size - 1)])
+    hist[at_edge] -= 1
+    counted = (hist >= 0) & (hist < g_last)
+    width = int(n_bins.max())
+    counts = np.bincount(lab[counted] * width + hist[counted],
+                         minlength=n_groups * width).reshape(n_groups, width)
+    mb = np.argmax(counts, axis=1)
+    has_bins = n_bins > 0
+    lo[has_bins] = bins[mb[has_bins]]
+    hi[has_bins] = bins[mb[has_bins] + 1]
+
+    plateau = (dig == mb[lab]) & (dig < g_last)
+    xp, lp = x[plateau], lab[plateau]
+    if not xp.size:
+        # nur Werte auf der oberen Grenze der Plateau-Klasse: kein Live/Dead End
+        return live, dead, lo, hi
+    same_next = lp[:-1] == lp[1:]
+    fwd = np.append(~(same_next & (xp[:-1] + l_ol <= xp[1:])), True)
+    bwd = np.insert(~(same_next & (xp[1:] >= xp[:-1] + l_ol)), 0, True)
+
+    # erste bzw. letzte gültige Plateau-Messstelle je Gruppe
+    fi = np.flatnonzero(fwd)
+    ids, at = np.unique(lp[fi], return_index=True)
+    live[ids] = xp[fi[at]]
+    bi = np.flatnonzero(bwd)[::-1]
+    ids, at = np.unique(lp[bi], return_index=True)
+    last_plateau = np.full(n_groups, np.nan)
+    last_plateau[ids] = xp[bi[at]]
+    # letzte Messstelle je Gruppe (Spaltenreihenfolge)
+    g_end = np.full(n_groups, np.nan)
+    ids, at = np.unique(lab[::-1], return_index=True)
+    g_end[ids] = x[::-1][at]
+    dead = g_end - last_plateau
+    return live, dead, lo, hi
+
+
+def _evaluate_segments_each(values, positions, segments, eps, l_ol, method):
+    labels = segment_labels(positions, segments)
+    results = []
+    for k, (start, _) in enumerate(segments):
+        sel = labels == k
+        if not sel.any():
+            results.append((None, None, None))
+            continue
+        live_end, dead_end, edges = evaluate_transfer_length(values[sel], positions[sel], eps, l_ol, method)
+        if live_end is not None:
+            live_end = float(live_end - start)
+        results.append((live_end, dead_end, edges))
+    return results
+
+
+def evaluate_profile(values, positions, eps, l_ol, segments=None, method="histogram"):
+    """
+    Auswertung eines Profils wie im Dashboard: ganze Faser (segments=None),
+    Positionsbereiche [(start, end), ...] oder "auto" (detect_segments mit
+    zero_tol=eps).
+
+    Gibt je ausgewertetem Bereich ein dict mit "segment" (Bezeichnung),
+    "live_end", "dead_end", "max_bin_edges", "start", "end" (letzte
+    Messstelle) und "mask" (Messstellen des Bereichs) zurück. Leere Segmente
+    werden ausgelassen; findet "auto" kein Segment, wird ValueError ausgelöst.
+    """
+    values = np.asarray(values, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    if segments is None:
+        live_end, dead_end, edges = evaluate_transfer_length(values, positions, eps, l_ol, method)
+        return [{"segment": "all", "live_end": live_end, "dead_end": dead_end, "max_bin_edges": edges,
+                 "start": 0, "end": positions[-1], "mask": np.ones(positions.size, dtype=bool)}]
+
+    if segments == "auto":
+        # Trennung an Positionslücken und längeren Bereichen mit |ε| <= Δε_c
+        segments = detect_segments(positions, values, zero_tol=eps)
+        if not segments:
+            raise ValueError("No segments detected!")
+    rows = []
+    seg_res = evaluate_segments(values, positions, segments, eps, l_ol, method)
+    for k, ((start, end), (live_end, dead_end, edges)) in enumerate(zip(segments, seg_res)):
+        in_seg = (positions >= start) & (positions <= end)
+        if not in_seg.any():
+            continue
+        rows.append({"segment": f"S{k + 1} [{start:g}, {end:g}]", "live_end": live_end, "dead_end": dead_end,
+                     "max_bin_edges": edges, "start": start, "end": positions[in_seg][-1], "mask": in_seg})
+    return rows
+
+
+def estimate_noise(values):
+    """
+    Robuste Schätzung des Messrauschens eines Profils aus dem Residuum zum
+    Mittel der Nachbarn (MAD; Var(Residuum) = 1.5 σ²).
+    """
+    values = np.asarray(values, dtype=float)
+    res = _neighbour_residual(values[np.newaxis, ~np.isnan(values)], axis=1)[0, 1:-1]
+    if res.size == 0:
+        return 0.0
+    mad = np.median(np.abs(res - np.median(res)))
+    return float(1.4826 * mad / np.sqrt(1.5))
+
+
+BOOTSTRAP_CHUNK = 250
+BOOTSTRAP_CHUNK_ELEMENTS = 2_000_000
+
+
+def _bootstrap_chunk(values, positions, eps, l_ol, n, noise, dropout, method, seed):
+    """Ein Block von Replikaten; gibt (live_ends, dead_ends) mit NaN für 'kein Ergebnis' zurück."""
+    rng = np.random.default_rng(seed)
+    m = values.size
+    perturbed = values + rng.normal(0.0, noise, (n, m)) if noise > 0 else np.broadcast_to(values, (n, m))
+    valid = rng.random((n, m)) >= dropout if dropout > 0 else np.ones((n, m), dtype=bool)
+
+    if method == "histogram":
+        # alle Replikate als Gruppen in einem vektorisierten Durchgang
+        rows, cols = np.nonzero(valid)
+        live, dead, _, _ = _grouped_transfer_length(perturbed[rows, cols], positions[cols], rows, n, eps, l_ol)
+        return live, dead
+
+    live = np.full(n, np.nan)
+    dead = np.full(n, np.nan)
+    for b in range(n):
+        keep = valid[b]
+        if not keep.any():
+            continue
+        le, de, _ = evaluate_transfer_length(perturbed[b][keep], positions[keep], eps, l_ol, method)
+        live[b] = np.nan if le is None else le
+        dead[b] = np.nan if de is None else de
+    return live, dead
+
+
+def bootstrap_transfer_length(values, positions, eps, l_ol, n_boot=1000, noise=None, dropout=0.05,
+                              ci=0.95, method="histogram", seed=0, n_jobs=1):
+    r"""
+    Unsicherheit von Live und Dead End durch gestörte Replikate des Profils.
+
+    Jedes Replikat addiert normalverteiltes Rauschen (σ = noise, Standard:
+    estimate_noise(values)) und lässt jede Messstelle mit Wahrscheinlichkeit
+    dropout ausfallen; danach läuft das gewählte Verfahren. Beim Histogramm-
+    Verfahren werden alle Replikate eines Blocks gemeinsam vektorisiert
+    ausgewertet, die übrigen Schätzer je Replikat. Mit n_jobs > 1 werden die
+    Blöcke auf einen Prozesspool verteilt; das Ergebnis hängt nur von seed ab.
+
+    Gibt ein dict mit "live_ci", "dead_ci" ((unten, oben) oder None), den
+    Stichproben "live"/"dead" und "n_valid" zurück.
+    """
+    values = np.asarray(values, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    if noise is None:
+        noise = estimate_noise(values)
+
+    # Blockgröße unabhängig von n_jobs, damit die Zufallsfolgen gleich bleiben
+    chunk = max(1, min(BOOTSTRAP_CHUNK, BOOTSTRAP_CHUNK_ELEMENTS // max(values.size, 1)))
+    sizes = [min(chunk, n_boot - i) for i in range(0, n_boot, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(values, positions, eps, l_ol, n, noise, dropout, method, sq) for n, sq in zip(sizes, seeds)]
+
+    if n_jobs > 1 and len(args) > 1:
+        with process_pool(min(n_jobs, len(args))) as pool:
+            parts = list(pool.map(_bootstrap_chunk, *zip(*args)))
+    else:
+        parts = [_bootstrap_chunk(*a) for a in args]
+    live = np.concatenate([p[0] for p in parts])
+    dead = np.concatenate([p[1] for p in parts])
+
+    q = 100 * np.array([(1 - ci) / 2, 1 - (1 - ci) / 2])
+
+    def interval(samples):
+        if np.isnan(samples).all():
+            return None
+        lo, hi = np.nanpercentile(samples, q)
+        return float(lo), float(hi)
+
+    return {
+        "live_ci": interval(live),
+        "dead_ci": interval(dead),
+        "live": live,
+        "dead": dead,
+        "n_valid": int(np.count_nonzero(~np.isnan(live) & ~np.isnan(dead))),
+    }
+
+
+def default_n_jobs():
+    """Anzahl Prozesse für parallele Auswertungen (höchstens 8)."""
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+def process_pool(max_workers):
+    """
+    Prozesspool für parallele Auswertungen. Mit Numba-Kernen werden die
+    Prozesse per "spawn" gestartet: nach fork() hängen die Kindprozesse im
+    geerbten Thread-Pool der parallelen Kerne (TBB/OpenMP/workqueue).
+    """
+    context = None
+    if tlc_kernels.USE_NUMBA and multiprocessing.get_start_method(allow_none=True) in (None, "fork"):
+        context = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+
+
+class EventDetector:
+    r"""
+    Streaming-Erkennung von Ereignissen in einer Zeitreihe (z. B. Integralverlauf).
+
+    Die Reihe wird blockweise mit feed(times, values[, rows]) übergeben;
+    bestätigte Ereignisse werden sofort zurückgegeben, finish() liefert die
+    restlichen. Speicherbedarf und Aufwand je Wert sind konstant.
+
+    Ereignisse (dicts mit "type", "time", "index", "row", "value", "size";
+    index = laufende Nummer des Werts in der gesamten Reihe, row = die mit
+    feed übergebene Zeilennummer, ohne Angabe gleich index):
+      - "peak":  lokales Maximum, das um mindestens prominence über den
+                 benachbarten Tälern liegt (Zickzack-/Hysterese-Verfahren)
+      - "drop":  Abfall um mehr als drop zwischen zwei Zeitschritten
+      - "crack": letzter Wert vor einem solchen Abfall (Zeit vor Riss)
+    """
+
+    def __init__(self, prominence, drop=None):
+        # Schwelle 0 meldet bei konstanter Reihe jeden zweiten Wert als Maximum
+        if not prominence > 0 or (drop is not None and not drop > 0):
+            raise ValueError("prominence and drop must be positive")
+        self.prominence = prominence
+        self.drop = drop
+        self._index = 0
+        self._prev = None            # (time, index, value, row) des letzten Werts
+        self._peak = None            # Kandidat (time, index, value, row)
+        self._trough = None          # Kandidat (time, index, value, row)
+        self._last_trough = None     # Wert des letzten bestätigten Tals
+        self._rising = None
+
+    @staticmethod
+    def _event(kind, point, size):
+        t, i, v, row = point
+        return {"type": kind, "time": t, "index": i, "row": row, "value": v, "size": size}
+
+    def feed(self, times, values, rows=None):
+        events = []
+        prominence, drop = self.prominence, self.drop
+        times = np.asarray(times, dtype=float).tolist()
+        values = np.asarray(values, dtype=float).tolist()
+        if rows is None:
+            rows = range(self._index, self._index + len(values))
+        else:
+            rows = np.asarray(rows).tolist()
+        for t, v, row in zip(times, values, rows):
+            i = self._index
+            self._index += 1
+            if v != v:  # NaN
+                continue
+            point = (t, i, v, row)
+
+            if drop is not None and self._prev is not None and self._prev[2] - v > drop:
+                size = self._prev[2] - v
+                events.append(self._event("crack", self._prev, size))
+                events.append(self._event("drop", point, size))
+            self._prev = point
+
+            if self._rising is None:
+                self._peak = self._trough = point
+                self._rising = True
+                self._last_trough = v
+                continue
+            if self._rising:
+                if v > self._peak[2]:
+                    self._peak = point
+                elif self._peak[2] - v >= prominence:
+                    # Maximum bestätigt: ausreichend tief gefallen
+                    if self._peak[2] - self._last_trough >= prominence:
+                        events.append(self._event("peak", self._peak, self._peak[2] - max(self._last_trough, v)))
+                    self._rising = False
+                    self._trough = point
+            else:
+                if v < self._trough[2]:
+                    self._trough = point
+                elif v - self._trough[2] >= prominence:
+                    self._last_trough = self._trough[2]
+                    self._rising = True
+                    self._peak = point
+        return events
+
+    def finish(self):
+        """Offenes Maximum am Ende der Reihe (nur linksseitig prominent)."""
+        events = []
+        if self._rising and self._peak is not None and self._peak[2] - self._last_trough >= self.prominence:
+            events.append(self._event("peak", self._peak, self._peak[2] - self._last_trough))
+        self._rising = None
+        return events
+
+
+class GaugeEventDetector:
+    """
+    Streaming-Erkennung von Sprüngen einzelner Messstellen über die Zeit
+    (z. B. Rissöffnung an einer Messstelle). feed(times, strain_block[, rows])
+    liefert je Zeitschritt mit einer Änderung größer als threshold an
+    mindestens einer Messstelle ein Ereignis ("gauge_jump") mit der Messstelle
+    des größten Sprungs ("position", "value", "size") und der Anzahl
+    betroffener Messstellen ("n_gauges"); vektorisiert je Block, der letzte
+    Zeitschritt wird zum nächsten Block übernommen. "index"/"row" wie bei
+    EventDetector.
+    """
+
+    def __init__(self, positions, threshold):
+        if not threshold > 0:
+            raise ValueError("threshold must be positive")
+        self.positions = np.asarray(positions, dtype=float)
+        self.threshold = threshold
+        self._index = 0
+        self._last = None
+
+    def feed(self, times, strain, rows=None):
+        times = np.asarray(times, dtype=float)
+        strain = np.asarray(strain, dtype=float)
+        n = strain.shape[0]
+        if n == 0:
+            return []
+        rows = np.arange(self._index, self._index + n) if rows is None else np.asarray(rows)
+        block = strain if self._last is None else np.vstack((self._last, strain))
+        offset = 0 if self._last is None else 1
+        with np.errstate(invalid="ignore"):
+            jump = np.diff(block, axis=0)
+            size = np.where(np.abs(jump) > self.threshold, np.abs(jump), 0.0)
+        hit = np.flatnonzero(size.any(axis=1))
+        cols = np.argmax(size[hit], axis=1)
+        counts = np.count_nonzero(size[hit], axis=1)
+        events = []
+        for k, j, count in zip(hit.tolist(), cols.tolist(), counts.tolist()):
+            r = k + 1 - offset  # Zeile im aktuellen Block
+            events.append({"type": "gauge_jump", "time": float(times[r]), "index": self._index + r,
+                           "row": int(rows[r]), "position": float(self.positions[j]),
+                           "value": float(block[k + 1, j]), "size": float(jump[k, j]), "n_gauges": count})
+        self._index += n
+        self._last = strain[-1:]
+        return events
+
+
+def _robust_sigma(steps):
+    steps = steps[~np.isnan(steps)]
+    if not steps.size:
+        return 0.0
+    return float(1.4826 * np.median(np.abs(steps - np.median(steps))))
+
+
+def event_thresholds(values):
+    """
+    Schwellen (prominence, drop) für EventDetector aus einer Reihe, damit
+    Rauschen keine Ereignisse erzeugt: prominence = max(5 % der Spannweite,
+    6 σ), drop = max(2 % der Spannweite, 6 σ), mit σ = robuste Streuung der
+    Änderung zwischen zwei Zeitschritten. None für eine konstante Reihe.
+    """
+    values = np.asarray(values, dtype=float)
+    finite = values[~np.isnan(values)]
+    span = float(finite.max() - finite.min()) if finite.size else 0.0
+    if span == 0:
+        return None
+    sigma = _robust_sigma(np.diff(finite))
+    return max(0.05 * span, 6 * sigma), max(0.02 * span, 6 * sigma)
+
+
+def detect_events(times, values, prominence=None, drop=None, chunk_size=10000, rows=None):
+    """
+    Ereignisse einer vollständigen Reihe über den Streaming-Detektor.
+
+    Fehlende Schwellen kommen aus event_thresholds; eine konstante Reihe hat
+    dann keine Ereignisse. rows: Zeilennummern der Werte (Schlüssel "row").
+    """
+    if prominence is None or drop is None:
+        thresholds = event_thresholds(values)
+        if thresholds is None:
+            return []
+        prominence = thresholds[0] if prominence is None else prominence
+        drop = thresholds[1] if drop is None else drop
+    detector = EventDetector(prominence, drop)
+    events = []
+    for start in range(0, len(values), chunk_size):
+        chunk_rows = None if rows is None else rows[start:start + chunk_size]
+        events += detector.feed(times[start:start + chunk_size], values[start:start + chunk_size], chunk_rows)
+    return events + detector.finish()
+
+
+def gauge_threshold(strain, sample_rows=10000):
+    """
+    Schwelle für GaugeEventDetector: max(10 % der Spannweite der Matrix, 10 σ)
+    mit σ = robuste Streuung der Änderungen je Messstelle zwischen zwei
+    Zeitschritten, geschätzt an den ersten sample_rows Zeilen. Höher als beim
+    Integral, da das Rauschen einzelner Messstellen nicht gemittelt wird und
+    bei vielen Werten auch weit ausläuft. None für eine konstante oder leere
+    Matrix.
+    """
+    strain = np.asarray(strain, dtype=float)
+    if not strain.size or np.isnan(strain).all():
+        return None
+    span = float(np.nanmax(strain) - np.nanmin(strain))
+    if span == 0:
+        return None
+    return max(0.1 * span, 10 * _robust_sigma(np.diff(strain[:sample_rows], axis=0).ravel()))
+
+
+def detect_gauge_events(dataset, threshold=None, chunk_rows=10000):
+    """
+    Sprünge einzelner Messstellen in der Auswertungsmatrix (nur gültige
+    Zeilen), blockweise über GaugeEventDetector. Ohne threshold aus
+    gauge_threshold; eine konstante Matrix hat dann keine Ereignisse.
+    """
+    rows = dataset.valid_rows()
+    strain = dataset.analysis_strain()
+    if threshold is None:
+        threshold = gauge_threshold(strain)
+        if threshold is None:
+            return []
+    detector = GaugeEventDetector(dataset.positions, threshold)
+    events = []
+    for start in range(0, rows.size, chunk_rows):
+        chunk = rows[start:start + chunk_rows]
+        events += detector.feed(dataset.times[chunk], strain[chunk], chunk)
+    return events
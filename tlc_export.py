@@ -0,0 +1,240 @@
+"""
+Tabellen-Export von Integralverlauf, Zeitverlauf der Übertragungslänge und
+Dehnungsmatrizen (ohne Qt-Abhängigkeit).
+
+Die Tabellen werden blockweise geschrieben, ohne sie vorher als DataFrame
+aufzubauen: CSV in Blöcken über pandas, Excel über eine write-only-Arbeitsmappe
+von openpyxl (Zeilen gehen direkt in die Datei). Mehr Zeilen, als ein
+Excel-Blatt fasst, werden auf Folgeblätter verteilt. Die Zieldatei wird erst
+nach vollständigem Schreiben ersetzt.
+
+Quelle ist ein DFOSDataset (mit dessen SRA-Einstellung) oder ein
+tlc_store.ChunkedStore. progress(done, total) wird nach jedem Block
+aufgerufen; gibt es False zurück, bricht der Export mit ExportCancelled ab.
+"""
+import os
+
+import numpy as np
+
+import tlc_kernels
+from tlc_core import DEFAULT_SRA_Z, integral_series, transfer_length_history
+from tlc_store import stream_integral
+
+EXPORT_CHUNK_ROWS = 4096
+# Zeilen je Fortschrittsmeldung im Zeitverlauf für Schätzer, die zeilenweise
+# ausgewertet werden (ohne Blockkern in tlc_kernels)
+ROW_WISE_CHUNK_ROWS = 128
+EXPORT_FORMATS = (".csv", ".xlsx")
+EXCEL_MAX_ROWS = 1_048_576
+EXCEL_MAX_COLUMNS = 16_384
+
+# Art -> Beschreibung für export_strain
+STRAIN_KINDS = {
+    "raw": "measured strain",
+    "masked": "strain with SRAs masked (empty cells)",
+    "cleaned": "strain with SRAs and dropouts interpolated",
+    "mask": "SRA mask (1 = anomaly)",
+}
+
+
+class ExportCancelled(Exception):
+    """Export über progress abgebrochen; es wurde keine Datei angelegt."""
+
+
+def _header_cell(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class TableWriter:
+    """
+    Schreibt eine Tabelle blockweise als .csv oder .xlsx (nach Dateiendung).
+
+        with TableWriter(path, ["Row", "Time [s]"]) as w:
+            w.write(rows, times)
+
+    write() nimmt Spalten (1D) und Spaltenblöcke (2D) gleicher Länge. NaN wird
+    als leere Zelle geschrieben. Bei einer Ausnahme im with-Block bleibt die
+    Zieldatei unverändert.
+    """
+
+    def __init__(self, path, header, sheet="Data"):
+        self.ext = os.path.splitext(path)[1].lower()
+        if self.ext not in EXPORT_FORMATS:
+            raise ValueError(f"Export format must be one of {', '.join(EXPORT_FORMATS)}")
+        if self.ext == ".xlsx" and len(header) > EXCEL_MAX_COLUMNS:
+            raise ValueError(f"{len(header)} columns exceed the Excel limit of {EXCEL_MAX_COLUMNS}; export as CSV")
+        self.path = path
+        self.header = [_header_cell(h) for h in header]
+        self.sheet = sheet
+        self.rows = 0
+        self._tmp = path + ".tmp"
+        if self.ext == ".csv":
+            import csv
+
+            self._file = open(self._tmp, "w", newline="", encoding="utf-8")
+            csv.writer(self._file).writerow(self.header)
+        else:
+            import openpyxl
+
+            self._book = openpyxl.Workbook(write_only=True)
+            self._sheet = None
+            self._sheet_rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _new_sheet(self):
+        n = len(self._book.worksheets)
+        self._sheet = self._book.create_sheet(self.sheet if n == 0 else f"{self.sheet} ({n + 1})")
+        self._sheet.append(self.header)
+        self._sheet_rows = 1
+
+    def write(self, *columns):
+        parts = [np.asarray(c) for c in columns]
+        parts = [p[:, None] if p.ndim == 1 else p for p in parts]
+        n = parts[0].shape[0]
+        if not n:
+            return
+        if self.ext == ".csv":
+            import pandas as pd
+
+            frame = pd.concat([pd.DataFrame(p) for p in parts], axis=1, ignore_index=True)
+            frame.to_csv(self._file, header=False, index=False, lineterminator="\n")
+        else:
+            cells = np.empty((n, sum(p.shape[1] for p in parts)), dtype=object)
+            j = 0
+            for p in parts:
+                block = p.astype(object)
+                if p.dtype.kind == "f":
+                    block[np.isnan(p)] = None
+                cells[:, j:j + p.shape[1]] = block
+                j += p.shape[1]
+            for row in cells.tolist():
+                if self._sheet is None or self._sheet_rows >= EXCEL_MAX_ROWS:
+                    self._new_sheet()
+                self._sheet.append(row)
+                self._sheet_rows += 1
+        self.rows += n
+
+    def close(self):
+        try:
+            if self.ext == ".csv":
+                self._file.close()
+            else:
+                if self._sheet is None:
+                    self._new_sheet()
+                self._book.save(self._tmp)
+            # schlägt z. B. fehl, wenn die Zieldatei unter Windows in Excel geöffnet ist
+            os.replace(self._tmp, self.path)
+        except BaseException:
+            if os.path.exists(self._tmp):
+                os.remove(self._tmp)
+            raise
+
+    def abort(self):
+        if self.ext == ".csv":
+            self._file.close()
+        else:
+            # offene Blätter der write-only-Arbeitsmappe schließen (schreibt nur in temporäre Dateien)
+            for sheet in self._book.worksheets:
+                sheet.close()
+        if os.path.exists(self._tmp):
+            os.remove(self._tmp)
+
+
+def _report(progress, done, total):
+    if progress is not None and progress(done, total) is False:
+        raise ExportCancelled()
+
+
+def _is_store(source):
+    # Duck-Typing statt isinstance: tlc_store kann auch als Skript (__main__) laufen
+    return hasattr(source, "iter_blocks")
+
+
+def _blocks(source, matrix=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """(erste Zeile, Block) über die Matrix eines Datensatzes bzw. die Blöcke eines Stores."""
+    if _is_store(source):
+        yield from source.iter_blocks()
+        return
+    matrix = source.analysis_strain() if matrix is None else matrix
+    for start in range(0, matrix.shape[0], chunk_rows):
+        yield start, matrix[start:start + chunk_rows]
+
+
+def export_integral(source, path, progress=None):
+    """Integralverlauf (Zeilen mit Werten) mit den Spalten Row, Time [s], Integral."""
+    if _is_store(source):
+        times, integrals, rows = stream_integral(source)
+    else:
+        times, integrals, rows = integral_series(source)
+    with TableWriter(path, ["Row", "Time [s]", "Integral [‰]"], sheet="Integral") as w:
+        for start in range(0, rows.size, EXPORT_CHUNK_ROWS):
+            stop = start + EXPORT_CHUNK_ROWS
+            w.write(rows[start:stop], times[start:stop], integrals[start:stop])
+            _report(progress, min(stop, rows.size), rows.size)
+    return w.rows
+
+
+def _history_chunk_rows(method):
+    fast = method == "histogram" or (tlc_kernels.USE_NUMBA and method == "window")
+    return EXPORT_CHUNK_ROWS if fast else ROW_WISE_CHUNK_ROWS
+
+
+def export_time_history(source, path, eps, l_ol, method="histogram", step=1, progress=None):
+    """
+    Live/Dead End je step-ter Zeile (wie tlc_store.stream_time_history),
+    blockweise berechnet und geschrieben. Leere Zellen = kein Ergebnis.
+    Zeilenweise ausgewertete Schätzer melden den Fortschritt je
+    ROW_WISE_CHUNK_ROWS Zeilen, damit ein Abbruch schnell greift.
+    """
+    n_times = source.n_times
+    chunk = _history_chunk_rows(method)
+    with TableWriter(path, ["Row", "Time [s]", "Live End [mm]", "Dead End [mm]"], sheet="Transfer length") as w:
+        for start, block in _blocks(source):
+            sel = np.arange((-start) % step, block.shape[0], step)
+            for k in range(0, sel.size, chunk):
+                part = sel[k:k + chunk]
+                live, dead = transfer_length_history(block[part], source.positions, eps, l_ol, method)
+                w.write(part + start, np.asarray(source.times[part + start]), live, dead)
+                _report(progress, min(start + int(part[-1]) + 1, n_times), n_times)
+            _report(progress, min(start + block.shape[0], n_times), n_times)
+    return w.rows
+
+
+def export_strain(source, path, kind="masked", progress=None):
+    """
+    Dehnungsmatrix im Eingabeformat (Spaltenköpfe = Positionen, letzte Spalte
+    = Zeit), so dass die Datei wieder geöffnet werden kann. kind siehe
+    STRAIN_KINDS; SRA-Parameter aus source.sra_options (sonst Standardwerte).
+    Stores bieten nur "raw".
+    """
+    if kind not in STRAIN_KINDS:
+        raise ValueError(f"kind must be one of {', '.join(STRAIN_KINDS)}")
+    if _is_store(source):
+        if kind != "raw":
+            raise ValueError("SRA masking is not available for stores")
+        matrix = None
+    else:
+        options = source.sra_options or {}
+        z_thresh, max_jump = options.get("z_thresh", DEFAULT_SRA_Z), options.get("max_jump")
+        if kind == "raw":
+            matrix = source.strain
+        elif kind == "mask":
+            matrix = source.sra_mask(z_thresh, max_jump)
+        else:
+            matrix = source.cleaned_strain(z_thresh, max_jump, interpolate=kind == "cleaned")
+
+    n_times = source.n_times
+    with TableWriter(path, list(source.columns) + ["Time [s]"], sheet="Strain") as w:
+        for start, block in _blocks(source, matrix):
+            block = block.astype(np.int8) if block.dtype == bool else block
+            w.write(block, np.asarray(source.times[start:start + block.shape[0]]))
+            _report(progress, min(start + block.shape[0], n_times), n_times)
+    return w.rows
@@ -0,0 +1,240 @@
+"""
+Rechenkerne für Zeitverlauf und Parameter-Sweep (ohne Qt-Abhängigkeit).
+
+Ist Numba installiert, werden die Schleifenkerne beim ersten Aufruf
+kompiliert (Zeitverlauf zeilenparallel über prange); sonst wird der
+Zeitverlauf im Histogramm-Verfahren zeilenweise vektorisiert mit NumPy
+berechnet. Alle Varianten liefern Wert für Wert dieselben Ergebnisse wie
+tlc_core.evaluate_transfer_length (gleiche Klassengrenzen k·eps, gleiche
+Vergleiche). TLC_KERNELS=numpy schaltet Numba ab.
+
+Die Schleifenkerne sind ohne Numba gewöhnliche Python-Funktionen und bleiben
+so auch ohne Numba prüfbar.
+"""
+import os
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+USE_NUMBA = numba is not None and os.environ.get("TLC_KERNELS", "").lower() != "numpy"
+
+# Zeilen je Block im NumPy-Zeitverlauf (begrenzt die Hilfsmatrizen)
+CHUNK_ROWS = 1024
+
+
+def _jit(parallel=False):
+    if numba is None:
+        return lambda fn: fn
+    return numba.njit(cache=True, parallel=parallel)
+
+
+_prange = numba.prange if numba is not None else range
+
+
+def backend():
+    """Aktive Variante: "numba" oder "numpy"."""
+    return "numba" if USE_NUMBA else "numpy"
+
+
+# --- Schleifenkerne (Numba) ---
+
+@_jit()
+def _live_dead_loop(xs, last_position, l_ol):
+    """Wie tlc_core._live_dead als Schleife; NaN = kein Plateau."""
+    n = xs.shape[0]
+    if n == 0:
+        return np.nan, np.nan
+    i = 0
+    while i < n - 1 and xs[i] + l_ol <= xs[i + 1]:
+        i += 1
+    j = n - 1
+    while j > 0 and xs[j] >= xs[j - 1] + l_ol:
+        j -= 1
+    return xs[i], last_position - xs[j]
+
+
+@_jit()
+def _live_dead_many_loop(xs, last_position, l_ols):
+    live = np.empty(l_ols.shape[0])
+    dead = np.empty(l_ols.shape[0])
+    for k in range(l_ols.shape[0]):
+        live[k], dead[k] = _live_dead_loop(xs, last_position, l_ols[k])
+    return live, dead
+
+
+@_jit()
+def _edge_index(v, eps):
+    """Größtes i mit i·eps <= v (Klassengrenzen wie np.arange(0, ..., eps))."""
+    i = np.floor(v / eps)
+    while i * eps > v:
+        i -= 1
+    while (i + 1) * eps <= v:
+        i += 1
+    return i
+
+
+@_jit()
+def _histogram_row(values, x, eps, l_ol):
+    """Live/Dead End eines Profils ohne NaN im Histogramm-Verfahren (NaN = kein Ergebnis)."""
+    n = values.shape[0]
+    m = values.max()
+    if not np.isfinite(m):
+        return np.nan, np.nan
+    n_edges = np.ceil((m + eps) / eps)
+    if n_edges < 2:
+        # keine Klasse (nur negative Dehnungen); evaluate_transfer_length: ValueError
+        return np.nan, np.nan
+    n_bins = int(n_edges) - 1
+    top = n_bins * eps
+    counts = np.zeros(n_bins, dtype=np.int64)
+    bins = np.empty(n, dtype=np.int64)
+    for c in range(n):
+        b = int(_edge_index(values[c], eps)) if values[c] >= 0 else -1
+        bins[c] = b
+        if b >= 0 and values[c] <= top:
+            counts[min(b, n_bins - 1)] += 1
+    mb = np.argmax(counts)
+    xs = x[bins == mb]
+    return _live_dead_loop(xs, x[n - 1], l_ol)
+
+
+@_jit()
+def _window_row(values, x, eps, l_ol):
+    """Live/Dead End eines Profils ohne NaN im Fenster-Verfahren."""
+    v = np.sort(values)
+    counts = np.searchsorted(v, v + eps) - np.arange(v.shape[0])
+    lo = v[np.argmax(counts)]
+    xs = x[(values >= lo) & (values < lo + eps)]
+    return _live_dead_loop(xs, x[x.shape[0] - 1], l_ol)
+
+
+def _history_loop(row_fn):
+    @_jit(parallel=True)
+    def history(strain, positions, eps, l_ol):
+        n_rows = strain.shape[0]
+        live = np.full(n_rows, np.nan)
+        dead = np.full(n_rows, np.nan)
+        has_pos = ~np.isnan(positions)
+        for r in _prange(n_rows):
+            keep = has_pos & ~np.isnan(strain[r])
+            if keep.any():
+                live[r], dead[r] = row_fn(strain[r][keep], positions[keep], eps, l_ol)
+        return live, dead
+    return history
+
+
+_history_histogram_loop = _history_loop(_histogram_row)
+_history_window_loop = _history_loop(_window_row)
+
+
+# --- NumPy-Varianten ---
+
+def _live_dead_flat(row, xs, n_rows, last, l_ol):
+    """
+    _live_dead für viele Zeilen zugleich: row/xs = Zeile und Position der
+    Plateau-Messstellen, nach Zeile und Position sortiert. Zeilen ohne
+    Plateau-Messstelle ergeben NaN.
+    """
+    live = np.full(n_rows, np.nan)
+    dead = np.full(n_rows, np.nan)
+    if not row.size:
+        return live, dead
+    same = row[1:] == row[:-1]
+    fwd = np.ones(row.size, dtype=bool)
+    fwd[:-1] = ~same | ~(xs[:-1] + l_ol <= xs[1:])
+    bwd = np.ones(row.size, dtype=bool)
+    bwd[1:] = ~same | ~(xs[1:] >= xs[:-1] + l_ol)
+    # erste fwd- bzw. letzte bwd-Messstelle je Zeile
+    k = np.flatnonzero(fwd)
+    first = k[np.concatenate([[True], row[k][1:] != row[k][:-1]])]
+    live[row[first]] = xs[first]
+    k = np.flatnonzero(bwd)
+    final = k[np.concatenate([row[k][1:] != row[k][:-1], [True]])]
+    dead[row[final]] = last[row[final]] - xs[final]
+    return live, dead
+
+
+def _history_histogram_numpy(strain, positions, eps, l_ol, chunk_rows=CHUNK_ROWS):
+    """
+    Zeitverlauf im Histogramm-Verfahren blockweise über alle Zeilen zugleich.
+    Die Häufigkeiten liegen je Zeile hintereinander in einem Array (so viele
+    Klassen wie die Zeile benötigt), die Plateau-Klasse ist je Zeile die erste
+    mit maximaler Häufigkeit.
+    """
+    has_pos = ~np.isnan(positions)
+    x = positions[has_pos]
+    live = np.full(strain.shape[0], np.nan)
+    dead = np.full(strain.shape[0], np.nan)
+    if not x.size:
+        return live, dead
+
+    for start in range(0, strain.shape[0], chunk_rows):
+        v = np.asarray(strain[start:start + chunk_rows])
+        v = np.ascontiguousarray(v if has_pos.all() else v[:, has_pos])
+        m = np.fmax.reduce(v, axis=1)  # Zeilenmaximum ohne NaN (NaN = leere Zeile)
+        with np.errstate(invalid="ignore", over="ignore"):
+            n_edges = np.ceil((m + eps) / eps)
+        ok = np.isfinite(m) & (n_edges >= 2)
+        if not ok.any():
+            continue
+        n_bins = np.where(ok, n_edges - 1, 0)
+
+        # Klassenindex wie np.digitize(v, k·eps) - 1; nur wenige Werte brauchen eine Korrektur
+        vb = np.clip(v, -1.0, None)
+        vb[~ok] = -1.0
+        vb = vb.ravel()
+        b = np.floor(vb / eps)
+        with np.errstate(invalid="ignore"):
+            fix = np.flatnonzero((b * eps > vb) | ((b + 1) * eps <= vb))
+        while fix.size:
+            bf, vf = b[fix], vb[fix]
+            bf = bf - (bf * eps > vf) + ((bf + 1) * eps <= vf)
+            b[fix] = bf
+            fix = fix[(bf * eps > vf) | ((bf + 1) * eps <= vf)]
+        b = b.reshape(v.shape)
+
+        offsets = np.concatenate([[0], np.cumsum(n_bins)[:-1]])
+        with np.errstate(invalid="ignore"):
+            counted = ok[:, None] & (v >= 0) & (v <= (n_bins * eps)[:, None])
+        flat = (np.minimum(b, n_bins[:, None] - 1) + offsets[:, None])[counted].astype(np.intp)
+        counts = np.bincount(flat, minlength=int(n_bins.sum()))
+        rows = np.flatnonzero(ok)
+        seg = np.repeat(np.arange(rows.size), n_bins[rows].astype(np.intp))
+        starts = offsets[rows].astype(np.intp)
+        hits = np.flatnonzero(counts == np.maximum.reduceat(counts, starts)[seg])
+        mb = np.full(v.shape[0], np.nan)
+        mb[rows] = hits[np.unique(seg[hits], return_index=True)[1]] - starts
+
+        row, col = np.nonzero(b == mb[:, None])
+        last = x[x.size - 1 - np.argmax(~np.isnan(v[:, ::-1]), axis=1)]
+        chunk_live, chunk_dead = _live_dead_flat(row, x[col], v.shape[0], last, l_ol)
+        live[start:start + v.shape[0]] = chunk_live
+        dead[start:start + v.shape[0]] = chunk_dead
+    return live, dead
+
+
+# --- Auswahl zur Laufzeit ---
+
+def live_dead_many(xs, last_position, l_ols):
+    """Numba-Variante von tlc_core._live_dead_many (nur bei USE_NUMBA)."""
+    return _live_dead_many_loop(np.ascontiguousarray(xs, dtype=float), float(last_position),
+                                np.ascontiguousarray(l_ols, dtype=float))
+
+
+def history(strain, positions, eps, l_ol, method):
+    """
+    Live/Dead End je Zeile mit dem schnellsten verfügbaren Kern oder None,
+    wenn es für method keinen gibt (dann wertet tlc_core zeilenweise aus).
+    """
+    eps, l_ol = float(eps), float(l_ol)
+    if USE_NUMBA and method in ("histogram", "window"):
+        kernel = _history_histogram_loop if method == "histogram" else _history_window_loop
+        return kernel(np.ascontiguousarray(strain, dtype=float), np.ascontiguousarray(positions, dtype=float),
+                      eps, l_ol)
+    if method == "histogram":
+        return _history_histogram_numpy(strain, positions, eps, l_ol)
+    return None
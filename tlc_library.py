@@ -0,0 +1,262 @@
+"""
+Mehrere gleichzeitig geöffnete Messungen für den Probekörpervergleich
+(ohne Qt-Abhängigkeit).
+
+DatasetLibrary hält die Datensätze in einem LRU-Cache mit Speichergrenze.
+Jede Messdatei wird beim ersten Öffnen einmal gelesen. Erst wenn ein
+Datensatz aus dem Speicher verdrängt wird, wird er zusammen mit seinem
+Integralverlauf als unkomprimierte Projektdatei (tlc_session, Speicherart
+"raw") im Benutzer-Cache-Verzeichnis abgelegt (nicht neben der Messdatei).
+Verdrängte oder in einer späteren Sitzung erneut geöffnete Datensätze werden
+von dort memory-gemappt; die Excel-Datei wird nicht erneut gelesen.
+"""
+import glob
+import hashlib
+import mmap
+import os
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+
+from tlc_core import DFOSDataset, integral_series, select_row, evaluate_profile
+from tlc_session import save_project, load_project
+
+MAX_BYTES = 1 << 30
+MAX_DATASETS = 16
+
+
+def user_cache_dir():
+    """
+    Verzeichnis für verdrängte Datensätze: TLC_CACHE_DIR, sonst
+    %LOCALAPPDATA%\\TLC_DFOS bzw. ~/.cache/TLC_DFOS (jeweils Unterordner "library").
+    """
+    base = os.environ.get("TLC_CACHE_DIR")
+    if not base:
+        root = (os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+                or os.path.join(os.path.expanduser("~"), ".cache"))
+        base = os.path.join(root, "TLC_DFOS")
+    return os.path.join(base, "library")
+
+
+def _writable_dir(*candidates):
+    """Erstes Verzeichnis, das sich anlegen lässt, sonst None."""
+    for path in candidates:
+        try:
+            os.makedirs(path, exist_ok=True)
+        except OSError:
+            continue
+        if os.access(path, os.W_OK):
+            return path
+    return None
+
+
+def _read_file(path):
+    import pandas as pd
+
+    return pd.read_csv(path) if path.lower().endswith(".csv") else pd.read_excel(path)
+
+
+def _is_mapped(array):
+    """True, wenn das Array (oder seine Basis) ein Memory-Mapping ist."""
+    while isinstance(array, np.ndarray):
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return isinstance(array, mmap.mmap)
+
+
+def resident_bytes(dataset):
+    """Arbeitsspeicher der Matrix und der zwischengespeicherten Arrays (ohne Memory-Mappings)."""
+    arrays = [dataset.strain]
+    for value in dataset._cache.values():
+        arrays += list(value) if isinstance(value, tuple) else [value]
+    return sum(a.nbytes for a in arrays if isinstance(a, np.ndarray) and not _is_mapped(a))
+
+
+class DatasetLibrary:
+    """
+    Geöffnete Messungen, adressiert über einen Schlüssel aus Pfad, Größe und
+    Änderungszeit der Datei (gleiche Datei = gleicher Schlüssel).
+
+    Übersteigen die geladenen Datensätze max_bytes Arbeitsspeicher oder
+    max_datasets Stück, werden die am längsten ungenutzten beim Verdrängen in
+    cache_dir geschrieben (Standard: user_cache_dir(), ersatzweise das
+    temporäre Verzeichnis) und aus dem Speicher entfernt; get() lädt sie bei
+    Bedarf von dort nach. Veraltete Cache-Dateien derselben Messdatei werden
+    dabei gelöscht. Datensätze ohne Quelldatei oder ohne beschreibbares
+    Cache-Verzeichnis bleiben im Speicher.
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES, max_datasets=MAX_DATASETS, cache_dir=None):
+        self.max_bytes = max_bytes
+        self.max_datasets = max_datasets
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+
+    def _cache_dir(self):
+        if self.cache_dir is None:
+            self.cache_dir = _writable_dir(user_cache_dir(),
+                                           os.path.join(tempfile.gettempdir(), "TLC_DFOS", "library")) or ""
+        return self.cache_dir or None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def keys(self):
+        return list(self._entries)
+
+    def open(self, path, name=None, reader=None):
+        """
+        Öffnet eine Messdatei (.xlsx/.csv, letzte Spalte = Zeit) und gibt ihren
+        Schlüssel zurück. reader(path) -> DataFrame ersetzt das Einlesen mit
+        pandas (z. B. mit Fortschrittsanzeige); er wird nur aufgerufen, wenn die
+        Datei weder geöffnet noch im Cache-Verzeichnis abgelegt ist.
+        """
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        key = hashlib.sha1(f"{path}|{st.st_size}|{st.st_mtime_ns}".encode()).hexdigest()[:16]
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return key
+
+        # library_<Pfadkennung>_<Schlüssel>.tlcp: ältere Stände derselben Datei erkennbar
+        cache_dir = self._cache_dir()
+        prefix = "library_" + hashlib.sha1(path.encode()).hexdigest()[:16]
+        cache_file = os.path.join(cache_dir, f"{prefix}_{key}.tlcp") if cache_dir else None
+
+        if cache_file and os.path.exists(cache_file):
+            dataset, _ = load_project(cache_file)
+            dataset.source = path
+        else:
+            df = (reader or _read_file)(path)
+            if df is None:
+                raise ValueError(f"Could not read {path}")
+            dataset = DFOSDataset.from_dataframe(df, source=path)
+            integral_series(dataset)
+
+        self._entries[key] = {"name": name or os.path.splitext(os.path.basename(path))[0], "path": path,
+                              "dataset": dataset, "cache_file": cache_file,
+                              "shape": (dataset.n_times, dataset.n_gauges)}
+        self._shrink(keep=key)
+        return key
+
+    def add(self, dataset, name):
+        """
+        Nimmt einen bereits geladenen Datensatz ohne Quelldatei auf (bleibt im
+        Speicher); derselbe Datensatz ergibt denselben Schlüssel.
+        """
+        key = f"mem_{id(dataset):x}"
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return key
+        self._entries[key] = {"name": name, "path": dataset.source, "dataset": dataset, "cache_file": None,
+                              "shape": (dataset.n_times, dataset.n_gauges)}
+        self._shrink(keep=key)
+        return key
+
+    def get(self, key):
+        """Datensatz zum Schlüssel; verdrängte Datensätze werden memory-gemappt nachgeladen."""
+        entry = self._entries[key]
+        self._entries.move_to_end(key)
+        if entry["dataset"] is None:
+            dataset, _ = load_project(entry["cache_file"])
+            dataset.source = entry["path"]
+            entry["dataset"] = dataset
+            self._shrink(keep=key)
+        return entry["dataset"]
+
+    def name(self, key):
+        return self._entries[key]["name"]
+
+    def info(self, key):
+        entry = self._entries[key]
+        return {"key": key, "name": entry["name"], "path": entry["path"], "n_times": entry["shape"][0],
+                "n_gauges": entry["shape"][1], "loaded": entry["dataset"] is not None}
+
+    def is_loaded(self, key):
+        return self._entries[key]["dataset"] is not None
+
+    def remove(self, key):
+        self._entries.pop(key, None)
+
+    def _shrink(self, keep=None):
+        """Verdrängt die am längsten ungenutzten Datensätze, bis beide Grenzen eingehalten sind."""
+        loaded = [k for k, e in self._entries.items() if e["dataset"] is not None]
+        total = sum(resident_bytes(self._entries[k]["dataset"]) for k in loaded)
+        for k in list(loaded):
+            if total <= self.max_bytes and len(loaded) <= self.max_datasets:
+                break
+            entry = self._entries[k]
+            if k == keep or not self._write_cache(entry):
+                continue
+            total -= resident_bytes(entry["dataset"])
+            entry["dataset"] = None
+            loaded.remove(k)
+
+
+    @staticmethod
+    def _write_cache(entry):
+        """
+        Legt den Datensatz beim Verdrängen einmal im Cache-Verzeichnis ab und
+        löscht ältere Stände derselben Messdatei. False, wenn er im Speicher
+        bleiben muss.
+        """
+        cache_file = entry["cache_file"]
+        if cache_file is None:
+            return False
+        if os.path.exists(cache_file):
+            return True
+        prefix = os.path.basename(cache_file).rsplit("_", 1)[0]
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            for old in glob.glob(os.path.join(os.path.dirname(cache_file), prefix + "_*.tlcp")):
+                os.remove(old)
+            save_project(cache_file, entry["dataset"], strain="raw")
+        except OSError:
+            return False
+        return True
+
+
+def compare_specimens(library, keys, eps, l_ol, method="histogram", time="max", sra=False):
+    """
+    Wertet mehrere Datensätze der Bibliothek mit gleichen Parametern aus.
+
+    time wie tlc_core.select_row (je Datensatz, Standard: Integralmaximum).
+    sra gilt für alle Datensätze; die eigene SRA-Einstellung der Datensätze
+    wird danach wiederhergestellt.
+
+    Gibt je Schlüssel ein dict mit "key", "name", "row", "time", "times",
+    "integrals", "values", "positions", "live_end", "dead_end",
+    "max_bin_edges" und "error" (Text oder None) zurück.
+    """
+    results = []
+    for key in keys:
+        dataset = library.get(key)
+        entry = {"key": key, "name": library.name(key), "row": None, "time": None, "times": np.empty(0),
+                 "integrals": np.empty(0), "values": np.empty(0), "positions": np.empty(0),
+                 "live_end": None, "dead_end": None, "max_bin_edges": None, "error": None}
+        previous = dataset.sra_options
+        if sra:
+            dataset.set_sra_options()
+        else:
+            dataset.clear_sra_options()
+        try:
+            times, integrals, _ = integral_series(dataset)
+            entry["times"], entry["integrals"] = times, integrals
+            row = select_row(dataset, time)
+            values, positions = dataset.profile(row)
+            entry.update(row=row, time=float(dataset.times[row]), values=values, positions=positions)
+            if values.size == 0:
+                raise ValueError("No data in the selected row")
+            res = evaluate_profile(values, positions, eps, l_ol, None, method)[0]
+            entry.update(live_end=res["live_end"], dead_end=res["dead_end"], max_bin_edges=res["max_bin_edges"])
+        except ValueError as e:
+            entry["error"] = str(e)
+        finally:
+            dataset.sra_options = previous
+        results.append(entry)
+    return results
@@ -0,0 +1,323 @@
+"""
+Plots des Transfer Length Calculators (ohne Qt-Abhängigkeit).
+
+Alle Plots arbeiten direkt mit matplotlib.figure.Figure (ohne pyplot), damit
+sie auch in Hintergrundprozessen und ohne laufende Qt-Anwendung erzeugt
+werden können.
+"""
+import os
+
+import numpy as np
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
+from matplotlib.gridspec import GridSpec, GridSpecFromSubplotSpec
+from matplotlib.lines import Line2D
+from matplotlib.patches import FancyArrowPatch, Patch, Polygon
+
+from tlc_core import DFOSDataset, integral_series
+
+ARROW_COLOR = '#13338E'
+
+
+def plot_integral_figure(times, integrals, events=None, selected_time=None):
+    """
+    Integralverlauf als Figure (ohne Speichern): Linie, rote Markierung bei
+    selected_time (Standard: Maximum) und optional Ereignis-Marker.
+    """
+    if selected_time is None:
+        selected_time = times[np.argmax(integrals)]
+    fig = Figure(figsize=(8, 6))
+    ax_line = fig.add_subplot(111)
+    ax_line.plot(times, integrals, color='black', linestyle='-', linewidth=1.5, label='Integral Deformation')
+    ax_line.axvline(x=selected_time, color='red', linestyle='--', linewidth=4.0, label='Zeit vor Riss')
+    for kind, marker, color in (("peak", "^", ARROW_COLOR), ("crack", "x", "red"), ("drop", "v", "gray")):
+        pts = [(e["time"], e["value"]) for e in (events or []) if e["type"] == kind]
+        if pts:
+            ax_line.plot(*zip(*pts), linestyle='none', marker=marker, color=color, markersize=8, label=kind)
+    ax_line.set_xlabel(r'$t \ [\mathrm{s}]$', fontsize=12)
+    ax_line.set_ylabel(r'$\int \varepsilon \,\mathrm{d}x$ [-‰]', fontsize=12)
+    ax_line.tick_params(axis='both', which='major', labelsize=12)
+    ax_line.grid(True, which='major', linestyle='--', linewidth=1, zorder=0)
+    ax_line.grid(True, which='minor', linestyle=':', linewidth=0.5, zorder=0)
+    ax_line.minorticks_on()
+    fig.tight_layout()
+
+    return fig
+
+
+def plot_integral_with_max(data, output_folder, filename="integral_plot.pdf", progress_callback=None,
+                           events=None, selected_time=None):
+    r"""
+    Erstellt einen Plot mit:
+      - Liniendiagramm (Zeit vs. Integral der Deformation)
+      - Roter Linie an der Stelle des maximalen Integrals
+      - y-Achsen-Label = r'$\int_{0}^{L} \varepsilon \,\mathrm{d}x$ [-‰]'
+      - Gitternetz (Major/Minor) und angepasste Tick-Labels
+
+    data ist ein DFOSDataset oder ein DataFrame (letzte Spalte = Zeit). Das Integral
+    wird vektorisiert über alle Zeilen berechnet (siehe tlc_core.integral_series);
+    ist die SRA-Bereinigung des Datensatzes aktiv, wird die bereinigte Matrix
+    verwendet. progress_callback(total, total) wird nach der Berechnung aufgerufen.
+
+    events: optional Ereignisse aus tlc_core.detect_events (als Marker gezeichnet);
+    selected_time: Zeit der roten Linie statt des globalen Maximums.
+
+    Speichert den Plot als PDF und PNG in output_folder und gibt (fig, max_time) zurück.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+
+    dataset = data if isinstance(data, DFOSDataset) else DFOSDataset.from_dataframe(data)
+
+    # Zeilen, in denen ALLE Deformationswerte NaN sind, werden ausgelassen;
+    # partielle NaNs zählen als 0
+    times, integrals, _ = integral_series(dataset)
+    if times.size == 0:
+        print("Plot wird nicht erstellt, da alle Zeilen NaN sind.")
+        return None, None
+
+    if progress_callback is not None:
+        progress_callback(times.size, times.size)
+
+    max_idx = np.argmax(integrals)
+    max_time = times[max_idx]
+
+    fig = plot_integral_figure(times, integrals, events=events,
+                               selected_time=max_time if selected_time is None else selected_time)
+
+    basename = os.path.splitext(filename)[0]
+    fig.savefig(os.path.join(output_folder, f"{basename}.pdf"), format='pdf')
+    fig.savefig(os.path.join(output_folder, f"{basename}.png"), format='png')
+
+    return fig, max_time
+
+
+def _padded(lo, hi, margin=0.05):
+    """Achsgrenzen mit Rand wie beim Autoscaling von matplotlib."""
+    if not np.isfinite(lo) or not np.isfinite(hi):
+        return -1.0, 1.0
+    if hi == lo:
+        pad = abs(lo) * margin or 1.0
+    else:
+        pad = (hi - lo) * margin
+    return lo - pad, hi + pad
+
+
+class TransferLengthPlot:
+    """
+    Wiederverwendbarer Transfer-Length-Plot (Histogramm links, Profil rechts).
+
+    Achsen und Artists werden einmal angelegt; update() setzt nur Liniendaten,
+    Balken (eine PolyCollection), Plateau-Bänder, Linien, Pfeile und Legende
+    neu. Die Figur kann in einen Qt-Canvas eingebettet oder mit save()
+    gespeichert werden.
+    """
+
+    def __init__(self, figsize=(10, 6), fig=None, subplot_spec=None):
+        """subplot_spec: optional Bereich einer bestehenden Figur (z. B. Berichtsseite)."""
+        self.fig = fig if fig is not None else Figure(figsize=figsize)
+        if subplot_spec is None:
+            gs = GridSpec(1, 2, figure=self.fig, width_ratios=[1, 3], wspace=0.04)
+        else:
+            gs = GridSpecFromSubplotSpec(1, 2, subplot_spec=subplot_spec, width_ratios=[1, 3], wspace=0.04)
+        self.ax_hist = self.fig.add_subplot(gs[0, 0])
+        self.ax = self.fig.add_subplot(gs[0, 1], sharey=self.ax_hist)
+        ax_hist, ax = self.ax_hist, self.ax
+
+        # Histogramm als eine Collection
+        self.bars = PolyCollection([], edgecolors='black', linewidths=1.0)
+        ax_hist.add_collection(self.bars)
+        ax_hist.set_xlabel(r'$n$', fontsize=14)
+        ax_hist.set_ylabel(r'$\epsilon_\mathrm{c}\ [-‰]$', fontsize=14, labelpad=14)
+        ax_hist.tick_params(axis="y", left=True, right=False, labelleft=True)
+        ax_hist.yaxis.set_label_position("left")
+        ax_hist.yaxis.set_ticks_position('left')
+        ax_hist.grid(axis='y', ls='--', lw=0.5)
+
+        # Profil, Plateau-Bänder, Live/Dead-End-Linien und Unsicherheitsbänder
+        self.line, = ax.plot([], [], 'k-', lw=1.5, zorder=3)
+        self.band_full = Polygon([(0, 0), (1, 0), (1, 0), (0, 0)], closed=True, facecolor='lightblue',
+                                 alpha=0.7, linewidth=0, visible=False, transform=ax.get_yaxis_transform())
+        ax.add_patch(self.band_full)
+        self.band_segments = PolyCollection([], facecolors='lightblue', alpha=0.7, linewidths=0)
+        ax.add_collection(self.band_segments)
+        self.ci_spans = PolyCollection([], facecolors=ARROW_COLOR, alpha=0.15, linewidths=0,
+                                       transform=ax.get_xaxis_transform())
+        ax.add_collection(self.ci_spans)
+        self.end_lines = LineCollection([], colors=ARROW_COLOR, linestyles='--', linewidths=1.5,
+                                        transform=ax.get_xaxis_transform())
+        ax.add_collection(self.end_lines)
+        self.arrows = []
+
+        ax.set_xlabel(r'$x\ [\mathrm{mm}]$', fontsize=14)
+        ax.set_ylabel("")
+        ax.tick_params(axis="y", left=False, right=False, labelleft=False, labelright=False)
+        ax.grid(True, which='both', ls='--', lw=0.5)
+        ax.set_autoscale_on(False)
+        ax_hist.set_autoscale_on(False)
+
+    def _set_arrows(self, coords, y_arrow):
+        """Passt die Anzahl der Pfeile an und setzt ihre Positionen."""
+        while len(self.arrows) < len(coords):
+            arrow = FancyArrowPatch((0, 0), (0, 0), arrowstyle='<|-|>', mutation_scale=20,
+                                    color=ARROW_COLOR, lw=1.5, clip_on=False)
+            self.ax.add_patch(arrow)
+            self.arrows.append(arrow)
+        while len(self.arrows) > len(coords):
+            self.arrows.pop().remove()
+        for arrow, (a, b) in zip(self.arrows, coords):
+            arrow.set_positions((a, y_arrow), (b, y_arrow))
+
+    def update(self, values, positions, live_end, dead_end, l_ol, eps, max_bin_edges,
+               segments=None, uncertainty=None, y_limits=None):
+        """
+        Zeichnet ein neues Ergebnis: Dehnungsprofil values über positions,
+        Live/Dead End, Plateau-Klasse max_bin_edges = (unten, oben) und die
+        Klassenbreite eps des Histogramms.
+
+        segments: optional Liste (start, end, live_end, dead_end, max_bin_edges) je
+        Segment; dann werden Live/Dead End und Plateau-Klasse je Segment
+        eingezeichnet (Live End ab start, Dead End ab end) statt der
+        Einzelwerte für die gesamte Faser.
+
+        uncertainty: optional je Faser/Segment (live_ci, dead_ci) als Intervalle
+        (unten, oben) oder None; wird als schattiertes Band eingezeichnet.
+
+        y_limits: feste Dehnungsachse (z. B. gleich für mehrere Auswertungen).
+        """
+        x_vals = np.asarray(positions, dtype=float)
+        y_vals = np.asarray(values, dtype=float)
+        ax, ax_hist = self.ax, self.ax_hist
+        if segments:
+            spans = [(start, end, le, de) for start, end, le, de, _ in segments]
+            bands = [seg[4] for seg in segments if seg[4] is not None]
+        else:
+            spans = [(0, x_vals[-1], live_end, dead_end)]
+            bands = [max_bin_edges] if max_bin_edges else []
+
+        # Histogramm (bei negativen Dehnungen beginnen die Klassen unter 0)
+        if eps and eps > 0:
+            start = min(0, np.floor(np.nanmin(y_vals) / eps) * eps)
+            bins = np.arange(start, np.nanmax(y_vals) + eps, eps)
+        else:
+            bins = 10
+        counts, bin_edges = np.histogram(y_vals, bins=bins)
+        y_pos = (bin_edges[:-1] + bin_edges[1:]) / 2
+        # Klassen im Plateau-Band hervorheben
+        highlight = np.zeros(len(counts), dtype=bool)
+        for lo, hi in bands:
+            highlight |= (y_pos >= lo) & (y_pos < hi)
+        height = bin_edges[1] - bin_edges[0]
+        y_lo = y_pos - height / 2
+        y_hi = y_pos + height / 2
+        neg = -counts.astype(float)
+        zero = np.zeros_like(neg)
+        verts = np.stack([np.column_stack(c) for c in
+                          ((zero, y_lo), (neg, y_lo), (neg, y_hi), (zero, y_hi))], axis=1)
+        self.bars.set_verts(verts)
+        self.bars.set_facecolors(np.where(highlight, 'lightblue', 'gray'))
+        ax_hist.set_xlim(-max(counts.max(), 1) * 1.1, 0)
+        ax_hist.set_ylim(y_limits if y_limits else _padded(bin_edges[0], bin_edges[-1]))
+
+        # Profil
+        self.line.set_data(x_vals, y_vals)
+        ax.set_xlim(_padded(np.nanmin(x_vals), np.nanmax(x_vals)))
+        x0, x1 = ax.get_xlim()
+        y0, y1 = ax.get_ylim()
+
+        # Plateau-Bänder
+        if segments:
+            self.band_full.set_visible(False)
+            self.band_segments.set_verts([[(s, e[0]), (end, e[0]), (end, e[1]), (s, e[1])]
+                                          for s, end, _, _, e in segments if e is not None])
+        else:
+            self.band_segments.set_verts([])
+            if max_bin_edges:
+                lo, hi = max_bin_edges
+                self.band_full.set_xy([(0, lo), (1, lo), (1, hi), (0, hi)])
+            self.band_full.set_visible(bool(max_bin_edges))
+
+        # Live/Dead-End-Linien, Unsicherheitsbänder und Pfeile
+        lines, ci, arrows = [], [], []
+        for start, end, le, de in spans:
+            if le is not None:
+                lines.append([(start + le, 0), (start + le, 1)])
+                arrows.append((start, np.clip(start + le, x0, x1)))
+            if de is not None:
+                lines.append([(end - de, 0), (end - de, 1)])
+                arrows.append((np.clip(end - de, x0, x1), np.clip(end, x0, x1)))
+        for (start, end, _, _), (live_ci, dead_ci) in zip(spans, uncertainty or []):
+            if live_ci is not None:
+                a, b = start + live_ci[0], start + live_ci[1]
+                ci.append([(a, 0), (b, 0), (b, 1), (a, 1)])
+            if dead_ci is not None:
+                a, b = end - dead_ci[1], end - dead_ci[0]
+                ci.append([(a, 0), (b, 0), (b, 1), (a, 1)])
+        self.end_lines.set_segments(lines)
+        self.ci_spans.set_verts(ci)
+        self._set_arrows(arrows, y0 + (y1 - y0) / 3)
+
+        # Legende
+        handles = [Line2D([], [], color='black', lw=1.5)]
+        labels = ['DFOS']
+        if ci:
+            handles.append(Patch(color=ARROW_COLOR, alpha=0.15, lw=0))
+            labels.append('95% CI')
+        if bands:
+            handles.append(Patch(color='lightblue', alpha=0.7))
+            labels.append('RMS')
+        handles.append(Line2D([], [], ls=' '))
+        labels.append(rf'$l_{{ol}}={l_ol:.1f}\,\mathrm{{mm}},\Delta \epsilon_{{c}}={eps:.3f}\,\mathrm{{‰}}$')
+        ax.legend(handles, labels, fontsize=10, loc='best')
+
+    def save(self, path, **kwargs):
+        self.fig.savefig(path, **kwargs)
+
+
+def plot_comparison(specimens, fig=None, normalize=False):
+    """
+    Vergleich mehrerer Probekörper (Ergebnisse aus tlc_library.compare_specimens):
+    Integralverläufe oben (Marker bei der Auswertezeit), Dehnungsprofile unten
+    mit Live End (durchgezogen) und Dead End (gestrichelt) in der Farbe des
+    Probekörpers. normalize=True teilt jeden Integralverlauf durch sein Maximum.
+
+    Eine übergebene Figure wird geleert und wiederverwendet.
+    """
+    if fig is None:
+        fig = Figure(figsize=(10, 8))
+    fig.clear()
+    ax_int, ax_prof = fig.subplots(2, 1)
+    colors = [f"C{i % 10}" for i in range(len(specimens))]
+
+    for spec, color in zip(specimens, colors):
+        times, integrals = spec["times"], spec["integrals"]
+        scale = 1.0
+        if normalize and integrals.size and np.nanmax(np.abs(integrals)) > 0:
+            scale = 1.0 / np.nanmax(np.abs(integrals))
+        ax_int.plot(times, integrals * scale, color=color, linewidth=1.2, label=spec["name"])
+        if spec["time"] is not None and integrals.size:
+            k = np.argmin(np.abs(times - spec["time"]))
+            ax_int.plot(times[k], integrals[k] * scale, marker='o', color=color, markersize=7)
+
+        if spec["values"].size:
+            ax_prof.plot(spec["positions"], spec["values"], color=color, linewidth=1.0, label=spec["name"])
+            if spec["live_end"] is not None:
+                # Live End ab x = 0, Dead End ab der letzten Messstelle (wie TransferLengthPlot)
+                ax_prof.axvline(spec["live_end"], color=color, linestyle='-', linewidth=2.0, alpha=0.8)
+                ax_prof.axvline(spec["positions"][-1] - spec["dead_end"], color=color, linestyle='--',
+                                linewidth=2.0, alpha=0.8)
+
+    ax_int.set_xlabel(r'$t \ [\mathrm{s}]$', fontsize=12)
+    ax_int.set_ylabel(r'$\int \varepsilon \,\mathrm{d}x$ / max [-]' if normalize
+                      else r'$\int \varepsilon \,\mathrm{d}x$ [-‰]', fontsize=12)
+    ax_prof.set_xlabel(r'$x\ [\mathrm{mm}]$', fontsize=12)
+    ax_prof.set_ylabel(r'$\varepsilon\ [‰]$', fontsize=12)
+    for ax in (ax_int, ax_prof):
+        ax.grid(True, which='major', linestyle='--', linewidth=1, zorder=0)
+        ax.tick_params(axis='both', which='major', labelsize=11)
+    if specimens:
+        ax_int.legend(fontsize=10, loc='best')
+        handles = [Line2D([], [], color='gray', linestyle='-', linewidth=2.0),
+                   Line2D([], [], color='gray', linestyle='--', linewidth=2.0)]
+        ax_prof.legend(handles, ['Live End', 'Dead End'], fontsize=10, loc='best')
+    fig.tight_layout()
+    return fig
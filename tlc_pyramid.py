@@ -0,0 +1,171 @@
+"""
+Mehrstufige Min/Max/Mittelwert-Pyramide der Dehnungs-Zeit-Matrix für die
+Heatmap-Ansicht (ohne Qt-Abhängigkeit).
+
+Stufe 0 ist die Originalmatrix; jede weitere Stufe fasst 2 x 2 Werte
+(Zeit x Position) der vorherigen zusammen. Die Stufen werden als .npy-Dateien
+im Cache-Verzeichnis neben der Quelldatei abgelegt und per Memory-Mapping
+geladen, so dass für eine Ansicht nur der sichtbare Ausschnitt der passenden
+Stufe gelesen wird.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from tlc_core import dataset_cache_dir, dataset_fingerprint
+
+STATS = ("min", "max", "mean")
+MIN_LEVEL_SIZE = 256
+
+
+def _reduce(mins, maxs, sums, counts):
+    """Fasst je 2 x 2 Werte zusammen (NaN-bewusst); ungerade Ränder werden aufgefüllt."""
+    n_rows, n_cols = mins.shape
+    pr, pc = n_rows % 2, n_cols % 2
+    if pr or pc:
+        pad = ((0, pr), (0, pc))
+        mins = np.pad(mins, pad, constant_values=np.nan)
+        maxs = np.pad(maxs, pad, constant_values=np.nan)
+        sums = np.pad(sums, pad)
+        counts = np.pad(counts, pad)
+    with np.errstate(invalid="ignore"):
+        new_min = np.fmin(mins[0::2], mins[1::2])
+        new_min = np.fmin(new_min[:, 0::2], new_min[:, 1::2])
+        new_max = np.fmax(maxs[0::2], maxs[1::2])
+        new_max = np.fmax(new_max[:, 0::2], new_max[:, 1::2])
+    new_sum = sums[0::2] + sums[1::2]
+    new_sum = new_sum[:, 0::2] + new_sum[:, 1::2]
+    new_count = counts[0::2] + counts[1::2]
+    new_count = new_count[:, 0::2] + new_count[:, 1::2]
+    return new_min, new_max, new_sum, new_count
+
+
+def _reduce_windows(block, row_step, col_step, stat):
+    """
+    Fasst block in Fenster von row_step x col_step Werten zusammen (NaN-bewusst,
+    letztes Fenster je Achse ggf. kürzer): min/max des Fensters bzw. Mittelwert
+    der gültigen Werte.
+    """
+    rows = np.arange(0, block.shape[0], row_step)
+    cols = np.arange(0, block.shape[1], col_step)
+    if stat in ("min", "max"):
+        ufunc = np.fmin if stat == "min" else np.fmax
+        return ufunc.reduceat(ufunc.reduceat(block, rows, axis=0), cols, axis=1)
+    valid = ~np.isnan(block)
+    sums = np.add.reduceat(np.add.reduceat(np.where(valid, block, 0.0), rows, axis=0), cols, axis=1)
+    counts = np.add.reduceat(np.add.reduceat(valid.astype(np.int64), rows, axis=0), cols, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+class StrainPyramid:
+    """
+    Pyramide über strain (n_zeiten x n_sensoren).
+
+    levels[k] ist ein dict {"min", "max", "mean"} der Stufe k (k >= 1);
+    Stufe 0 greift direkt auf die Originalmatrix zu.
+    """
+
+    def __init__(self, strain, levels):
+        self.strain = strain
+        self.levels = levels
+
+    @classmethod
+    def build(cls, strain, min_size=MIN_LEVEL_SIZE):
+        """Baut alle Stufen, bis beide Achsen höchstens min_size Werte haben."""
+        levels = [None]
+        mins = maxs = strain
+        valid = ~np.isnan(strain)
+        sums = np.where(valid, strain, 0.0)
+        counts = valid.astype(np.int32)
+        while max(mins.shape) > min_size:
+            mins, maxs, sums, counts = _reduce(mins, maxs, sums, counts)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = np.where(counts > 0, sums / counts, np.nan)
+            levels.append({"min": mins, "max": maxs, "mean": mean})
+        return cls(strain, levels)
+
+    @classmethod
+    def for_dataset(cls, dataset, min_size=MIN_LEVEL_SIZE):
+        """
+        Pyramide der Auswertungsmatrix des Datensatzes; mit Quelldatei aus dem
+        bzw. in den Disk-Cache (Memory-Mapping beim Laden).
+        """
+        strain = dataset.analysis_strain()
+        cache = dataset_cache_dir(dataset)
+        if cache is None:
+            return cls.build(strain, min_size)
+
+        key = f"{dataset_fingerprint(dataset)}|{dataset.sra_options!r}|{min_size}"
+        folder = os.path.join(cache, "pyramid_" + hashlib.sha1(key.encode()).hexdigest()[:16])
+        meta_path = os.path.join(folder, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            levels = [None] + [
+                {stat: np.load(os.path.join(folder, f"level{k}_{stat}.npy"), mmap_mode="r") for stat in STATS}
+                for k in range(1, meta["n_levels"])
+            ]
+            return cls(strain, levels)
+
+        pyramid = cls.build(strain, min_size)
+        os.makedirs(folder, exist_ok=True)
+        for k, level in enumerate(pyramid.levels[1:], start=1):
+            for stat in STATS:
+                np.save(os.path.join(folder, f"level{k}_{stat}.npy"), level[stat])
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "n_levels": len(pyramid.levels)}, f)
+        return pyramid
+
+    @property
+    def n_levels(self):
+        return len(self.levels)
+
+    def level_shape(self, level):
+        if level == 0:
+            return self.strain.shape
+        return self.levels[level]["mean"].shape
+
+    def choose_level(self, n_rows, n_cols, height_px, width_px):
+        """
+        Gröbste Stufe, die den Ausschnitt noch mindestens in Pixelauflösung zeigt.
+        Die Stufen verkleinern beide Achsen gleich, daher bestimmt die im
+        Verhältnis zur Pixelzahl kürzere Achse die Stufe.
+        """
+        level = 0
+        while (level + 1 < self.n_levels
+               and n_rows / 2 ** (level + 1) >= height_px
+               and n_cols / 2 ** (level + 1) >= width_px):
+            level += 1
+        return level
+
+    def view(self, rows, cols, height_px, width_px, stat="mean"):
+        """
+        Ausschnitt für eine Ansicht: rows/cols = (start, stop) in Originalindizes.
+        Gelesen wird nur der sichtbare Bereich der passenden Stufe; die Achse,
+        die dort noch mehr als doppelt so viele Werte wie Pixel hat (stark
+        nicht quadratische Ausschnitte), wird fensterweise mit stat
+        zusammengefasst (Spitzen bleiben in "max"/"min" erhalten), so dass das
+        Bild höchstens etwa doppelt so groß wie die Zeichenfläche ist.
+
+        Gibt (bild, level, (r0, r1, c0, c1)) zurück; r0..c1 sind die vom Bild
+        abgedeckten Originalindizes (halboffen, Bildpunkte gleich groß bis auf
+        den am Matrixrand gekürzten letzten).
+        """
+        height_px, width_px = max(1, int(height_px)), max(1, int(width_px))
+        r0, r1 = max(0, int(rows[0])), min(self.strain.shape[0], int(np.ceil(rows[1])))
+        c0, c1 = max(0, int(cols[0])), min(self.strain.shape[1], int(np.ceil(cols[1])))
+        level = self.choose_level(r1 - r0, c1 - c0, height_px, width_px)
+        f = 2 ** level
+        lr0, lr1 = r0 // f, -(-r1 // f)
+        lc0, lc1 = c0 // f, -(-c1 // f)
+        row_step = max(1, (lr1 - lr0) // height_px)
+        col_step = max(1, (lc1 - lc0) // width_px)
+        source = self.strain if level == 0 else self.levels[level][stat]
+        image = np.asarray(source[lr0:lr1, lc0:lc1])
+        if row_step > 1 or col_step > 1:
+            image = _reduce_windows(image, row_step, col_step, stat)
+        n_rows, n_cols = self.strain.shape
+        return image, level, (lr0 * f, min(lr1 * f, n_rows), lc0 * f, min(lc1 * f, n_cols))
@@ -0,0 +1,378 @@
+"""
+Kampagnenbericht des Transfer Length Calculators (ohne Qt-Abhängigkeit).
+
+Wertet viele Probekörper aus und schreibt ein mehrseitiges PDF (Übersicht,
+dann je Probekörper Integralverlauf, Ergebnistabelle und Transfer-Length-Plot)
+sowie eine Excel-Zusammenfassung. Die Auswertung läuft in einem Prozesspool;
+die Seiten werden im Hauptprozess in Eingabereihenfolge als Vektorgrafik
+gezeichnet (Text bleibt auswählbar und durchsuchbar).
+
+Aufruf ohne GUI:
+    python tlc_report.py kampagne.xlsx bericht.pdf [--xlsx zusammenfassung.xlsx] [--jobs 8]
+"""
+import argparse
+import os
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+from matplotlib.gridspec import GridSpec
+
+from tlc_core import (
+    RESULT_KEYS, DFOSDataset, integral_series, select_row, parse_segments, evaluate_profile,
+    bootstrap_transfer_length, default_n_jobs, process_pool
+)
+from tlc_plots import TransferLengthPlot
+
+SUMMARY_KEYS = ["Specimen", "File"] + RESULT_KEYS + ["Error"]
+A4_LANDSCAPE = (11.69, 8.27)
+TABLE_ROWS_PER_PAGE = 28
+# Sekunden zwischen zwei progress_callback-Aufrufen während der Auswertung im Pool
+POLL_INTERVAL = 0.1
+
+# Standardwerte wie im Dashboard; time: None = Integralmaximum, "first" = erste Messung
+SPECIMEN_DEFAULTS = {
+    "name": None, "time": None, "eps": 0.023, "l_ol": 17.0, "segments": None,
+    "method": "histogram", "sra": False, "ci": False,
+}
+
+
+class ReportCancelled(Exception):
+    """Bericht über progress_callback abgebrochen; es wurde keine Datei geschrieben."""
+
+
+def specimen(path, **options):
+    """Beschreibung eines Probekörpers (dict mit den Schlüsseln aus SPECIMEN_DEFAULTS und "path")."""
+    unknown = set(options) - set(SPECIMEN_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown specimen options: {', '.join(sorted(unknown))}")
+    spec = dict(SPECIMEN_DEFAULTS, path=path, **options)
+    if spec["name"] is None:
+        spec["name"] = os.path.splitext(os.path.basename(path))[0]
+    return spec
+
+
+def _as_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "ja", "x")
+    return bool(value)
+
+
+def read_campaign(path):
+    """
+    Liest eine Kampagnentabelle (.xlsx oder .csv) mit einer Zeile je Probekörper.
+
+    Spalten: file (Pflicht), optional name, time, eps, l_ol, segments, method,
+    sra, ci. Leere Zellen ergeben die Standardwerte; relative Dateipfade
+    beziehen sich auf den Ordner der Tabelle.
+    """
+    df = pd.read_csv(path) if path.lower().endswith(".csv") else pd.read_excel(path)
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    if "file" not in df.columns:
+        raise ValueError("Campaign table needs a 'file' column")
+    base = os.path.dirname(os.path.abspath(path))
+
+    specs = []
+    for rec in df.to_dict("records"):
+        if pd.isna(rec["file"]):
+            continue
+        options = {k: v for k, v in rec.items() if k in SPECIMEN_DEFAULTS and not pd.isna(v)}
+        for key in ("eps", "l_ol"):
+            if key in options:
+                options[key] = float(options[key])
+        for key in ("sra", "ci"):
+            if key in options:
+                options[key] = _as_bool(options[key])
+        for key in ("name", "segments", "method"):
+            if key in options:
+                options[key] = str(options[key]).strip()
+        if "time" in options and str(options["time"]).strip().lower() not in ("first", "max"):
+            options["time"] = float(options["time"])
+        specs.append(specimen(os.path.join(base, str(rec["file"]).strip()), **options))
+    return specs
+
+
+def is_campaign_table(path):
+    """True, wenn die Tabelle eine Spalte "file" hat (nur Kopfzeile wird gelesen)."""
+    head = pd.read_csv(path, nrows=0) if path.lower().endswith(".csv") else pd.read_excel(path, nrows=0)
+    return "file" in [str(c).strip().lower() for c in head.columns]
+
+
+def _load_dataset(path):
+    """Messdatei (.xlsx oder .csv, letzte Spalte = Zeit) als DFOSDataset."""
+    df = pd.read_csv(path) if path.lower().endswith(".csv") else pd.read_excel(path)
+    return DFOSDataset.from_dataframe(df, source=path)
+
+
+def evaluate_specimen(spec):
+    """
+    Wertet einen Probekörper aus: Zeitwahl, Profil, Live/Dead End je Segment
+    und optional Bootstrap-Intervalle.
+
+    Gibt ein dict mit "rows" (Ergebniszeilen mit SUMMARY_KEYS), "series"
+    (Zeiten, Integrale), "time", "profile" (Werte, Positionen) und
+    "evaluated" (Ergebnis von evaluate_profile) zurück.
+    """
+    dataset = _load_dataset(spec["path"])
+    if spec["sra"]:
+        dataset.set_sra_options()
+    idx = select_row(dataset, spec["time"])
+    times, integrals, _ = integral_series(dataset)
+    selected_time = float(dataset.times[idx])
+
+    y_arr, x_arr = dataset.profile(idx)
+    if y_arr.size == 0:
+        raise ValueError("No data in the selected row")
+    eps, l_ol, method = spec["eps"], spec["l_ol"], spec["method"]
+    segments = parse_segments(spec["segments"] or "")
+    evaluated = evaluate_profile(y_arr, x_arr, eps, l_ol, segments, method)
+
+    rows = []
+    for r in evaluated:
+        live_ci, dead_ci = None, None
+        if spec["ci"]:
+            res = bootstrap_transfer_length(y_arr[r["mask"]], x_arr[r["mask"]], eps, l_ol, method=method)
+            live_ci, dead_ci = res["live_ci"], res["dead_ci"]
+            if live_ci is not None:
+                live_ci = (live_ci[0] - r["start"], live_ci[1] - r["start"])
+        r["ci"] = (live_ci, dead_ci)
+        rows.append({
+            "Specimen": spec["name"],
+            "File": spec["path"],
+            "Time [s]": selected_time,
+            "Segment": r["segment"],
+            "Mode": method,
+            "Δε₍c₎ [‰]": eps,
+            "l₍ol₎ [mm]": l_ol,
+            "Live End [mm]": r["live_end"],
+            "Dead End [mm]": r["dead_end"],
+            "Live End 95% CI [mm]": f"{live_ci[0]:.1f}–{live_ci[1]:.1f}" if live_ci else "",
+            "Dead End 95% CI [mm]": f"{dead_ci[0]:.1f}–{dead_ci[1]:.1f}" if dead_ci else "",
+            "Error": "",
+        })
+    return {"rows": rows, "series": (times, integrals), "time": selected_time,
+            "profile": (y_arr, x_arr), "evaluated": evaluated}
+
+
+def _fmt(value, digits=1):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return "–"
+    if isinstance(value, (int, float, np.floating)):
+        return f"{value:.{digits}f}"
+    return str(value)
+
+
+def render_specimen_page(spec, result):
+    """Berichtsseite eines ausgewerteten Probekörpers (Figure, Ergebnis von evaluate_specimen)."""
+    fig = Figure(figsize=A4_LANDSCAPE)
+    gs = GridSpec(2, 2, figure=fig, height_ratios=[1, 1.5], width_ratios=[3, 2],
+                  left=0.08, right=0.97, top=0.9, bottom=0.08, hspace=0.35, wspace=0.12)
+    fig.suptitle(f"{spec['name']}   (t = {result['time']:.3f} s, Δε_c = {spec['eps']:g} ‰, "
+                 f"l_ol = {spec['l_ol']:g} mm, {spec['method']})", fontsize=13)
+
+    # Integralverlauf mit gewählter Zeit
+    times, integrals = result["series"]
+    ax_int = fig.add_subplot(gs[0, 0])
+    ax_int.plot(times, integrals, color='black', linewidth=1.2)
+    ax_int.axvline(result["time"], color='red', linestyle='--', linewidth=2.0)
+    ax_int.set_xlabel(r'$t \ [\mathrm{s}]$', fontsize=10)
+    ax_int.set_ylabel(r'$\int \varepsilon \,\mathrm{d}x$ [-‰]', fontsize=10)
+    ax_int.grid(True, which='major', linestyle='--', linewidth=0.5)
+
+    # Ergebnistabelle
+    ax_tab = fig.add_subplot(gs[0, 1])
+    ax_tab.set_axis_off()
+    cells = []
+    for row in result["rows"]:
+        cells.append([row["Segment"], _fmt(row["Live End [mm]"]), _fmt(row["Dead End [mm]"]),
+                      row["Live End 95% CI [mm]"] or "–", row["Dead End 95% CI [mm]"] or "–"])
+    height = min(1.0, 0.12 * (len(cells) + 1))
+    table = ax_tab.table(cellText=cells, colLabels=["Segment", "Live End", "Dead End", "Live CI", "Dead CI"],
+                         colWidths=[0.32, 0.14, 0.14, 0.2, 0.2], bbox=[0, 1 - height, 1, height],
+                         cellLoc="center")
+    table.auto_set_font_size(False)
+    table.set_fontsize(8)
+
+    # Transfer-Length-Plot
+    evaluated = result["evaluated"]
+    y_arr, x_arr = result["profile"]
+    plot = TransferLengthPlot(fig=fig, subplot_spec=gs[1, :])
+    uncertainty = [r["ci"] for r in evaluated] if spec["ci"] else None
+    if spec["segments"]:
+        seg_plot = [(r["start"], r["end"], r["live_end"], r["dead_end"], r["max_bin_edges"]) for r in evaluated]
+        plot.update(y_arr, x_arr, None, None, spec["l_ol"], spec["eps"], None,
+                    segments=seg_plot, uncertainty=uncertainty)
+    else:
+        r = evaluated[0]
+        plot.update(y_arr, x_arr, r["live_end"], r["dead_end"], spec["l_ol"], spec["eps"], r["max_bin_edges"],
+                    uncertainty=uncertainty)
+    return fig
+
+
+def process_specimen(spec):
+    """
+    Auswertung eines Probekörpers (läuft im Prozesspool).
+    Fehler werden nicht ausgelöst, sondern als Zeile mit "Error" zurückgegeben.
+    Gibt (rows, result) zurück; result ist None, wenn die Auswertung fehlschlug.
+    """
+    try:
+        result = evaluate_specimen(spec)
+        return result["rows"], result
+    except Exception as e:
+        row = dict.fromkeys(SUMMARY_KEYS, "")
+        row.update({"Specimen": spec["name"], "File": spec["path"], "Error": f"{type(e).__name__}: {e}"})
+        return [row], None
+
+
+def _shorten(text, n):
+    return text if len(text) <= n else text[:n - 1] + "…"
+
+
+def _summary_pages(pdf, summary, title):
+    """Übersichtstabelle über alle Probekörper, TABLE_ROWS_PER_PAGE Zeilen je Seite."""
+    columns = ["Specimen", "Time [s]", "Segment", "Δε₍c₎ [‰]", "l₍ol₎ [mm]", "Live End [mm]", "Dead End [mm]",
+               "Live End 95% CI [mm]", "Dead End 95% CI [mm]", "Error"]
+    widths = [0.1, 0.06, 0.13, 0.06, 0.06, 0.08, 0.08, 0.1, 0.1, 0.23]
+    digits = {"Time [s]": 3, "Δε₍c₎ [‰]": 3}
+    records = summary[columns].to_dict("records")
+    n_pages = max(1, -(-len(records) // TABLE_ROWS_PER_PAGE))
+    for page in range(n_pages):
+        chunk = records[page * TABLE_ROWS_PER_PAGE:(page + 1) * TABLE_ROWS_PER_PAGE]
+        fig = Figure(figsize=A4_LANDSCAPE)
+        fig.suptitle(f"{title} – Summary ({page + 1}/{n_pages})", fontsize=13)
+        ax = fig.add_axes([0.03, 0.03, 0.94, 0.88])
+        ax.set_axis_off()
+        if chunk:
+            cells = [[_fmt(rec[c], digits.get(c, 1)) if rec[c] != "" else "" for c in columns] for rec in chunk]
+            for row in cells:
+                # lange Texte kürzen, damit die Tabelle auf die Seite passt
+                row[0], row[-1] = _shorten(row[0], 24), _shorten(row[-1], 50)
+            height = (len(cells) + 1) / (TABLE_ROWS_PER_PAGE + 1)
+            table = ax.table(cellText=cells, colLabels=columns, colWidths=widths, bbox=[0, 1 - height, 1, height],
+                             cellLoc="center")
+            table.auto_set_font_size(False)
+            table.set_fontsize(7)
+        pdf.savefig(fig)
+
+
+def _error_page(pdf, spec, rows):
+    fig = Figure(figsize=A4_LANDSCAPE)
+    fig.suptitle(spec["name"], fontsize=13)
+    fig.text(0.5, 0.5, f"{spec['path']}\n\n{rows[0]['Error']}", ha="center", va="center", fontsize=11, wrap=True)
+    pdf.savefig(fig)
+
+
+def _report(progress_callback, done, total):
+    if progress_callback is not None and progress_callback(done, total) is False:
+        raise ReportCancelled()
+
+
+def _evaluate_all(specimens, n_jobs, progress_callback, total):
+    """Ergebnisse von process_specimen in Eingabereihenfolge."""
+    results = [None] * len(specimens)
+    # leere Kampagne oder ein einzelner Probekörper: kein Pool nötig
+    if n_jobs <= 1 or len(specimens) <= 1:
+        for i, spec in enumerate(specimens):
+            results[i] = process_specimen(spec)
+            _report(progress_callback, i + 1, total)
+        return results
+
+    pool = process_pool(min(n_jobs, len(specimens)))
+    cancelled = False
+    try:
+        futures = {pool.submit(process_specimen, spec): i for i, spec in enumerate(specimens)}
+        pending, done = set(futures), 0
+        while pending:
+            # auch ohne fertigen Probekörper regelmäßig melden (Oberfläche, Abbruch)
+            finished, pending = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                results[futures[fut]] = fut.result()
+            done += len(finished)
+            try:
+                _report(progress_callback, done, total)
+            except ReportCancelled:
+                cancelled = True
+                raise
+    finally:
+        # bei Abbruch nicht auf laufende Auswertungen warten, ausstehende verwerfen
+        pool.shutdown(wait=not cancelled, cancel_futures=True)
+    return results
+
+
+def build_report(specimens, pdf_path, xlsx_path=None, n_jobs=None, title="Transfer Length Report",
+                 progress_callback=None):
+    """
+    Erstellt den Kampagnenbericht als mehrseitiges PDF und Excel-Zusammenfassung.
+
+    specimens: Liste von specimen(...)-dicts (z. B. aus read_campaign). Die
+    Probekörper werden mit n_jobs Prozessen (Standard: default_n_jobs())
+    ausgewertet, die Seiten danach im aufrufenden Prozess gezeichnet.
+    xlsx_path: Standard "<pdf>_summary.xlsx".
+
+    progress_callback(fertig, gesamt) mit gesamt = 2 x Anzahl Probekörper
+    (Auswertung, dann Seiten) wird nach jedem Schritt und während der
+    Auswertung im Pool mindestens alle POLL_INTERVAL Sekunden aufgerufen; gibt
+    er False zurück, werden ausstehende Auswertungen verworfen und
+    ReportCancelled ausgelöst.
+
+    Gibt die Zusammenfassung als DataFrame (Spalten SUMMARY_KEYS) zurück.
+    """
+    n_jobs = default_n_jobs() if n_jobs is None else n_jobs
+    if xlsx_path is None:
+        xlsx_path = os.path.splitext(pdf_path)[0] + "_summary.xlsx"
+    n = len(specimens)
+    total = 2 * n
+    results = _evaluate_all(specimens, n_jobs, progress_callback, total)
+
+    summary = pd.DataFrame([row for rows, _ in results for row in rows], columns=SUMMARY_KEYS)
+
+    # Seiten in Eingabereihenfolge: Übersicht, dann je Probekörper eine Seite
+    tmp = pdf_path + ".tmp"
+    try:
+        with PdfPages(tmp) as pdf:
+            _summary_pages(pdf, summary, title)
+            for i, (spec, (rows, result)) in enumerate(zip(specimens, results)):
+                if result is None:
+                    _error_page(pdf, spec, rows)
+                else:
+                    pdf.savefig(render_specimen_page(spec, result))
+                _report(progress_callback, n + i + 1, total)
+        os.replace(tmp, pdf_path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    with pd.ExcelWriter(xlsx_path) as writer:
+        summary.to_excel(writer, sheet_name="Summary", index=False)
+        pd.DataFrame(specimens).to_excel(writer, sheet_name="Specimens", index=False)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transfer length campaign report (PDF + Excel summary)")
+    parser.add_argument("campaign", help="campaign table (.xlsx/.csv) with a 'file' column, or measurement files",
+                        nargs="+")
+    parser.add_argument("pdf", help="output PDF")
+    parser.add_argument("--xlsx", help="summary workbook (default: <pdf>_summary.xlsx)")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes")
+    args = parser.parse_args(argv)
+
+    if len(args.campaign) == 1 and is_campaign_table(args.campaign[0]):
+        specs = read_campaign(args.campaign[0])
+    else:
+        specs = [specimen(p) for p in args.campaign]
+
+    def progress(done, total):
+        print(f"\r{done}/{total}", end="", flush=True)
+
+    summary = build_report(specs, args.pdf, args.xlsx, n_jobs=args.jobs, progress_callback=progress)
+    print(f"\n{len(specs)} specimens, {int((summary['Error'] != '').sum())} failed -> {args.pdf}")
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,563 @@
+"""
+Lokaler HTTP-Dienst des Transfer Length Calculators (ohne Qt-Abhängigkeit).
+
+Hält geladene Datensätze im Speicher, damit Messrechner und Notebooks die
+Auswertung ohne GUI nutzen können; Integral, SRA-Maske und Ergebnisse werden
+zwischen Anfragen wiederverwendet. Der Server basiert nur auf asyncio aus der
+Standardbibliothek und lauscht ausschließlich auf 127.0.0.1. Anfragen mit
+fremdem Host- oder Origin-Header (Webseiten, DNS-Rebinding) werden mit 403
+abgewiesen. Rechenintensive Aufrufe laufen in einem Thread-Pool, damit die
+Ereignisschleife frei bleibt.
+
+Start:
+    python tlc_server.py [--port 8765]
+
+Endpunkte (JSON, sofern nicht anders angegeben):
+    GET    /datasets                               geladene Datensätze
+    POST   /datasets/open        {"path": ...}     Datei auf dem Rechner öffnen
+    POST   /datasets?name=x.xlsx (Dateiinhalt)     Datei hochladen (.xlsx/.csv)
+    GET    /datasets/<id>                          Kenngrößen
+    DELETE /datasets/<id>                          entladen
+    GET    /datasets/<id>/integral[?sra=1]         Integralverlauf
+    GET    /datasets/<id>/time?t=12.5|max|first    Zeitwahl (Zeile, Zeit)
+    POST   /datasets/<id>/evaluate                 {"eps", "l_ol", "time", "segments", "method", "ci", "sra"}
+    POST   /datasets/<id>/evaluate_batch           wie evaluate, mit "params": [[eps, l_ol], ...]
+                                                   (ohne segments/ci vektorisiert je eps)
+    GET    /datasets/<id>/plot/integral[?format=pdf]
+    GET    /datasets/<id>/plot/transferlength?eps=..&l_ol=..[&time=..&segments=..&method=..&format=pdf]
+
+Für Notebooks und Tests steht Client (urllib) zur Verfügung.
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError
+
+import numpy as np
+import pandas as pd
+
+from tlc_api import evaluate
+from tlc_core import MODE_METHODS, DFOSDataset, integral_series, select_row, sweep_transfer_length
+from tlc_plots import plot_integral_figure, TransferLengthPlot
+
+HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_DATASETS = 8
+MAX_CACHED_RESULTS = 4096
+# größte Anfrage in Bytes: JSON-Parameter bzw. hochgeladene Messdatei (POST /datasets)
+MAX_BODY = 4 * 2 ** 20
+MAX_UPLOAD = 256 * 2 ** 20
+
+REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 413: "Payload Too Large",
+           500: "Internal Server Error"}
+
+
+class DatasetNotFound(KeyError):
+    """Unbekannte Datensatz-id (HTTP 404)."""
+
+
+class AnalysisService:
+    """
+    Datensätze und zwischengespeicherte Ergebnisse des Dienstes (ohne HTTP).
+
+    Jeder Datensatz hat eine eigene Sperre, da die SRA-Einstellung am
+    DFOSDataset hängt; Anfragen an verschiedene Datensätze laufen parallel.
+    Bei mehr als max_datasets Datensätzen wird der am längsten ungenutzte
+    entladen.
+    """
+
+    def __init__(self, max_datasets=MAX_DATASETS):
+        self.max_datasets = max_datasets
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    # --- Datensätze ---
+
+    def _find(self, key):
+        with self._lock:
+            for ds_id, entry in self._entries.items():
+                if entry["key"] == key:
+                    return ds_id
+        return None
+
+    def _add(self, dataset, name, key=None):
+        with self._lock:
+            ds_id = self._find(key) if key is not None else None
+            if ds_id is not None:
+                return self.info(ds_id)
+            ds_id = uuid.uuid4().hex[:12]
+            self._entries[ds_id] = {"dataset": dataset, "name": name, "key": key,
+                                    "lock": threading.Lock(), "results": OrderedDict()}
+            while len(self._entries) > self.max_datasets:
+                self._entries.popitem(last=False)
+        return self.info(ds_id)
+
+    def open(self, path, name=None):
+        """Öffnet eine Messdatei (.xlsx/.csv) auf diesem Rechner; gleiche Datei = gleiche id."""
+        path = os.path.abspath(path)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(path)
+        # bereits geladen (gleicher Pfad, gleiche Größe und Änderungszeit)?
+        st = os.stat(path)
+        key = (path, st.st_size, st.st_mtime_ns)
+        ds_id = self._find(key)
+        if ds_id is not None:
+            return self.info(ds_id)
+        df = pd.read_csv(path) if path.lower().endswith(".csv") else pd.read_excel(path)
+        dataset = DFOSDataset.from_dataframe(df, source=path)
+        return self._add(dataset, name or os.path.basename(path), key=key)
+
+    def upload(self, data, name="upload.xlsx"):
+        """Lädt den Inhalt einer Messdatei (bytes); CSV, wenn name auf .csv endet."""
+        buf = io.BytesIO(data)
+        df = pd.read_csv(buf) if name.lower().endswith(".csv") else pd.read_excel(buf)
+        return self._add(DFOSDataset.from_dataframe(df), name)
+
+    def _entry(self, ds_id):
+        with self._lock:
+            if ds_id not in self._entries:
+                raise DatasetNotFound(ds_id)
+            self._entries.move_to_end(ds_id)
+            return self._entries[ds_id]
+
+    def info(self, ds_id):
+        entry = self._entry(ds_id)
+        ds = entry["dataset"]
+        return {"id": ds_id, "name": entry["name"], "source": ds.source, "n_times": ds.n_times,
+                "n_gauges": ds.n_gauges, "t_min": float(np.nanmin(ds.times)), "t_max": float(np.nanmax(ds.times))}
+
+    def list(self):
+        with self._lock:
+            return [self.info(ds_id) for ds_id in list(self._entries)]
+
+    def close(self, ds_id):
+        with self._lock:
+            if self._entries.pop(ds_id, None) is None:
+                raise DatasetNotFound(ds_id)
+        return {"closed": ds_id}
+
+    @staticmethod
+    def _apply_sra(dataset, sra, interpolate=False):
+        if sra:
+            dataset.set_sra_options(interpolate=interpolate)
+        else:
+            dataset.clear_sra_options()
+
+    # --- Auswertungen ---
+
+    def integral(self, ds_id, sra=False, interpolate=False):
+        entry = self._entry(ds_id)
+        with entry["lock"]:
+            ds = entry["dataset"]
+            self._apply_sra(ds, sra, interpolate)
+            times, integrals, rows = integral_series(ds)
+        i = int(np.argmax(integrals)) if integrals.size else None
+        return {"times": times, "integrals": integrals, "rows": rows,
+                "max_time": None if i is None else float(times[i])}
+
+    def lookup_time(self, ds_id, t=None, sra=False, interpolate=False):
+        """Zeile und Zeit zu t (Zahl, "max" oder "first"; siehe tlc_core.select_row)."""
+        entry = self._entry(ds_id)
+        with entry["lock"]:
+            ds = entry["dataset"]
+            self._apply_sra(ds, sra, interpolate)
+            row = select_row(ds, t)
+        return {"row": row, "time": float(ds.times[row])}
+
+    @staticmethod
+    def _store(cache, key, out):
+        cache[key] = out
+        while len(cache) > MAX_CACHED_RESULTS:
+            cache.popitem(last=False)
+
+    def _evaluate_locked(self, entry, row, eps, l_ol, segments, method, ci, sra, interpolate):
+        key = (row, bool(sra), bool(interpolate), float(eps), float(l_ol), segments or "", method, bool(ci))
+        cache = entry["results"]
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+
+        ds = entry["dataset"]
+        results = evaluate(ds, eps, l_ol, row=row, segments=segments, method=method, ci=ci)
+        out = {"row": row, "time": float(ds.times[row]), "eps": float(eps), "l_ol": float(l_ol),
+               "method": method, "segments": segments or None, "results": results}
+        self._store(cache, key, out)
+        return out
+
+    def _sweep_locked(self, entry, row, params, method, sra, interpolate):
+        """
+        Ganze Faser ohne Intervalle für viele (eps, l_ol): je eps ein Aufruf von
+        sweep_transfer_length über alle zugehörigen l_ol (gleiche Werte wie evaluate).
+        """
+        cache = entry["results"]
+        outs, missing = {}, {}
+        for eps, l_ol in params:
+            key = (row, bool(sra), bool(interpolate), eps, l_ol, "", method, False)
+            if key in cache:
+                cache.move_to_end(key)
+                outs[eps, l_ol] = cache[key]
+            else:
+                missing.setdefault(eps, []).append(l_ol)
+        if missing:
+            ds = entry["dataset"]
+            values, positions = ds.profile(row)
+            if values.size == 0:
+                raise ValueError("No data in the selected row")
+        for eps, l_ols in missing.items():
+            l_ols = sorted(set(l_ols))
+            res = sweep_transfer_length(values, positions, [eps], l_ols, method)
+            edges = tuple(res["band"][0])
+            for j, l_ol in enumerate(l_ols):
+                live, dead = res["live_end"][0, j], res["dead_end"][0, j]
+                result = {"segment": "all", "start": 0, "end": positions[-1],
+                          "live_end": None if np.isnan(live) else float(live),
+                          "dead_end": None if np.isnan(dead) else float(dead),
+                          "max_bin_edges": edges, "live_ci": None, "dead_ci": None}
+                out = {"row": row, "time": float(ds.times[row]), "eps": eps, "l_ol": l_ol,
+                       "method": method, "segments": None, "results": [result]}
+                self._store(cache, (row, bool(sra), bool(interpolate), eps, l_ol, "", method, False), out)
+                outs[eps, l_ol] = out
+        return [outs[p] for p in params]
+
+    def evaluate(self, ds_id, eps, l_ol, time=None, row=None, segments=None, method="histogram", ci=False,
+                 sra=False, interpolate=False):
+        """Live/Dead End für eine Zeile (row) oder Zeit (time, wie lookup_time)."""
+        return self.evaluate_batch(ds_id, [(eps, l_ol)], time, row, segments, method, ci, sra, interpolate)[0]
+
+    def evaluate_batch(self, ds_id, params, time=None, row=None, segments=None, method="histogram", ci=False,
+                       sra=False, interpolate=False):
+        """
+        Wie evaluate für mehrere (eps, l_ol)-Paare auf derselben Zeile; ohne
+        segments und ci vektorisiert über sweep_transfer_length.
+        """
+        params = [(float(eps), float(l_ol)) for eps, l_ol in params]
+        for eps, l_ol in params:
+            if not eps > 0 or not l_ol > 0:
+                raise ValueError("eps and l_ol must be greater than zero")
+        entry = self._entry(ds_id)
+        with entry["lock"]:
+            ds = entry["dataset"]
+            self._apply_sra(ds, sra, interpolate)
+            if row is None:
+                row = select_row(ds, time)
+            elif not 0 <= int(row) < ds.n_times:
+                raise ValueError("row out of range")
+            if len(params) > 1 and not segments and not ci:
+                if method not in MODE_METHODS:
+                    raise ValueError(f"Unknown mode estimator '{method}'")
+                return self._sweep_locked(entry, int(row), params, method, sra, interpolate)
+            return [self._evaluate_locked(entry, int(row), eps, l_ol, segments, method, ci, sra, interpolate)
+                    for eps, l_ol in params]
+
+    # --- Plots ---
+
+    def plot_integral(self, ds_id, fmt="png", sra=False, interpolate=False, time=None):
+        data = self.integral(ds_id, sra, interpolate)
+        fig = plot_integral_figure(data["times"], data["integrals"],
+                                   selected_time=None if time is None else float(time))
+        buf = io.BytesIO()
+        fig.savefig(buf, format=fmt)
+        return buf.getvalue()
+
+    def plot_transfer_length(self, ds_id, eps, l_ol, fmt="png", **options):
+        res = self.evaluate(ds_id, eps, l_ol, **options)
+        entry = self._entry(ds_id)
+        with entry["lock"]:
+            ds = entry["dataset"]
+            self._apply_sra(ds, options.get("sra", False), options.get("interpolate", False))
+            y_arr, x_arr = ds.profile(res["row"])
+        plot = TransferLengthPlot()
+        rows = res["results"]
+        uncertainty = [(r["live_ci"], r["dead_ci"]) for r in rows] if options.get("ci") else None
+        if res["segments"]:
+            seg_plot = [(r["start"], r["end"], r["live_end"], r["dead_end"], r["max_bin_edges"]) for r in rows]
+            plot.update(y_arr, x_arr, None, None, l_ol, eps, None, segments=seg_plot, uncertainty=uncertainty)
+        else:
+            r = rows[0]
+            plot.update(y_arr, x_arr, r["live_end"], r["dead_end"], l_ol, eps, r["max_bin_edges"],
+                        uncertainty=uncertainty)
+        buf = io.BytesIO()
+        plot.save(buf, format=fmt)
+        return buf.getvalue()
+
+
+# --- HTTP ---
+
+def _to_json(obj):
+    """JSON-fähige Form (NumPy-Arrays als Listen, NaN/inf als null)."""
+    if isinstance(obj, dict):
+        return {k: _to_json(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_to_json(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return _to_json(obj.tolist())
+    if isinstance(obj, (np.integer,)):
+        return int(obj)
+    if isinstance(obj, (float, np.floating)):
+        return float(obj) if math.isfinite(obj) else None
+    return obj
+
+
+def _flag(value):
+    return str(value).strip().lower() in ("1", "true", "yes")
+
+
+def _time_arg(value):
+    if value is None or value in ("max", "first"):
+        return value
+    return float(value)
+
+
+def _eval_options(args):
+    """Gemeinsame Optionen von evaluate/evaluate_batch/plot (JSON-Body oder Query)."""
+    if args.get("method", "histogram") not in MODE_METHODS:
+        raise ValueError(f"method must be one of {', '.join(MODE_METHODS)}")
+    return {
+        "time": _time_arg(args.get("time")),
+        "row": None if args.get("row") is None else int(args["row"]),
+        "segments": args.get("segments") or None,
+        "method": args.get("method", "histogram"),
+        "ci": _flag(args.get("ci", False)),
+        "sra": _flag(args.get("sra", False)),
+        "interpolate": _flag(args.get("interpolate", False)),
+    }
+
+
+def _sra_args(query):
+    return {"sra": _flag(query.get("sra", False)), "interpolate": _flag(query.get("interpolate", False))}
+
+
+def _plot_format(query):
+    fmt = query.get("format", "png")
+    if fmt not in ("png", "pdf", "svg"):
+        raise ValueError("format must be png, pdf or svg")
+    return fmt
+
+
+CONTENT_TYPES = {"png": "image/png", "pdf": "application/pdf", "svg": "image/svg+xml"}
+
+
+def _route(service, method, path, query, body):
+    """
+    Ordnet eine Anfrage dem Dienst zu. Gibt (status, content_type, payload)
+    zurück; payload ist ein JSON-Objekt oder bytes.
+    """
+    parts = [p for p in path.split("/") if p]
+    if not parts or parts[0] != "datasets":
+        return 404, None, {"error": f"Not found: {path}"}
+
+    if len(parts) == 1:
+        if method == "GET":
+            return 200, None, service.list()
+        if method == "POST":
+            return 200, None, service.upload(body, query.get("name", "upload.xlsx"))
+    elif len(parts) == 2 and parts[1] == "open" and method == "POST":
+        args = json.loads(body or b"{}")
+        return 200, None, service.open(args["path"], args.get("name"))
+    elif len(parts) == 2:
+        if method == "GET":
+            return 200, None, service.info(parts[1])
+        if method == "DELETE":
+            return 200, None, service.close(parts[1])
+    else:
+        ds_id, action = parts[1], "/".join(parts[2:])
+        if action == "integral" and method == "GET":
+            data = service.integral(ds_id, **_sra_args(query))
+            data.pop("rows")
+            return 200, None, data
+        if action == "time" and method == "GET":
+            return 200, None, service.lookup_time(ds_id, _time_arg(query.get("t")), **_sra_args(query))
+        if action == "evaluate" and method == "POST":
+            args = json.loads(body or b"{}")
+            return 200, None, service.evaluate(ds_id, args["eps"], args["l_ol"], **_eval_options(args))
+        if action == "evaluate_batch" and method == "POST":
+            args = json.loads(body or b"{}")
+            return 200, None, service.evaluate_batch(ds_id, args["params"], **_eval_options(args))
+        if action == "plot/integral" and method == "GET":
+            fmt = _plot_format(query)
+            data = service.plot_integral(ds_id, fmt, time=_time_arg(query.get("time")), **_sra_args(query))
+            return 200, CONTENT_TYPES[fmt], data
+        if action == "plot/transferlength" and method == "GET":
+            fmt = _plot_format(query)
+            data = service.plot_transfer_length(ds_id, float(query["eps"]), float(query["l_ol"]), fmt,
+                                                **_eval_options(query))
+            return 200, CONTENT_TYPES[fmt], data
+    return 404, None, {"error": f"Not found: {method} {path}"}
+
+
+def _check_origin(headers, port):
+    """
+    Nur Anfragen an 127.0.0.1/localhost mit diesem Port und ohne fremden
+    Origin (Schutz gegen DNS-Rebinding und Anfragen aus Webseiten).
+    """
+    hosts = (f"127.0.0.1:{port}", f"localhost:{port}")
+    if headers.get("host", "").lower() not in hosts:
+        raise PermissionError("invalid Host header")
+    origin = headers.get("origin")
+    if origin is not None and origin.lower() not in tuple("http://" + h for h in hosts):
+        raise PermissionError("cross-origin requests are not allowed")
+
+
+async def _read_request(reader, port):
+    """
+    Liest eine HTTP/1.1-Anfrage; None bei geschlossener Verbindung. Host und
+    Origin werden vor dem Lesen des Inhalts geprüft (PermissionError).
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    method, target, _ = line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        k, _, v = line.decode("latin-1").partition(":")
+        headers[k.strip().lower()] = v.strip()
+    _check_origin(headers, port)
+    length = int(headers.get("content-length", 0))
+    upload = method.upper() == "POST" and urlsplit(target).path.rstrip("/") == "/datasets"
+    if length > (MAX_UPLOAD if upload else MAX_BODY):
+        raise OverflowError("request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+
+def _response(status, content_type, payload, keep_alive):
+    if content_type is None:
+        content_type = "application/json"
+        payload = json.dumps(_to_json(payload)).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + payload
+
+
+async def _handle(service, reader, writer):
+    loop = asyncio.get_running_loop()
+    port = writer.get_extra_info("sockname")[1]
+    try:
+        while True:
+            try:
+                request = await _read_request(reader, port)
+            except OverflowError as e:
+                writer.write(_response(413, None, {"error": str(e)}, False))
+                break
+            except PermissionError as e:
+                writer.write(_response(403, None, {"error": str(e)}, False))
+                break
+            except (ValueError, asyncio.IncompleteReadError):
+                break
+            if request is None:
+                break
+            method, target, headers, body = request
+            url = urlsplit(target)
+            query = dict(parse_qsl(url.query))
+            keep_alive = headers.get("connection", "").lower() != "close"
+            try:
+                status, content_type, payload = await loop.run_in_executor(
+                    None, _route, service, method, url.path, query, body)
+            except DatasetNotFound as e:
+                status, content_type, payload = 404, None, {"error": f"Unknown dataset: {e.args[0]}"}
+            except KeyError as e:
+                status, content_type, payload = 400, None, {"error": f"Missing parameter: {e.args[0]}"}
+            except (ValueError, TypeError, FileNotFoundError) as e:
+                status, content_type, payload = 400, None, {"error": f"{type(e).__name__}: {e}"}
+            except Exception as e:
+                status, content_type, payload = 500, None, {"error": f"{type(e).__name__}: {e}"}
+            writer.write(_response(status, content_type, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+
+
+async def serve(port=DEFAULT_PORT, service=None):
+    """Startet den Server auf 127.0.0.1:port und gibt das asyncio-Server-Objekt zurück."""
+    service = service or AnalysisService()
+    return await asyncio.start_server(lambda r, w: _handle(service, r, w), HOST, port)
+
+
+def run_server(port=DEFAULT_PORT):
+    async def main():
+        server = await serve(port)
+        print(f"Transfer Length Calculator service on http://{HOST}:{server.sockets[0].getsockname()[1]}")
+        async with server:
+            await server.serve_forever()
+    asyncio.run(main())
+
+
+class Client:
+    """
+    Einfacher Client für den lokalen Dienst (nur Standardbibliothek).
+
+        c = Client()
+        ds = c.open("messung.xlsx")
+        c.evaluate(ds["id"], eps=0.023, l_ol=17)
+    """
+
+    def __init__(self, port=DEFAULT_PORT, host=HOST, timeout=600):
+        self.base = f"http://{host}:{port}"
+        self.timeout = timeout
+
+    def request(self, method, path, query=None, body=None, json_body=None):
+        url = self.base + path + ("?" + urlencode(query) if query else "")
+        headers = {}
+        if json_body is not None:
+            body = json.dumps(json_body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        req = Request(url, data=body, method=method, headers=headers)
+        try:
+            with urlopen(req, timeout=self.timeout) as resp:
+                data = resp.read()
+                ctype = resp.headers.get("Content-Type", "")
+        except HTTPError as e:
+            detail = e.read().decode("utf-8", "replace")
+            raise RuntimeError(f"{e.code}: {detail}") from None
+        return json.loads(data) if ctype.startswith("application/json") else data
+
+    def datasets(self):
+        return self.request("GET", "/datasets")
+
+    def open(self, path, name=None):
+        return self.request("POST", "/datasets/open", json_body={"path": os.path.abspath(path), "name": name})
+
+    def upload(self, path):
+        with open(path, "rb") as f:
+            return self.request("POST", "/datasets", {"name": os.path.basename(path)}, body=f.read())
+
+    def close(self, ds_id):
+        return self.request("DELETE", f"/datasets/{ds_id}")
+
+    def integral(self, ds_id, sra=False):
+        return self.request("GET", f"/datasets/{ds_id}/integral", {"sra": int(sra)})
+
+    def time(self, ds_id, t="max", sra=False):
+        return self.request("GET", f"/datasets/{ds_id}/time", {"t": t, "sra": int(sra)})
+
+    def evaluate(self, ds_id, eps, l_ol, **options):
+        return self.request("POST", f"/datasets/{ds_id}/evaluate", json_body=dict(options, eps=eps, l_ol=l_ol))
+
+    def evaluate_batch(self, ds_id, params, **options):
+        return self.request("POST", f"/datasets/{ds_id}/evaluate_batch",
+                            json_body=dict(options, params=[list(p) for p in params]))
+
+    def plot(self, ds_id, kind="transferlength", **query):
+        """Gerenderter Plot als bytes (kind = "integral" oder "transferlength")."""
+        return self.request("GET", f"/datasets/{ds_id}/plot/{kind}", {k: v for k, v in query.items() if v is not None})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Transfer Length Calculator service (127.0.0.1 only)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    run_server(parser.parse_args().port)
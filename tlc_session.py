@@ -0,0 +1,213 @@
+"""
+Projektdateien (.tlcp) des Transfer Length Calculators (ohne Qt-Abhängigkeit).
+
+Eine Projektdatei ist ein ZIP-Archiv mit
+  - project.json:   Version, Quelldatei, SRA-Einstellung, Zustand der
+                    Oberfläche (Zeitwahl, Parameterverlauf, results_list, ...)
+  - positions.npy, times.npy (unkomprimiert)
+  - der Dehnungsmatrix, je nach Speicherart:
+      "compressed": zlib-komprimierte Blöcke strain/00000.npy, ... zu je
+                    chunk_rows Zeilen
+      "raw":        strain.npy unkomprimiert
+      "reference":  keine Kopie, nur Verweis auf die Quelldatei
+  - zwischengespeicherten Ergebnissen (Integralverläufe, SRA-Masken) unter cache/
+
+Unkomprimierte Einträge werden beim Öffnen direkt im Archiv memory-gemappt.
+Komprimierte Blöcke werden beim ersten Öffnen einmal in
+"<projekt>.tlc_cache/strain_<kennung>.npy" entpackt und danach ebenfalls
+gemappt; Integral und Masken werden nicht neu berechnet.
+"""
+import hashlib
+import json
+import os
+import struct
+import zipfile
+
+import numpy as np
+
+from tlc_core import DFOSDataset
+
+PROJECT_VERSION = 1
+PROJECT_SUFFIX = ".tlcp"
+CHUNK_ROWS = 1024
+STRAIN_MODES = ("compressed", "raw", "reference")
+
+
+def _json_safe(obj):
+    """JSON-fähige Form (NumPy-Skalare/Arrays, Tupel, NaN -> None)."""
+    if isinstance(obj, dict):
+        return {str(k): _json_safe(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_json_safe(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return _json_safe(obj.tolist())
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, (float, np.floating)):
+        return float(obj) if np.isfinite(obj) else None
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    return obj
+
+
+def _write_npy(zf, name, array, compress):
+    info = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+    info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with zf.open(info, "w", force_zip64=True) as f:
+        np.lib.format.write_array(f, np.ascontiguousarray(array), allow_pickle=False)
+
+
+def _read_npy(zf, name):
+    with zf.open(name) as f:
+        return np.lib.format.read_array(f, allow_pickle=False)
+
+
+def _mmap_member(path, zf, name):
+    """Unkomprimierten .npy-Eintrag direkt im Archiv memory-mappen."""
+    info = zf.getinfo(name)
+    if info.compress_type != zipfile.ZIP_STORED:
+        return _read_npy(zf, name)
+    with open(path, "rb") as f:
+        # lokaler Dateikopf: 30 Bytes + Dateiname + Zusatzfeld
+        f.seek(info.header_offset)
+        local = f.read(30)
+        name_len, extra_len = struct.unpack("<HH", local[26:30])
+        f.seek(info.header_offset + 30 + name_len + extra_len)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    if 0 in shape:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape, order="F" if fortran else "C")
+
+
+def _source_stat(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def save_project(path, dataset, state=None, strain="compressed", chunk_rows=CHUNK_ROWS):
+    """
+    Speichert Datensatz, Zwischenergebnisse und Oberflächenzustand als Projektdatei.
+
+    strain: "compressed", "raw" oder "reference" (siehe Moduldokumentation);
+    "reference" setzt eine vorhandene Quelldatei voraus. state: beliebiger
+    JSON-fähiger Zustand (NumPy-Werte und Tupel werden umgewandelt). Die Datei
+    wird erst nach vollständigem Schreiben ersetzt.
+    """
+    if strain not in STRAIN_MODES:
+        raise ValueError(f"strain must be one of {', '.join(STRAIN_MODES)}")
+    source = dataset.source if dataset.source and os.path.isfile(dataset.source) else None
+    if strain == "reference" and source is None:
+        raise ValueError("Reference projects need an existing source file")
+
+    header = {
+        "version": PROJECT_VERSION,
+        "strain": strain,
+        "shape": list(dataset.strain.shape),
+        "chunk_rows": chunk_rows,
+        "columns": [str(c) for c in dataset.columns],
+        "source": os.path.abspath(source) if source else None,
+        "source_stat": _source_stat(source) if source else None,
+        "sra_options": dataset.sra_options,
+        "cache": [],
+        "state": _json_safe(state or {}),
+    }
+
+    tmp = path + ".tmp"
+    with zipfile.ZipFile(tmp, "w", allowZip64=True) as zf:
+        _write_npy(zf, "positions.npy", dataset.positions, compress=False)
+        _write_npy(zf, "times.npy", dataset.times, compress=False)
+        if strain == "raw":
+            _write_npy(zf, "strain.npy", dataset.strain, compress=False)
+        elif strain == "compressed":
+            for i, start in enumerate(range(0, dataset.n_times, chunk_rows)):
+                _write_npy(zf, f"strain/{i:05d}.npy", dataset.strain[start:start + chunk_rows], compress=True)
+
+        for k, (key, value) in enumerate(dataset.cache_snapshot().items()):
+            arrays = list(value) if isinstance(value, tuple) else [value]
+            names = [f"cache/{k:03d}_{j}.npy" for j in range(len(arrays))]
+            for name, arr in zip(names, arrays):
+                _write_npy(zf, name, arr, compress=True)
+            header["cache"].append({"key": _json_safe(key), "arrays": names, "tuple": isinstance(value, tuple)})
+
+        zf.writestr("project.json", json.dumps(header, ensure_ascii=False, indent=1))
+    os.replace(tmp, path)
+
+
+def _unpacked_strain(path, zf, header):
+    """Komprimierte Blöcke einmal in eine .npy-Datei neben dem Projekt entpacken und mappen."""
+    chunks = sorted(n for n in zf.namelist() if n.startswith("strain/"))
+    key = hashlib.sha1(json.dumps(
+        [header["shape"]] + [(n, zf.getinfo(n).CRC, zf.getinfo(n).file_size) for n in chunks]
+    ).encode()).hexdigest()[:16]
+    cache_dir = path + ".tlc_cache"
+    target = os.path.join(cache_dir, f"strain_{key}.npy")
+    if not os.path.exists(target):
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = target + ".tmp"
+        out = np.lib.format.open_memmap(tmp, mode="w+", dtype=float, shape=tuple(header["shape"]))
+        start = 0
+        for name in chunks:
+            block = _read_npy(zf, name)
+            out[start:start + block.shape[0]] = block
+            start += block.shape[0]
+        out.flush()
+        del out
+        os.replace(tmp, target)
+    return np.load(target, mmap_mode="r")
+
+
+def _read_source(source):
+    import pandas as pd
+
+    df = pd.read_csv(source) if source.lower().endswith(".csv") else pd.read_excel(source)
+    return DFOSDataset.from_dataframe(df, source=source)
+
+
+def load_project(path):
+    """
+    Öffnet eine Projektdatei. Gibt (dataset, state) zurück; die Dehnungsmatrix
+    ist memory-gemappt (außer bei "reference"), Integralverläufe und SRA-Masken
+    liegen bereits im Cache des Datensatzes.
+
+    Hat sich die Quelldatei eines "reference"-Projekts geändert, werden die
+    gespeicherten Zwischenergebnisse verworfen und state["source_changed"] gesetzt.
+    """
+    with zipfile.ZipFile(path) as zf:
+        header = json.loads(zf.read("project.json"))
+        if header.get("version", 0) > PROJECT_VERSION:
+            raise ValueError("Project was written by a newer version")
+        state = header.get("state", {})
+        source = header.get("source")
+        if source and not os.path.isfile(source):
+            source = None
+
+        if header["strain"] == "reference":
+            if source is None:
+                raise FileNotFoundError(f"Source file of the project not found: {header.get('source')}")
+            dataset = _read_source(source)
+            use_cache = _source_stat(source) == header.get("source_stat")
+            if not use_cache:
+                state["source_changed"] = True
+        else:
+            if header["strain"] == "raw":
+                strain = _mmap_member(path, zf, "strain.npy")
+            else:
+                strain = _unpacked_strain(path, zf, header)
+            dataset = DFOSDataset(strain, _mmap_member(path, zf, "positions.npy"),
+                                  _mmap_member(path, zf, "times.npy"), columns=header["columns"], source=source)
+            use_cache = True
+
+        if use_cache:
+            items = {}
+            for entry in header.get("cache", []):
+                arrays = [_read_npy(zf, name) for name in entry["arrays"]]
+                items[tuple(entry["key"])] = tuple(arrays) if entry["tuple"] else arrays[0]
+            dataset.restore_cache(items)
+        if header.get("sra_options"):
+            dataset.set_sra_options(**header["sra_options"])
+    return dataset, state
@@ -0,0 +1,464 @@
+"""
+Blockweise gespeicherte Dehnungsmatrizen für Messungen, die nicht in den
+Arbeitsspeicher passen (ohne Qt-Abhängigkeit).
+
+Ein Store ist ein Verzeichnis "<messung>.tlcs" mit
+  - store.json:     Form, Blockgröße, Spaltenköpfe, Quelldatei
+  - positions.npy, times.npy
+  - blocks/00000.npy, ... zu je block_rows Zeilen (float64, C-Reihenfolge)
+
+Blöcke werden per Memory-Mapping gelesen. Integralverlauf, Spitzensuche,
+Ereigniserkennung, Zeitsuche und Zeitverlauf von Live/Dead End laufen Block für Block mit
+begrenztem Speicherbedarf und melden den Fortschritt je Block über
+progress(done, total). Die Ergebnisse entsprechen denen von tlc_core auf der
+vollständigen Matrix.
+
+Die SRA-Bereinigung braucht robuste Kennwerte über die gesamte Zeitachse und
+ist hier nicht verfügbar; Stores werden auf den Rohdaten ausgewertet.
+"""
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+
+from tlc_core import (DFOSDataset, EventDetector, GaugeEventDetector, detect_events, event_thresholds,
+                      parse_positions, transfer_length_history, _trapz)
+
+STORE_VERSION = 1
+STORE_SUFFIX = ".tlcs"
+BLOCK_ROWS = 4096
+
+
+class StoreWriter:
+    """
+    Schreibt eine Dehnungsmatrix zeilenweise in einen Store.
+
+    append(strain, times) nimmt beliebig große Zeilenpakete an; volle Blöcke
+    werden sofort geschrieben. close() schreibt den letzten Block und die
+    Metadaten und gibt den geöffneten ChunkedStore zurück. Der Store wird in
+    "<pfad>.tmp" aufgebaut und erst nach vollständigem Schreiben umbenannt.
+    """
+
+    def __init__(self, path, positions, columns=None, source=None, block_rows=BLOCK_ROWS):
+        self.path = path
+        self.positions = np.asarray(positions, dtype=float)
+        self.columns = [str(c) for c in columns] if columns is not None else [str(p) for p in self.positions]
+        self.source = source
+        self.block_rows = block_rows
+        self._tmp = path + ".tmp"
+        shutil.rmtree(self._tmp, ignore_errors=True)
+        os.makedirs(os.path.join(self._tmp, "blocks"))
+        self._buffer = np.empty((block_rows, self.positions.size))
+        self._fill = 0
+        self._n_blocks = 0
+        self._times = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            shutil.rmtree(self._tmp, ignore_errors=True)
+
+    def _flush(self):
+        if self._fill:
+            np.save(os.path.join(self._tmp, "blocks", f"{self._n_blocks:05d}.npy"), self._buffer[:self._fill])
+            self._n_blocks += 1
+            self._fill = 0
+
+    def append(self, strain, times):
+        strain = np.asarray(strain, dtype=float)
+        times = np.asarray(times, dtype=float)
+        if strain.ndim != 2 or strain.shape != (times.size, self.positions.size):
+            raise ValueError("strain shape does not match times/positions")
+        self._times.append(times.copy())
+        start = 0
+        while start < strain.shape[0]:
+            n = min(self.block_rows - self._fill, strain.shape[0] - start)
+            self._buffer[self._fill:self._fill + n] = strain[start:start + n]
+            self._fill += n
+            start += n
+            if self._fill == self.block_rows:
+                self._flush()
+
+    def close(self):
+        self._flush()
+        times = np.concatenate(self._times) if self._times else np.empty(0)
+        np.save(os.path.join(self._tmp, "positions.npy"), self.positions)
+        np.save(os.path.join(self._tmp, "times.npy"), times)
+        meta = {
+            "version": STORE_VERSION,
+            "shape": [int(times.size), int(self.positions.size)],
+            "block_rows": self.block_rows,
+            "n_blocks": self._n_blocks,
+            "columns": self.columns,
+            "source": os.path.abspath(self.source) if self.source else None,
+        }
+        with open(os.path.join(self._tmp, "store.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=1)
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.replace(self._tmp, self.path)
+        return ChunkedStore(self.path)
+
+
+class ChunkedStore:
+    """
+    Lesezugriff auf einen Store. positions liegt im Speicher, times und die
+    Blöcke werden memory-gemappt; es wird immer nur ein Block gleichzeitig gelesen.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "store.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version", 0) > STORE_VERSION:
+            raise ValueError("Store was written by a newer version")
+        self.shape = tuple(meta["shape"])
+        self.block_rows = meta["block_rows"]
+        self.n_blocks = meta["n_blocks"]
+        self.columns = meta["columns"]
+        self.source = meta.get("source")
+        self.positions = np.load(os.path.join(path, "positions.npy"))
+        self.times = np.load(os.path.join(path, "times.npy"), mmap_mode="r")
+        self._cache = {}
+
+    @property
+    def n_times(self):
+        return self.shape[0]
+
+    @property
+    def n_gauges(self):
+        return self.shape[1]
+
+    def block(self, i):
+        """Block i als memory-gemapptes Array (block_rows Zeilen, der letzte ggf. weniger)."""
+        return np.load(os.path.join(self.path, "blocks", f"{i:05d}.npy"), mmap_mode="r")
+
+    def iter_blocks(self, progress=None):
+        """Liefert (erste Zeile, Block) für alle Blöcke; progress(done, total) nach jedem Block."""
+        for i in range(self.n_blocks):
+            yield i * self.block_rows, self.block(i)
+            if progress is not None:
+                progress(i + 1, self.n_blocks)
+
+    def rows(self, start, stop):
+        """Zeilen start..stop-1 als Array im Speicher (liest nur die betroffenen Blöcke)."""
+        start, stop = max(start, 0), min(stop, self.n_times)
+        out = np.empty((max(stop - start, 0), self.n_gauges))
+        for i in range(start // self.block_rows, -(-stop // self.block_rows)):
+            b0 = i * self.block_rows
+            lo, hi = max(start, b0), min(stop, b0 + self.block_rows)
+            out[lo - start:hi - start] = self.block(i)[lo - b0:hi - b0]
+        return out
+
+    def profile(self, row_idx):
+        """Dehnungsprofil einer Zeile wie DFOSDataset.profile."""
+        values = self.rows(row_idx, row_idx + 1)[0]
+        keep = ~np.isnan(self.positions) & ~np.isnan(values)
+        return values[keep], self.positions[keep]
+
+    def to_dataset(self, start=0, stop=None):
+        """Zeitfenster start..stop-1 als DFOSDataset (z. B. für die Oberfläche)."""
+        stop = self.n_times if stop is None else stop
+        return DFOSDataset(self.rows(start, stop), self.positions, np.array(self.times[start:stop]),
+                           columns=self.columns, source=self.source)
+
+
+def open_store(path):
+    return ChunkedStore(path)
+
+
+def _numeric_rows(rows, width, first_row=2):
+    """
+    Zeilen aus openpyxl (None/Text/Wahrheitswerte = NaN) als float-Matrix mit
+    width Spalten (Kopfzeile); kürzere Zeilen werden wie von pandas mit NaN
+    aufgefüllt, längere ergeben ValueError (first_row = Excel-Zeilennummer
+    der ersten Zeile, für die Meldung).
+    """
+    out = np.full((len(rows), width), np.nan)
+    for i, row in enumerate(rows):
+        if len(row) > width:
+            raise ValueError(f"Row {first_row + i} has {len(row)} columns, the header has {width}")
+        for j, v in enumerate(row):
+            if isinstance(v, (int, float)) and not isinstance(v, bool):
+                out[i, j] = v
+    return out
+
+
+def convert_to_store(source, path=None, block_rows=BLOCK_ROWS, progress=None):
+    """
+    Wandelt eine Messdatei (.csv oder .xlsx, letzte Spalte = Zeit) blockweise
+    in einen Store um, ohne sie vollständig zu laden. CSV-Dateien werden mit
+    pandas in Blöcken gelesen, Excel-Dateien zeilenweise mit openpyxl
+    (read_only). progress(zeilen, gesamt) nach jedem Block; gesamt ist bei
+    CSV unbekannt (None).
+
+    Gibt den geöffneten ChunkedStore zurück (Standardpfad: source + ".tlcs").
+    """
+    path = path or source + STORE_SUFFIX
+    done = 0
+    if source.lower().endswith(".csv"):
+        import pandas as pd
+
+        writer = None
+        try:
+            for chunk in pd.read_csv(source, chunksize=block_rows):
+                if writer is None:
+                    columns = chunk.columns[:-1]
+                    writer = StoreWriter(path, parse_positions(columns), columns, source, block_rows)
+                writer.append(chunk[columns].to_numpy(dtype=float), chunk[chunk.columns[-1]].to_numpy(dtype=float))
+                done += len(chunk)
+                if progress is not None:
+                    progress(done, None)
+        except BaseException:
+            if writer is not None:
+                shutil.rmtree(writer._tmp, ignore_errors=True)
+            raise
+        if writer is None:
+            raise ValueError("No data in file")
+        return writer.close()
+
+    import openpyxl
+
+    wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        total = max((ws.max_row or 1) - 1, 0) or None
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            raise ValueError("No data in file")
+        columns = list(header[:-1])
+        with StoreWriter(path, parse_positions(columns), columns, source, block_rows) as writer:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) == block_rows:
+                    data = _numeric_rows(batch, len(header), done + 2)
+                    writer.append(data[:, :-1], data[:, -1])
+                    done += len(batch)
+                    batch = []
+                    if progress is not None:
+                        progress(done, total)
+            if batch:
+                data = _numeric_rows(batch, len(header), done + 2)
+                writer.append(data[:, :-1], data[:, -1])
+                done += len(batch)
+                if progress is not None:
+                    progress(done, total)
+    finally:
+        wb.close()
+    return ChunkedStore(path)
+
+
+def _block_integral(block):
+    keep = ~np.isnan(block).all(axis=1)
+    return keep, _trapz(np.nan_to_num(block[keep], nan=0.0), axis=1)
+
+
+def stream_integral(store, progress=None):
+    """
+    Integralverlauf wie tlc_core.integral_series, blockweise berechnet.
+    Gibt (times, integrals, rows) zurück; das Ergebnis wird im Store-Verzeichnis
+    abgelegt und beim nächsten Aufruf ohne Lesen der Blöcke geladen.
+    """
+    if "integral" not in store._cache:
+        cache_file = os.path.join(store.path, "integral.npz")
+        if os.path.exists(cache_file):
+            with np.load(cache_file) as z:
+                store._cache["integral"] = (z["times"], z["integrals"], z["rows"])
+        else:
+            all_rows, all_integrals = [], []
+            for start, block in store.iter_blocks(progress):
+                keep, integrals = _block_integral(block)
+                all_rows.append(np.flatnonzero(keep) + start)
+                all_integrals.append(integrals)
+            rows = np.concatenate(all_rows) if all_rows else np.empty(0, dtype=np.intp)
+            integrals = np.concatenate(all_integrals) if all_integrals else np.empty(0)
+            times = np.asarray(store.times[rows])
+            np.savez(cache_file, times=times, integrals=integrals, rows=rows)
+            store._cache["integral"] = (times, integrals, rows)
+    return store._cache["integral"]
+
+
+def stream_peak(store, progress=None):
+    """
+    Maximum des Integrals (Zeit vor Riss) als (row, time, value), ohne den
+    Verlauf vollständig im Speicher zu halten. Bei gleichen Werten gilt die
+    erste Zeile. ValueError, wenn alle Zeilen NaN sind.
+    """
+    if "integral" in store._cache or os.path.exists(os.path.join(store.path, "integral.npz")):
+        times, integrals, rows = stream_integral(store)
+        if not rows.size:
+            raise ValueError("All rows are NaN")
+        k = int(np.argmax(integrals))
+        return int(rows[k]), float(times[k]), float(integrals[k])
+
+    best = None
+    for start, block in store.iter_blocks(progress):
+        keep, integrals = _block_integral(block)
+        if integrals.size:
+            k = int(np.argmax(integrals))
+            if best is None or integrals[k] > best[1]:
+                best = (int(np.flatnonzero(keep)[k]) + start, float(integrals[k]))
+    if best is None:
+        raise ValueError("All rows are NaN")
+    return best[0], float(store.times[best[0]]), best[1]
+
+
+def stream_nearest_row(store, t, progress=None):
+    """
+    Gültige Zeile (nicht alle Werte NaN), deren Zeit am nächsten an t liegt;
+    bei gleichem Abstand die erste (wie tlc_core.nearest_row).
+    """
+    if "integral" in store._cache:
+        _, _, rows = store._cache["integral"]
+        if not rows.size:
+            raise ValueError("All rows are NaN")
+        return int(rows[np.nanargmin(np.abs(store.times[rows] - t))])
+
+    best = None
+    for start, block in store.iter_blocks(progress):
+        valid = np.flatnonzero(~np.isnan(block).all(axis=1))
+        if not valid.size:
+            continue
+        dist = np.abs(store.times[start + valid] - t)
+        if np.isnan(dist).all():
+            continue
+        k = int(np.nanargmin(dist))
+        if best is None or dist[k] < best[1]:
+            best = (start + int(valid[k]), dist[k])
+    if best is None:
+        raise ValueError("All rows are NaN")
+    return best[0]
+
+
+def stream_select_row(store, time=None, progress=None):
+    """Zeile für die Auswertung wie tlc_core.select_row ("max", "first" oder Zeit [s])."""
+    if time is None or time == "max":
+        return stream_peak(store, progress)[0]
+    if time == "first":
+        for start, block in store.iter_blocks(progress):
+            valid = np.flatnonzero(~np.isnan(block).all(axis=1))
+            if valid.size:
+                return start + int(valid[0])
+        raise ValueError("All rows are NaN")
+    return stream_nearest_row(store, float(time), progress)
+
+
+def stream_events(store, prominence=None, drop=None, gauge_threshold=None, progress=None):
+    """
+    Ereignisse des Integralverlaufs wie tlc_core.detect_events und, mit
+    gauge_threshold, Sprünge einzelner Messstellen (tlc_core.GaugeEventDetector)
+    in einem Durchlauf über die Blöcke (nur gültige Zeilen, "row" = Zeile im
+    Store). Fehlen prominence oder drop, werden sie mit
+    tlc_core.event_thresholds aus stream_integral abgeleitet (beim ersten
+    Aufruf ein zusätzlicher Durchlauf, danach aus dem Cache); ohne
+    gauge_threshold wird dann der gespeicherte Verlauf ohne Lesen der Blöcke
+    ausgewertet.
+
+    Gibt (integral_events, gauge_events) zurück.
+    """
+    if prominence is None or drop is None:
+        times, integrals, rows = stream_integral(store, progress)
+        if gauge_threshold is None:
+            return detect_events(times, integrals, prominence, drop, rows=rows), []
+        thresholds = event_thresholds(integrals)
+        if thresholds is not None:
+            prominence = thresholds[0] if prominence is None else prominence
+            drop = thresholds[1] if drop is None else drop
+
+    # konstanter Verlauf (keine Schwellen): nur Messstellen auswerten
+    detector = EventDetector(prominence, drop) if prominence is not None and drop is not None else None
+    gauges = None if gauge_threshold is None else GaugeEventDetector(store.positions, gauge_threshold)
+    integral_events, gauge_events = [], []
+    for start, block in store.iter_blocks(progress):
+        keep, integrals = _block_integral(block)
+        rows = np.flatnonzero(keep) + start
+        times = store.times[rows]
+        if detector is not None:
+            integral_events += detector.feed(times, integrals, rows)
+        if gauges is not None:
+            gauge_events += gauges.feed(times, block[keep], rows)
+    if detector is not None:
+        integral_events += detector.finish()
+    return integral_events, gauge_events
+
+
+def stream_time_history(store, eps, l_ol, method="histogram", step=1, progress=None):
+    """
+    Live/Dead End für jede step-te Zeile (Zeitverlauf), blockweise mit
+    tlc_core.transfer_length_history. NaN = leere Zeile oder kein Plateau.
+
+    Gibt ein dict mit "rows", "times", "live_end" und "dead_end" zurück.
+    """
+    rows, live, dead = [], [], []
+    for start, block in store.iter_blocks(progress):
+        first = (-start) % step
+        sel = np.arange(first, block.shape[0], step)
+        le, de = transfer_length_history(block[sel], store.positions, eps, l_ol, method)
+        rows.append(sel + start)
+        live.append(le)
+        dead.append(de)
+    rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.intp)
+    return {
+        "rows": rows,
+        "times": np.asarray(store.times[rows]),
+        "live_end": np.concatenate(live) if live else np.empty(0),
+        "dead_end": np.concatenate(dead) if dead else np.empty(0),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Out-of-core DFOS store: convert and stream evaluations")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("convert", help="convert a .csv/.xlsx measurement into a block store")
+    p.add_argument("source")
+    p.add_argument("--out", help=f"store directory (default: <source>{STORE_SUFFIX})")
+    p.add_argument("--block-rows", type=int, default=BLOCK_ROWS)
+    p = sub.add_parser("peak", help="integral maximum (time before crack)")
+    p.add_argument("store")
+    p = sub.add_parser("events", help="integral peaks, drops and crack onsets (optionally per-gauge jumps)")
+    p.add_argument("store")
+    p.add_argument("--gauge-threshold", type=float, default=None, help="report strain jumps above this value")
+    p = sub.add_parser("history", help="live/dead end for every step-th row, written as CSV or .xlsx")
+    p.add_argument("store")
+    p.add_argument("csv")
+    p.add_argument("--eps", type=float, default=0.023)
+    p.add_argument("--lol", type=float, default=17)
+    p.add_argument("--method", default="histogram")
+    p.add_argument("--step", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    def progress(done, total):
+        print(f"\r{done}/{total or '?'}", end="", flush=True)
+
+    if args.command == "convert":
+        store = convert_to_store(args.source, args.out, args.block_rows, progress)
+        print(f"\n{store.n_times} x {store.n_gauges} -> {store.path} ({store.n_blocks} blocks)")
+    elif args.command == "peak":
+        row, t, value = stream_peak(ChunkedStore(args.store), progress)
+        print(f"\nrow {row}, t = {t} s, integral = {value}")
+    elif args.command == "events":
+        integral_events, gauge_events = stream_events(ChunkedStore(args.store), gauge_threshold=args.gauge_threshold,
+                                                      progress=progress)
+        print()
+        for e in integral_events:
+            print(f"{e['type']:<6} row {e['row']}, t = {e['time']} s, integral = {e['value']:.6g}, size = {e['size']:.3g}")
+        for e in gauge_events:
+            print(f"gauge  row {e['row']}, t = {e['time']} s, x = {e['position']}, jump = {e['size']:.3g} "
+                  f"({e['n_gauges']} gauges)")
+    else:
+        from tlc_export import export_time_history
+
+        n = export_time_history(ChunkedStore(args.store), args.csv, args.eps, args.lol, args.method, args.step,
+                                progress)
+        print(f"\n{n} rows -> {args.csv}")
+
+
+if __name__ == "__main__":
+    main()